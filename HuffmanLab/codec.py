@@ -0,0 +1,212 @@
+"""
+Byte-level Huffman encoder / decoder built on main.py's buildTree and createCodeMap.
+
+createCodeMap gives bitstrings ("0110"). Here they become integer tables
+indexed by byte value (code, length), which two encoders use:
+
+    encodeScalar    one byte at a time, shifting codes into an int accumulator
+    encodeBulk      NumPy: look up every byte's code and length at once,
+                    cumsum the lengths to get each code's bit offset, and
+                    scatter all codes into a packed buffer with one bincount
+
+Both give the same bytes: codes are written MSB first, and the last byte is
+padded with zero bits. decodeBlock reverses either one with a 2^12-entry
+lookup table (longer codes fall back to a small dict).
+
+Run: python codec.py [file]   (prints throughput, default sherlock.txt)
+"""
+
+import time
+from collections import Counter
+
+from main import buildTree, createCodeMap
+
+try:
+    import numpy as np
+except ImportError:     # optional: encodeBulk falls back to encodeScalar
+    np = None
+
+TABLE_BITS = 12     # decoder lookup table covers codes up to this length
+
+
+# byte frequencies (countFrequencies only counts ASCII characters of a text file)
+def countByteFrequencies(data):
+    """
+    Counts every byte value in data
+    Returns dictionary: byte value -> count
+    """
+    return dict(Counter(data))
+
+
+class CodeTables:
+    """Integer form of a code map: codes[s] / lengths[s] for every symbol s (length 0 = no code)"""
+
+    def __init__(self, code_map):
+        self.code_map = code_map
+        # symbols are byte values; keys from countFrequencies are 1-character strings
+        symbols = {(ord(s) if isinstance(s, str) else s): bits for s, bits in code_map.items()}
+        size = max(symbols, default=-1) + 1
+        self.codes = [0] * size
+        self.lengths = [0] * size
+        for s, bits in symbols.items():
+            self.codes[s] = int(bits, 2)
+            self.lengths[s] = len(bits)
+        self.max_length = max(self.lengths, default=0)
+
+        # decoder: every TABLE_BITS-bit window that starts with a short code -> (symbol, length)
+        self.table = [None] * (1 << TABLE_BITS)
+        self.long_codes = {}    # (code, length) -> symbol for codes longer than TABLE_BITS
+        for s, bits in symbols.items():
+            length = len(bits)
+            if length <= TABLE_BITS:
+                base = int(bits, 2) << (TABLE_BITS - length)
+                for k in range(1 << (TABLE_BITS - length)):
+                    self.table[base + k] = (s, length)
+            else:
+                self.long_codes[(int(bits, 2), length)] = s
+
+        self._np = None
+
+    def arrays(self):
+        """(codes, lengths) as NumPy arrays covering all 256 byte values"""
+        if self._np is None:
+            codes = np.zeros(256, dtype=np.uint64)
+            lengths = np.zeros(256, dtype=np.int64)
+            codes[:len(self.codes)] = self.codes[:256]
+            lengths[:len(self.lengths)] = self.lengths[:256]
+            self._np = (codes, lengths)
+        return self._np
+
+
+def buildCodeTables(data):
+    """Huffman code for the bytes of data: countByteFrequencies -> buildTree -> createCodeMap"""
+    return CodeTables(createCodeMap(buildTree(countByteFrequencies(data))))
+
+
+def _missing(data, tables):
+    lengths = tables.lengths
+    for b in data:
+        if b >= len(lengths) or lengths[b] == 0:
+            return b
+    return None
+
+
+# encoders: both return (payload bytes, number of bits used)
+def encodeScalar(data, tables):
+    codes, lengths = tables.codes, tables.lengths
+    out = bytearray()
+    acc = 0     # pending bits, oldest first
+    have = 0
+    try:
+        for b in data:
+            length = lengths[b]
+            if length == 0:
+                raise IndexError
+            acc = (acc << length) | codes[b]
+            have += length
+            if have >= 32:
+                have -= 32
+                out += (acc >> have).to_bytes(4, "big")
+                acc &= (1 << have) - 1
+    except IndexError:
+        raise ValueError(f"byte {_missing(data, tables)} has no Huffman code") from None
+
+    total = 8 * len(out) + have
+    if have:
+        pad = -have % 8
+        out += (acc << pad).to_bytes((have + pad) // 8, "big")
+    return bytes(out), total
+
+
+def encodeBulk(data, tables):
+    if np is None or tables.max_length > 32 or len(data) == 0:
+        return encodeScalar(data, tables)
+    codes, lengths = tables.arrays()
+    symbols = np.frombuffer(data, dtype=np.uint8)
+    code = codes[symbols]
+    length = lengths[symbols]
+    if not length.all():
+        raise ValueError(f"byte {_missing(data, tables)} has no Huffman code")
+
+    ends = np.cumsum(length)
+    total = int(ends[-1])
+    starts = ends - length
+
+    # each code lands in 32-bit word w = start // 32, spilling into w + 1 at most.
+    # Line it up inside a 64-bit window covering both words, then add the halves
+    # into their words. Codes never share bits, so adding is the same as OR, and
+    # float64 sums of values below 2^32 are exact.
+    word = starts >> 5
+    window = code << (np.uint64(64) - (starts & 31).astype(np.uint64) - length.astype(np.uint64))
+    n_words = (total + 31) // 32 + 1
+    packed = np.bincount(word, weights=(window >> np.uint64(32)).astype(np.float64), minlength=n_words)
+    packed += np.bincount(word + 1, weights=(window & np.uint64(0xFFFFFFFF)).astype(np.float64),
+                          minlength=n_words)
+    payload = packed.astype(">u4").tobytes()[:(total + 7) // 8]
+    return payload, total
+
+
+# decoder
+def decodeBlock(payload, n_symbols, tables):
+    """Decode n_symbols bytes from payload (as written by either encoder)"""
+    table, long_codes = tables.table, tables.long_codes
+    mask = (1 << TABLE_BITS) - 1
+    longest = tables.max_length
+    need = max(TABLE_BITS, longest)
+    data = bytes(payload) + bytes(8)    # zeros past the end
+    out = bytearray(n_symbols)
+    acc = 0     # only the low `have` bits matter; older bits are dropped on refill
+    have = 0
+    pos = 0
+    for i in range(n_symbols):
+        while have < need:
+            acc = ((acc & ((1 << have) - 1)) << 32) | int.from_bytes(data[pos:pos + 4], "big")
+            pos += 4
+            have += 32
+        entry = table[(acc >> (have - TABLE_BITS)) & mask]
+        if entry is not None:
+            out[i], length = entry
+        else:
+            for length in range(TABLE_BITS + 1, longest + 1):
+                symbol = long_codes.get(((acc >> (have - length)) & ((1 << length) - 1), length))
+                if symbol is not None:
+                    out[i] = symbol
+                    break
+            else:
+                raise ValueError(f"invalid code at bit {8 * pos - have}")
+        have -= length
+    return bytes(out)
+
+
+def benchmark(filename="sherlock.txt", repeat=3):
+    """Throughput of the scalar and NumPy encoders (best of repeat runs)"""
+    with open(filename, "rb") as f:
+        data = f.read()
+    tables = buildCodeTables(data)
+    mb = len(data) / 1e6
+    print(f"{filename}: {len(data)} bytes, {len(tables.code_map)} symbols, longest code {tables.max_length} bits")
+
+    results = {}
+    for name, encode in (("scalar", encodeScalar), ("bulk (NumPy)", encodeBulk)):
+        if encode is encodeBulk and np is None:
+            print("  bulk (NumPy): numpy not installed")
+            continue
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            results[name] = encode(data, tables)
+            best = min(best, time.perf_counter() - t0)
+        payload, total = results[name]
+        print(f"  {name:<13} {mb / best:8.1f} MB/s  -> {len(payload)} bytes ({total / len(data):.2f} bits/byte)")
+
+    if len(results) == 2:
+        assert results["scalar"] == results["bulk (NumPy)"]
+    payload, _ = results["scalar"]
+    t0 = time.perf_counter()
+    assert decodeBlock(payload, len(data), tables) == data
+    print(f"  decode        {mb / (time.perf_counter() - t0):8.1f} MB/s  (round trip ok)")
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else "sherlock.txt")
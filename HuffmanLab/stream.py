@@ -0,0 +1,231 @@
+"""
+Block stream format for Huffman-coded files, with checksums and a verify mode.
+
+Layout (little-endian):
+    header      magic "HUFS", version, block size, number of symbols
+    freqs       (symbol u8, count u64) per symbol, in the order buildTree saw them,
+                so the reader rebuilds exactly the same tree
+    header crc  CRC32 of everything above
+    blocks      raw length u32, payload length u32, CRC32 of the raw bytes,
+                CRC32 of the payload, then the payload
+    end         one block header with raw length 0
+
+Every block is encoded on its own (byte aligned), so blocks can be checked
+or decoded independently. verify streams the file block by block: the
+payload CRC catches damage to the stored bytes, and decoding into a discard
+sink checks the raw CRC too, so a bad table or codec bug is caught as well.
+Nothing larger than one block is held in memory. With workers > 1 the
+blocks are checked in a process pool.
+
+Run: python stream.py compress|decompress|verify ...
+"""
+
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from codec import CodeTables, countByteFrequencies, decodeBlock, encodeBulk
+from main import buildTree, createCodeMap
+
+MAGIC = b"HUFS"
+HEADER = struct.Struct("<4sBIH")        # magic, version, block size, symbols
+FREQ = struct.Struct("<BQ")
+BLOCK = struct.Struct("<IIII")          # raw length, payload length, raw crc, payload crc
+
+
+def _tables(freqs):
+    return CodeTables(createCodeMap(buildTree(freqs)))
+
+
+def compressFile(in_path, out_path, block_size=1 << 16, encode=encodeBulk):
+    """Write in_path as a block stream; the code comes from the whole file's byte counts"""
+    freqs = {}
+    with open(in_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            for symbol, count in countByteFrequencies(block).items():
+                freqs[symbol] = freqs.get(symbol, 0) + count
+    tables = _tables(freqs)
+
+    with open(in_path, "rb") as f, open(out_path, "wb") as out:
+        header = HEADER.pack(MAGIC, 1, block_size, len(freqs))
+        header += b"".join(FREQ.pack(symbol, count) for symbol, count in freqs.items())
+        out.write(header + struct.pack("<I", zlib.crc32(header)))
+        for block in iter(lambda: f.read(block_size), b""):
+            payload, _ = encode(block, tables)
+            out.write(BLOCK.pack(len(block), len(payload), zlib.crc32(block), zlib.crc32(payload)))
+            out.write(payload)
+        out.write(BLOCK.pack(0, 0, 0, 0))
+
+
+def _read_header(f):
+    raw = f.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        raise ValueError("truncated header")
+    magic, version, block_size, n_symbols = HEADER.unpack(raw)
+    if magic != MAGIC or version != 1:
+        raise ValueError("not a Huffman block stream")
+    raw_freqs = f.read(n_symbols * FREQ.size)
+    crc = f.read(4)
+    if len(raw_freqs) < n_symbols * FREQ.size or len(crc) < 4:
+        raise ValueError("truncated header")
+    if zlib.crc32(raw + raw_freqs) != struct.unpack("<I", crc)[0]:
+        raise ValueError("header checksum mismatch")
+    freqs = dict(FREQ.iter_unpack(raw_freqs))
+    return block_size, freqs
+
+
+def _blocks(f, block_size):
+    """(raw length, raw crc, payload crc, payload) per block; raises ValueError if cut short"""
+    while True:
+        raw = f.read(BLOCK.size)
+        if len(raw) < BLOCK.size:
+            raise ValueError("truncated stream (missing end marker)")
+        n_raw, n_payload, crc_raw, crc_payload = BLOCK.unpack(raw)
+        if n_raw == 0:
+            return
+        if n_raw > block_size:
+            raise ValueError(f"block claims {n_raw} bytes, more than the block size")
+        payload = f.read(n_payload)
+        if len(payload) < n_payload:
+            raise ValueError("truncated block")
+        yield n_raw, crc_raw, crc_payload, payload
+
+
+def decompressFile(in_path, out_path):
+    with open(in_path, "rb") as f, open(out_path, "wb") as out:
+        block_size, freqs = _read_header(f)
+        tables = _tables(freqs)
+        for index, (n_raw, crc_raw, crc_payload, payload) in enumerate(_blocks(f, block_size)):
+            problem = _check_block(tables, n_raw, crc_raw, crc_payload, payload, keep=True)
+            if isinstance(problem, str):
+                raise ValueError(f"block {index}: {problem}")
+            out.write(problem)
+
+
+def _check_block(tables, n_raw, crc_raw, crc_payload, payload, keep=False):
+    """None (or the decoded bytes if keep) when the block is good, else what is wrong with it"""
+    if zlib.crc32(payload) != crc_payload:
+        return "payload checksum mismatch"
+    try:
+        data = decodeBlock(payload, n_raw, tables)
+    except ValueError as exc:
+        return str(exc)
+    if zlib.crc32(data) != crc_raw:
+        return "decoded checksum mismatch"
+    return data if keep else None
+
+
+# process-pool side: each worker rebuilds the tables once
+_worker_tables = None
+
+
+def _init_worker(freqs):
+    global _worker_tables
+    _worker_tables = _tables(freqs)
+
+
+def _worker_check(args):
+    return _check_block(_worker_tables, *args)
+
+
+class VerifyResult:
+    def __init__(self, blocks, raw_bytes, bad_block=None, problem=None):
+        self.blocks = blocks            # blocks checked
+        self.raw_bytes = raw_bytes      # bytes decoded (and discarded)
+        self.bad_block = bad_block      # index of the first bad block, or None
+        self.problem = problem
+
+    def ok(self):
+        return self.problem is None
+
+    def __str__(self):
+        if self.ok():
+            return f"ok: {self.blocks} blocks, {self.raw_bytes} bytes"
+        where = f"block {self.bad_block}" if self.bad_block is not None else "stream"
+        return f"bad {where}: {self.problem} ({self.blocks} blocks checked)"
+
+
+def verifyFile(path, workers=1, in_flight=None):
+    """Check every block of a stream without writing anything out; stops at the first bad block"""
+    with open(path, "rb") as f:
+        try:
+            block_size, freqs = _read_header(f)
+        except ValueError as exc:
+            return VerifyResult(0, 0, None, str(exc))
+
+        blocks = raw_bytes = 0
+        if workers <= 1:
+            tables = _tables(freqs)
+            try:
+                for n_raw, crc_raw, crc_payload, payload in _blocks(f, block_size):
+                    problem = _check_block(tables, n_raw, crc_raw, crc_payload, payload)
+                    if problem is not None:
+                        return VerifyResult(blocks, raw_bytes, blocks, problem)
+                    blocks += 1
+                    raw_bytes += n_raw
+            except ValueError as exc:
+                return VerifyResult(blocks, raw_bytes, blocks, str(exc))
+            return VerifyResult(blocks, raw_bytes)
+
+        # parallel: keep a bounded window of blocks in the pool, results in order
+        in_flight = in_flight or 4 * workers
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(freqs,)) as pool:
+            pending = []
+            stream_problem = None
+            reader = _blocks(f, block_size)
+            while True:
+                while len(pending) < in_flight and stream_problem is None:
+                    try:
+                        n_raw, crc_raw, crc_payload, payload = next(reader)
+                    except StopIteration:
+                        break
+                    except ValueError as exc:
+                        stream_problem = str(exc)
+                        break
+                    pending.append((n_raw, pool.submit(_worker_check, (n_raw, crc_raw, crc_payload, payload))))
+                if not pending:
+                    break
+                n_raw, future = pending.pop(0)
+                problem = future.result()
+                if problem is not None:
+                    for _, later in pending:
+                        later.cancel()
+                    return VerifyResult(blocks, raw_bytes, blocks, problem)
+                blocks += 1
+                raw_bytes += n_raw
+            if stream_problem is not None:
+                return VerifyResult(blocks, raw_bytes, blocks, stream_problem)
+        return VerifyResult(blocks, raw_bytes)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import time
+
+    parser = argparse.ArgumentParser(description="Huffman block streams")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("compress")
+    p.add_argument("src")
+    p.add_argument("dst")
+    p.add_argument("--block-size", type=int, default=1 << 16)
+    p = sub.add_parser("decompress")
+    p.add_argument("src")
+    p.add_argument("dst")
+    p = sub.add_parser("verify")
+    p.add_argument("src")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.command == "compress":
+        compressFile(args.src, args.dst, args.block_size)
+        print(f"{os.path.getsize(args.src)} -> {os.path.getsize(args.dst)} bytes")
+    elif args.command == "decompress":
+        decompressFile(args.src, args.dst)
+    else:
+        result = verifyFile(args.src, args.workers)
+        print(result)
+        if not result.ok():
+            raise SystemExit(1)
+    print(f"{time.perf_counter() - t0:.2f} s")
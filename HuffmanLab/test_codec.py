@@ -0,0 +1,41 @@
+import os
+import random
+
+import pytest
+
+from codec import buildCodeTables, decodeBlock, encodeBulk, encodeScalar
+
+
+def sampleBlocks():
+    rng = random.Random(0)
+    with open(os.path.join(os.path.dirname(__file__), "sherlock.txt"), "rb") as f:
+        text = f.read(200_000)
+    skewed = bytes(rng.choices(range(256), weights=[2 ** -(i % 40) for i in range(256)], k=50_000))
+    return [b"a", b"ab" * 10, text, skewed, bytes(range(256)) * 20]
+
+
+def test_scalar_round_trip():
+    for data in sampleBlocks():
+        tables = buildCodeTables(data)
+        payload, bits = encodeScalar(data, tables)
+        assert len(payload) == (bits + 7) // 8
+        assert decodeBlock(payload, len(data), tables) == data
+
+
+def test_bulk_matches_scalar():
+    pytest.importorskip("numpy")
+    for data in sampleBlocks():
+        tables = buildCodeTables(data)
+        # every block here has codes of at most 32 bits, so the NumPy path really runs
+        assert tables.max_length <= 32
+        payload, bits = encodeBulk(data, tables)
+        assert (payload, bits) == encodeScalar(data, tables)
+        assert decodeBlock(payload, len(data), tables) == data
+
+
+def test_missing_byte_is_an_error():
+    tables = buildCodeTables(b"abc")
+    with pytest.raises(ValueError, match="byte 122"):
+        encodeScalar(b"abz", tables)
+    with pytest.raises(ValueError, match="byte 122"):
+        encodeBulk(b"abz", tables)
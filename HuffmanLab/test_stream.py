@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from codec import encodeScalar
+from stream import BLOCK, FREQ, HEADER, compressFile, decompressFile, verifyFile
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "sherlock.txt")
+
+
+@pytest.fixture
+def packed(tmp_path):
+    source = tmp_path / "in.txt"
+    with open(SAMPLE, "rb") as f:
+        source.write_bytes(f.read(100_000))
+    out = tmp_path / "in.huf"
+    compressFile(str(source), str(out), block_size=1 << 14)
+    return source, out
+
+
+def blockOffsets(data):
+    """File offset of every block header, end marker excluded"""
+    n_symbols = HEADER.unpack_from(data, 0)[3]
+    pos = HEADER.size + n_symbols * FREQ.size + 4
+    offsets = []
+    while BLOCK.unpack_from(data, pos)[0]:
+        offsets.append(pos)
+        pos += BLOCK.size + BLOCK.unpack_from(data, pos)[1]
+    return offsets
+
+
+def test_round_trip_and_verify(packed, tmp_path):
+    source, out = packed
+    back = tmp_path / "back.txt"
+    decompressFile(str(out), str(back))
+    assert back.read_bytes() == source.read_bytes()
+    for workers in (1, 2):
+        result = verifyFile(str(out), workers=workers)
+        assert result.ok() and result.blocks == 7 and result.raw_bytes == 100_000
+
+
+def test_scalar_encoder_writes_the_same_stream(packed, tmp_path):
+    source, out = packed
+    scalar = tmp_path / "scalar.huf"
+    compressFile(str(source), str(scalar), block_size=1 << 14, encode=encodeScalar)
+    assert scalar.read_bytes() == out.read_bytes()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_damaged_payload_is_found_in_its_block(packed, workers):
+    _, out = packed
+    data = bytearray(out.read_bytes())
+    third = blockOffsets(data)[3]
+    data[third + BLOCK.size + 10] ^= 0x40
+    out.write_bytes(data)
+    result = verifyFile(str(out), workers=workers)
+    assert (result.bad_block, result.problem) == (3, "payload checksum mismatch")
+    with pytest.raises(ValueError, match="block 3"):
+        decompressFile(str(out), str(out) + ".back")
+
+
+def test_wrong_raw_crc_behind_a_good_payload_is_found(packed):
+    # the payload decodes cleanly but to bytes the writer did not checksum
+    _, out = packed
+    data = bytearray(out.read_bytes())
+    first = blockOffsets(data)[0]
+    n_raw, n_payload, crc_raw, crc_payload = BLOCK.unpack_from(data, first)
+    BLOCK.pack_into(data, first, n_raw, n_payload, crc_raw ^ 1, crc_payload)
+    out.write_bytes(data)
+    result = verifyFile(str(out))
+    assert (result.bad_block, result.problem) == (0, "decoded checksum mismatch")
+
+
+def test_header_damage_and_truncation(packed):
+    _, out = packed
+    data = out.read_bytes()
+    out.write_bytes(data[:HEADER.size + 3] + bytes([data[HEADER.size + 3] ^ 1]) + data[HEADER.size + 4:])
+    assert verifyFile(str(out)).problem == "header checksum mismatch"
+
+    out.write_bytes(data[:-BLOCK.size])
+    result = verifyFile(str(out))
+    assert result.problem == "truncated stream (missing end marker)" and result.blocks == 7
+
+    out.write_bytes(data[:blockOffsets(data)[2] + BLOCK.size + 5])
+    assert verifyFile(str(out), workers=2).problem == "truncated block"
+    with pytest.raises(ValueError):
+        decompressFile(str(out), str(out) + ".back")
+
+    out.write_bytes(b"nope" + data[4:])
+    assert verifyFile(str(out)).problem == "not a Huffman block stream"
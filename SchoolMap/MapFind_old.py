@@ -6,24 +6,23 @@ from typing import Dict, List
 class SchoolGraph:
     """
     Graph represented by an adjacency list:
-        adj[room_name] = list of neighboring room_names
+        adj[room_name] = neighboring room_names, as dict keys (values unused)
     """
 
     def __init__(self) -> None:
-        # Map from room name to list of neighbors (room names)
-        self.adj: Dict[str, List[str]] = defaultdict(list)
+        # Map from room name to its neighbors. A dict works as an ordered set:
+        # O(1) duplicate check on insert, and neighbors keep insertion order.
+        self.adj: Dict[str, Dict[str, None]] = defaultdict(dict)
 
     def add_edge(self, u: str, v: str, undirected: bool = True) -> None:
         """Add an edge between room u and room v."""
-        if v not in self.adj[u]:
-            self.adj[u].append(v)
+        self.adj[u][v] = None
         if undirected:
-            if u not in self.adj[v]:
-                self.adj[v].append(u)
+            self.adj[v][u] = None
 
     def neighbors(self, room: str) -> List[str]:
         """Return the neighbors of a given room."""
-        return self.adj.get(room, [])
+        return list(self.adj.get(room, {}))
 
     def rooms(self) -> List[str]:
         """Return all room names in the graph."""
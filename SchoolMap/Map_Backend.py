@@ -0,0 +1,167 @@
+'''
+Adjacency backends: the one interface every SchoolGraph traversal runs against.
+
+The traversals only ever call adj.get(v, default), adj[v], iterate the
+rooms, len(adj), adj.keys() and adj.items(), so any read-only Mapping
+from room index to a sequence of neighbor indices works. Four
+implementations exist:
+
+    dict        dict[int, list[int]]          CSV loader; the only editable one
+    list        ListAdjacency                 preallocated list of rows (MapFind2_old's layout)
+    csr         Map_Snapshot.CSRAdjacency     offsets + targets arrays (snapshots, load_csv_checked)
+    compressed  Map_Compressed.CompressedAdjacency   Huffman-coded rows, decoded per lookup
+
+weights follow the same interface (same rows, floats). Editing a graph on a
+read-only backend thaws it back into dicts first (SchoolGraph._make_mutable).
+
+choose_backend picks one from the number of rooms; open_graph reads a CSV
+straight into it.
+'''
+
+import sys
+from array import array
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Protocol, runtime_checkable
+
+# rooms up to which the editable dict backend is used; CSR above, compressed above that
+DICT_LIMIT = 200_000
+COMPRESSED_LIMIT = 5_000_000
+
+
+@runtime_checkable
+class AdjacencyBackend(Protocol):
+    '''What SchoolGraph needs from self.adj (and self.weights)'''
+
+    def get(self, v: int, default=None): ...
+
+    def __getitem__(self, v: int) -> Sequence: ...
+
+    def __iter__(self) -> Iterator[int]: ...
+
+    def __len__(self) -> int: ...
+
+    def keys(self): ...
+
+    def items(self): ...
+
+
+class ListAdjacency(Mapping):
+    '''idx -> row, stored in a list sized to the largest index (None = no room)'''
+
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+        self._count = sum(1 for row in rows if row is not None)
+
+    @classmethod
+    def from_mapping(cls, adj) -> "ListAdjacency":
+        rows: list = [None] * (max(adj.keys(), default=-1) + 1)
+        for v, row in adj.items():
+            rows[v] = list(row)
+        return cls(rows)
+
+    def __getitem__(self, v: int):
+        row = self.rows[v] if 0 <= v < len(self.rows) else None
+        if row is None:
+            raise KeyError(v)
+        return row
+
+    def get(self, v: int, default=None):
+        if 0 <= v < len(self.rows):
+            row = self.rows[v]
+            if row is not None:
+                return row
+        return default
+
+    def __iter__(self) -> Iterator[int]:
+        return (v for v, row in enumerate(self.rows) if row is not None)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def backend_name(adj: AdjacencyBackend) -> str:
+    if isinstance(adj, dict):
+        return "dict"
+    if isinstance(adj, ListAdjacency):
+        return "list"
+    if hasattr(adj, "offsets"):
+        return "csr"
+    if hasattr(adj, "bit_offsets"):
+        return "compressed"
+    return type(adj).__name__
+
+
+def choose_backend(n_rooms: int, weighted: bool = False) -> str:
+    '''dict while small enough to edit cheaply, CSR for big maps, compressed for huge unweighted ones'''
+    if n_rooms <= DICT_LIMIT:
+        return "dict"
+    if n_rooms <= COMPRESSED_LIMIT or weighted:
+        return "csr"
+    return "compressed"
+
+
+def convert(graph, backend: str) -> None:
+    '''Switch graph.adj / graph.weights to the named backend in place (the graph itself is unchanged)'''
+    from Map_Snapshot import CSRAdjacency, UnitWeights
+
+    current = backend_name(graph.adj)
+    if backend == current:
+        return
+    if backend == "dict":
+        graph._make_mutable()
+        return
+
+    adj: AdjacencyBackend
+    weights: AdjacencyBackend
+    if backend == "list":
+        adj = ListAdjacency.from_mapping(graph.adj)
+        weights = ListAdjacency.from_mapping(graph.weights) if graph.has_weights else UnitWeights(adj)
+    elif backend == "csr":
+        offsets, targets = graph.to_csr()
+        present = array("B", bytes(len(offsets) - 1))
+        for v in graph.adj.keys():
+            present[v] = 1
+        adj = CSRAdjacency(offsets, targets, present)
+        if graph.has_weights:
+            edge_w = array("d")
+            for v in range(len(present)):
+                edge_w.extend(graph.weights.get(v, []))
+            weights = CSRAdjacency(offsets, edge_w, present)
+        else:
+            weights = UnitWeights(adj)
+    elif backend == "compressed":
+        graph.compress_adjacency()
+        return
+    else:
+        raise ValueError(f"unknown backend {backend!r} (dict, list, csr or compressed)")
+    if not isinstance(adj, AdjacencyBackend):
+        raise TypeError(f"{type(adj).__name__} does not implement AdjacencyBackend")
+    graph.adj = adj
+    graph.weights = weights
+    graph._clear_bfs_cache()
+
+
+def _count_rows(csv_path: str) -> int:
+    with open(csv_path, "rb") as f:
+        return max(0, sum(1 for _ in f) - 1)     # minus the header
+
+
+def open_graph(graph_cls, csv_path: str, backend: str = "auto"):
+    '''Load csv_path into the named backend, or the one choose_backend picks for its size.
+
+    The dict backend uses the strict CSV loader (bad rows raise ValueError);
+    the others use the streaming one, whose LoadReport ends up in
+    graph.load_report and is printed to stderr if it found problems.'''
+    if backend == "auto":
+        backend = choose_backend(_count_rows(csv_path))
+    if backend == "dict":
+        return graph_cls(csv_path)
+    # the streaming loader already builds CSR arrays without per-row dicts
+    graph, report = graph_cls.load_csv_checked(csv_path)
+    graph.load_report = report
+    if not report.ok():
+        print(f"{csv_path}: {report}", file=sys.stderr)
+    if backend == "compressed" and graph.has_weights:
+        backend = "csr"
+    convert(graph, backend)
+    return graph
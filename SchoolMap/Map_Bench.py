@@ -0,0 +1,837 @@
+'''
+Benchmarks for the SchoolGraph path queries.
+
+Run from the SchoolMap folder:
+    python Map_Bench.py                           every benchmark, printed
+    python Map_Bench.py suite --out before.json   regression suite as JSON
+    python Map_Bench.py compare before.json after.json
+
+The suite times CSV load, bfs_path, dfs_path, both spanning trees and
+graph_eccentricity on grid, random geometric, scale-free and replicated
+HM_Graph.csv graphs, with tracemalloc peak memory for each. compare lists
+everything that got more than 20% slower or bigger (exit status 1).
+'''
+
+import argparse
+import csv
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+from Map_Find import FLOOR_HEIGHT, SchoolGraph, np
+
+
+# ---------------------------------------------------------------
+# Graph generators
+# ---------------------------------------------------------------
+def grid_building(floors: int, rows: int, cols: int, spacing: float = 5.0,
+                  stairs_every: int = 4) -> SchoolGraph:
+    '''Grid of rooms on each floor, floors joined by stairwells.
+
+    Weights are the real distances between rooms, so A*'s straight-line
+    heuristic is a valid lower bound on this graph.'''
+    adj: dict[int, list[int]] = {}
+    weights: dict[int, list[float]] = {}
+    coords: dict[int, tuple[float, float, float]] = {}
+
+    def vid(f: int, r: int, c: int) -> int:
+        return (f * rows + r) * cols + c
+
+    for f in range(floors):
+        for r in range(rows):
+            for c in range(cols):
+                v = vid(f, r, c)
+                adj[v] = []
+                weights[v] = []
+                coords[v] = (c * spacing, r * spacing, float(f))
+
+    def link(u: int, v: int, w: float) -> None:
+        adj[u].append(v)
+        weights[u].append(w)
+        adj[v].append(u)
+        weights[v].append(w)
+
+    for f in range(floors):
+        for r in range(rows):
+            for c in range(cols):
+                if c + 1 < cols:
+                    link(vid(f, r, c), vid(f, r, c + 1), spacing)
+                if r + 1 < rows:
+                    link(vid(f, r, c), vid(f, r + 1, c), spacing)
+                if f + 1 < floors and r % stairs_every == 0 and c % stairs_every == 0:
+                    link(vid(f, r, c), vid(f + 1, r, c), FLOOR_HEIGHT)
+
+    return SchoolGraph.from_adjacency(adj, weights=weights, coords=coords)
+
+
+def campus_graph(buildings: int, floors: int, rows: int, cols: int) -> tuple[SchoolGraph, dict[int, str]]:
+    '''Several grid buildings on a ring road; returns the graph and a building/floor label per room.
+
+    Each floor is a rows x cols grid with two stairwells; the ground floor
+    has one exit onto a ring of outdoor path segments.'''
+    adj: dict[int, list[int]] = {}
+    label: dict[int, str] = {}
+    per_floor = rows * cols
+
+    def link(u: int, v: int) -> None:
+        adj[u].append(v)
+        adj[v].append(u)
+
+    ring = list(range(buildings))
+    for v in ring:
+        adj[v] = []
+        label[v] = "outside"
+    for i in ring:
+        link(i, (i + 1) % buildings)
+
+    next_id = buildings
+    for b in range(buildings):
+        base = next_id
+        for f in range(floors):
+            for r in range(rows):
+                for c in range(cols):
+                    v = base + f * per_floor + r * cols + c
+                    adj[v] = []
+                    label[v] = f"B{b}F{f}"
+                    if c > 0:
+                        link(v, v - 1)
+                    if r > 0:
+                        link(v, v - cols)
+            if f > 0:
+                for stair in (0, per_floor - 1):
+                    link(base + f * per_floor + stair, base + (f - 1) * per_floor + stair)
+        link(b, base + (rows // 2) * cols)      # front door on the ground floor
+        next_id = base + floors * per_floor
+
+    return SchoolGraph.from_adjacency(adj), label
+
+
+def path_graph(n: int) -> SchoolGraph:
+    '''One long corridor: room i connects to rooms i-1 and i+1'''
+    adj = {i: [j for j in (i - 1, i + 1) if 0 <= j < n] for i in range(n)}
+    return SchoolGraph.from_adjacency(adj)
+
+
+def random_geometric(n: int, degree: float = 6.0, seed: int = 0) -> SchoolGraph:
+    '''n rooms scattered on a 1000 x 1000 floor, linked when closer than the radius giving ~degree neighbors'''
+    rng = random.Random(seed)
+    side = 1000.0
+    radius = side * math.sqrt(degree / (math.pi * n))
+    points = [(rng.random() * side, rng.random() * side) for _ in range(n)]
+
+    # bucket the points into radius-sized cells so each room only checks 9 cells
+    cells: dict[tuple[int, int], list[int]] = {}
+    for v, (x, y) in enumerate(points):
+        cells.setdefault((int(x // radius), int(y // radius)), []).append(v)
+
+    adj: dict[int, list[int]] = {v: [] for v in range(n)}
+    weights: dict[int, list[float]] = {v: [] for v in range(n)}
+    for v, (x, y) in enumerate(points):
+        cx, cy = int(x // radius), int(y // radius)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for u in cells.get((cx + dx, cy + dy), []):
+                    if u != v:
+                        d = math.dist(points[u], points[v])
+                        if d <= radius:
+                            adj[v].append(u)
+                            weights[v].append(d)
+    coords = {v: (x, y, 0.0) for v, (x, y) in enumerate(points)}
+    return SchoolGraph.from_adjacency(adj, weights=weights, coords=coords)
+
+
+def scale_free(n: int, links: int = 2, seed: int = 0) -> SchoolGraph:
+    '''Barabasi-Albert preferential attachment: a few hub rooms with very high degree'''
+    rng = random.Random(seed)
+    adj: dict[int, list[int]] = {v: [] for v in range(n)}
+    ends: list[int] = []    # every edge end once, so a uniform pick is degree-proportional
+    for v in range(min(links + 1, n)):
+        for u in range(v):
+            adj[u].append(v)
+            adj[v].append(u)
+            ends += [u, v]
+    for v in range(links + 1, n):
+        chosen: set[int] = set()
+        while len(chosen) < links:
+            chosen.add(rng.choice(ends))
+        for u in chosen:
+            adj[u].append(v)
+            adj[v].append(u)
+            ends += [u, v]
+    return SchoolGraph.from_adjacency(adj)
+
+
+def replicated_hm(copies: int, csv_path: str = "HM_Graph.csv") -> SchoolGraph:
+    '''copies of the Horace Mann graph, each entrance room linked to the next copy's'''
+    base = SchoolGraph(csv_path)
+    span = max(base.adj) + 1
+    entrance = base.name_to_idx["Olshan Lobby"]
+    adj: dict[int, list[int]] = {}
+    names: dict[int, str] = {}
+    for k in range(copies):
+        for v, neighbors in base.adj.items():
+            adj[k * span + v] = [k * span + u for u in neighbors]
+            names[k * span + v] = f"{base.idx_to_name[v]} #{k}"
+    for k in range(copies - 1):
+        adj[k * span + entrance].append((k + 1) * span + entrance)
+        adj[(k + 1) * span + entrance].append(k * span + entrance)
+    return SchoolGraph.from_adjacency(adj, names=names)
+
+
+def write_csv(graph: SchoolGraph, path: str) -> None:
+    '''Write a graph in the HM_Graph.csv format (plus weights/x/y/floor)'''
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["idx", "vertex_name", "adjacencies", "Degree", "Max Degree", "weights", "x", "y", "floor"])
+        for v, neighbors in graph.adj.items():
+            x, y, floor = graph.coords.get(v, ("", "", ""))
+            weights = ",".join(f"{w:g}" for w in graph.weights[v]) if graph.has_weights else ""
+            writer.writerow([v, graph.idx_to_name[v], ",".join(map(str, neighbors)), len(neighbors), "",
+                             weights, x, y, floor])
+
+
+# ---------------------------------------------------------------
+# Timing helpers
+# ---------------------------------------------------------------
+def random_pairs(graph: SchoolGraph, count: int, seed: int = 0) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    names = list(graph.name_to_idx)
+    return [(rng.choice(names), rng.choice(names)) for _ in range(count)]
+
+
+def time_queries(query, pairs: list[tuple[str, str]]) -> float:
+    '''Average seconds per query'''
+    t0 = time.perf_counter()
+    for start, end in pairs:
+        query(start, end)
+    return (time.perf_counter() - t0) / len(pairs)
+
+
+def bench_weighted(label: str, graph: SchoolGraph, n_pairs: int = 50) -> None:
+    pairs = random_pairs(graph, n_pairs)
+    print(f"\n{label}: {graph.num_vertices()} rooms")
+    for name, query in [("bfs_path", graph.bfs_path),
+                        ("dijkstra_path", graph.dijkstra_path),
+                        ("astar_path", graph.astar_path)]:
+        avg = time_queries(query, pairs)
+        print(f"  {name:<14} {avg * 1000:8.3f} ms/query")
+
+    # hop-count paths are usually longer to walk than the weighted ones
+    start, end = pairs[0]
+    for name, query in [("bfs_path", graph.bfs_path), ("dijkstra_path", graph.dijkstra_path)]:
+        path = query(start, end)
+        if path is not None:
+            print(f"  {name:<14} {len(path) - 1} hops, cost {graph.path_cost(path):.1f}")
+
+
+def bench_cached(label: str, graph: SchoolGraph, n_queries: int = 2000, n_sources: int = 10) -> None:
+    '''Kiosk workload: a few popular start rooms, many destinations'''
+    rng = random.Random(1)
+    names = list(graph.name_to_idx)
+    sources = rng.sample(names, n_sources)
+    pairs = [(rng.choice(sources), rng.choice(names)) for _ in range(n_queries)]
+
+    print(f"\n{label}: {n_queries} queries from {n_sources} kiosks")
+    print(f"  bfs_path        {time_queries(graph.bfs_path, pairs) * 1e6:8.1f} us/query")
+    print(f"  cached_bfs_path {time_queries(graph.cached_bfs_path, pairs) * 1e6:8.1f} us/query")
+    print(f"  {graph.cache_info()}")
+
+
+def bench_updates(csv_path: str = "HM_Graph.csv", n_updates: int = 200, n_sources: int = 10) -> None:
+    '''Close and reopen hallways: incremental tree repair vs reloading the CSV'''
+    graph = SchoolGraph(csv_path)
+    rng = random.Random(2)
+    names = list(graph.name_to_idx)
+    for name in rng.sample(names, n_sources):
+        graph.bfs_tree_from(graph.name_to_idx[name])
+
+    edges = [(graph.idx_to_name[u], graph.idx_to_name[v])
+             for u in graph.adj for v in graph.adj[u] if u < v]
+    closed = rng.sample(edges, n_updates // 2)
+
+    t0 = time.perf_counter()
+    for u, v in closed:
+        graph.remove_edge(u, v)
+    for u, v in closed:
+        graph.add_edge(u, v)
+    incremental = (time.perf_counter() - t0) / n_updates
+
+    t0 = time.perf_counter()
+    SchoolGraph(csv_path)
+    reload = time.perf_counter() - t0
+
+    print(f"\n{csv_path}: {n_updates} edge updates with {n_sources} cached trees")
+    print(f"  incremental repair {incremental * 1e6:8.1f} us/update")
+    print(f"  reload CSV         {reload * 1e6:8.1f} us (before any BFS is redone)")
+
+
+def dict_bfs_tree(graph: SchoolGraph, start: int) -> tuple[dict[int, int], dict[int, int]]:
+    '''The old dict-based full BFS (parent, distance), kept as a reference'''
+    queue = deque([start])
+    parent: dict[int, int] = {}
+    dist: dict[int, int] = {start: 0}
+    while queue:
+        current = queue.popleft()
+        d = dist[current] + 1
+        for neighbor in graph.adj.get(current, []):
+            if neighbor not in dist:
+                dist[neighbor] = d
+                parent[neighbor] = current
+                queue.append(neighbor)
+    return parent, dist
+
+
+def bench_bfs_result(sides: tuple[int, ...] = (100, 300)) -> None:
+    '''BFSResult arrays vs the dict BFS: memory per cached source, and path + tree + distances from one room'''
+    print("\nPer-source BFS results (parent/distance arrays)")
+    for side in sides:
+        graph = grid_building(1, side, side)
+        start, end = "Room 0", f"Room {side * side - 1}"
+        _, t_dict, m_dict = peak_memory(lambda: dict_bfs_tree(graph, 0))
+        _, t_first, m_array = peak_memory(lambda: (graph.invalidate_path_cache(), graph.bfs_tree_from(0)))
+
+        # what the __main__ demo does: a path, the spanning tree and the distances from one room
+        graph.invalidate_path_cache()
+        t0 = time.perf_counter()
+        graph.cached_bfs_path(start, end)
+        graph.bfs_spanning_tree(start)
+        graph.bfs_distances_from(0)
+        t_shared = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        graph.bfs_path(start, end)
+        for _ in range(2):
+            dict_bfs_tree(graph, 0)
+        t_separate = time.perf_counter() - t0
+        print(f"  {side * side:>7} rooms  dict BFS {t_dict * 1000:7.1f} ms {m_dict / 2**20:6.2f} MiB"
+              f"  array BFS {t_first * 1000:7.1f} ms {m_array / 2**20:6.2f} MiB")
+        print(f"  {'':>13}path + tree + distances: three BFS {t_separate * 1000:7.1f} ms"
+              f"  one shared result {t_shared * 1000:7.1f} ms")
+
+
+def recursive_dfs_tree(graph: SchoolGraph, start: int) -> dict[int, int]:
+    '''The old recursive DFS, kept as a reference for order and speed'''
+    visited: set[int] = set()
+    parent: dict[int, int] = {}
+
+    def dfs(current: int) -> None:
+        visited.add(current)
+        for neighbor in graph.adj.get(current, []):
+            if neighbor not in visited:
+                parent[neighbor] = current
+                dfs(neighbor)
+
+    dfs(start)
+    return parent
+
+
+def bench_dfs(n: int = 1_000_000) -> None:
+    '''Iterative DFS vs the recursive version, then a corridor of n rooms'''
+    graph = SchoolGraph("HM_Graph.csv")
+    for start in graph.adj:
+        parent, _, _ = graph._dfs(start)
+        assert list(parent.items()) == list(recursive_dfs_tree(graph, start).items())
+
+    t0 = time.perf_counter()
+    for start in graph.adj:
+        recursive_dfs_tree(graph, start)
+    t_rec = (time.perf_counter() - t0) / graph.num_vertices()
+    t0 = time.perf_counter()
+    for start in graph.adj:
+        graph._dfs(start)
+    t_it = (time.perf_counter() - t0) / graph.num_vertices()
+    print("\nDFS spanning tree on HM_Graph.csv (same parent trees)")
+    print(f"  recursive {t_rec * 1e6:8.1f} us/tree")
+    print(f"  iterative {t_it * 1e6:8.1f} us/tree")
+
+    corridor = path_graph(n)
+    try:
+        recursive_dfs_tree(corridor, 0)
+        print(f"  recursive on {n} rooms: ok")
+    except RecursionError:
+        print(f"  recursive on {n} rooms: RecursionError")
+    t0 = time.perf_counter()
+    path = corridor.dfs_path("Room 0", f"Room {n - 1}")
+    print(f"  iterative dfs_path over {n} rooms: {time.perf_counter() - t0:.2f} s, {len(path)} rooms")
+    t0 = time.perf_counter()
+    tree = corridor.dfs_spanning_tree("Room 0")
+    print(f"  iterative dfs_spanning_tree over {n} rooms: {time.perf_counter() - t0:.2f} s, {len(tree)} rooms")
+
+
+def bench_startup(sizes: tuple[int, ...] = (30, 100, 300)) -> None:
+    '''Process startup: parse the CSV vs open a binary snapshot'''
+    print("\nStartup: CSV parse vs memory-mapped snapshot")
+    with tempfile.TemporaryDirectory() as tmp:
+        graphs = [("HM_Graph.csv", "HM_Graph.csv")]
+        for side in sizes:
+            path = os.path.join(tmp, f"grid{side}.csv")
+            write_csv(grid_building(1, side, side), path)
+            graphs.append((f"grid 1x{side}x{side}", path))
+
+        for label, csv_path in graphs:
+            snap_path = os.path.join(tmp, "graph.snap")
+            t0 = time.perf_counter()
+            graph = SchoolGraph(csv_path)
+            t_csv = time.perf_counter() - t0
+            graph.save_snapshot(snap_path)
+
+            t0 = time.perf_counter()
+            snap = SchoolGraph.load_snapshot(snap_path)
+            t_snap = time.perf_counter() - t0
+            start, end = random_pairs(graph, 1)[0]
+            t0 = time.perf_counter()
+            snap.bfs_path(start, end)
+            t_query = time.perf_counter() - t0
+
+            print(f"  {label:<16} {graph.num_vertices():>7} rooms  csv {t_csv * 1000:8.1f} ms"
+                  f"  snapshot {t_snap * 1000:6.2f} ms ({os.path.getsize(snap_path) // 1024} KiB)"
+                  f"  first bfs_path {t_query * 1000:7.1f} ms")
+
+
+def peak_memory(fn):
+    '''Run fn() and return (result, seconds, peak traced bytes).
+
+    tracemalloc slows allocation-heavy code a lot, so the time comes from
+    a second, untraced run.'''
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0, peak
+
+
+def bench_loader(sides: tuple[int, ...] = (100, 300)) -> None:
+    '''Dict-per-row CSV loader vs the streaming typed-array loader'''
+    print("\nCSV loaders: time and peak memory")
+    with tempfile.TemporaryDirectory() as tmp:
+        for side in sides:
+            path = os.path.join(tmp, f"grid{side}.csv")
+            write_csv(grid_building(1, side, side), path)
+            _, t_dict, m_dict = peak_memory(lambda: SchoolGraph(path))
+            (_, report), t_stream, m_stream = peak_memory(lambda: SchoolGraph.load_csv_checked(path))
+            print(f"  {side * side:>8} rooms  SchoolGraph(csv) {t_dict:6.2f} s {m_dict / 2**20:7.1f} MiB"
+                  f"  load_csv_checked {t_stream:6.2f} s {m_stream / 2**20:7.1f} MiB"
+                  f"  problems: {sum(report.counts.values())}")
+
+
+def bench_levels(sides: tuple[int, ...] = (320, 1000)) -> None:
+    '''bfs_distances_from vs level-synchronous bfs_levels on 10^5 - 10^6 rooms'''
+    print(f"\nFull BFS from one room (NumPy {'available' if np is not None else 'missing'})")
+    for side in sides:
+        graph = grid_building(1, side, side)
+        graph._csr_arrays()     # one-time CSR conversion, not part of the search
+        timings = [("bfs_distances_from", lambda: graph.bfs_distances_from(0)),
+                   ("bfs_levels python", lambda: graph.bfs_levels(0, vectorized=False))]
+        if np is not None:
+            timings.append(("bfs_levels numpy", lambda: graph.bfs_levels(0)))
+        print(f"  {side * side} rooms")
+        for label, fn in timings:
+            t0 = time.perf_counter()
+            fn()
+            print(f"    {label:<20} {time.perf_counter() - t0:7.3f} s")
+
+
+def campus_names(n: int, seed: int = 0) -> dict[int, str]:
+    '''n distinct room names in the style of HM_Graph.csv'''
+    rng = random.Random(seed)
+    buildings = ["Rose", "Fisher", "Tillinghast", "Olshan", "Spence", "Lutnick", "Freidman", "Mapp",
+                 "Pforzheimer", "Katz", "Weston", "Gross", "Kaplan", "Horace", "Riverdale", "Hackley"]
+    kinds = ["Hallway", "Lobby", "Stair", "Elevator", "Classroom", "Lab", "Office", "Storage Closet",
+             "Studio", "Atrium", "Vestibule", "Library", "Gym", "Locker Room", "Lounge", "Kitchen"]
+    names: dict[int, str] = {}
+    seen: set[str] = set()
+    while len(names) < n:
+        name = f"{rng.choice(buildings)} {rng.choice(kinds)} {rng.randint(1, 4000)}"
+        if name not in seen:
+            seen.add(name)
+            names[len(names)] = name
+    return names
+
+
+def _typo(rng: random.Random, name: str) -> str:
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice("aeiourst") + name[i + 1:]
+
+
+def bench_names(n: int = 100_000, n_queries: int = 1000) -> None:
+    '''Prefix / fuzzy room lookups on n generated names'''
+    from Map_Names import RoomNameIndex
+
+    names = campus_names(n)
+    t0 = time.perf_counter()
+    index = RoomNameIndex(names)
+    print(f"\nRoom-name index over {n} names: built in {time.perf_counter() - t0:.2f} s")
+
+    rng = random.Random(3)
+    picks = [names[rng.randrange(n)] for _ in range(n_queries)]
+    queries = [("exact", picks),
+               ("prefix", [p[:rng.randint(3, 8)] for p in picks]),
+               ("word prefix", [p.split(" ", 1)[1][:6] for p in picks]),
+               ("one typo", [_typo(rng, p) for p in picks])]
+    for label, batch in queries:
+        times = []
+        hits = 0
+        for q, intended in zip(batch, picks):
+            t0 = time.perf_counter()
+            best = index.resolve(q)
+            times.append(time.perf_counter() - t0)
+            hits += names[best] == intended or index.exact(intended)[0] in index.prefix(q, 10)
+        times.sort()
+        print(f"  {label:<12} median {times[len(times) // 2] * 1000:6.3f} ms  p90 {times[len(times) * 9 // 10] * 1000:6.3f} ms"
+              f"  ({hits}/{len(batch)} intended room resolved or in the top 10 prefixes)")
+
+def bench_hierarchy(configs=((10, 4, 20, 20), (20, 6, 30, 30)), n_pairs: int = 50) -> None:
+    '''bfs_path vs HierarchicalRouter with building/floor clusters'''
+    from Map_Hierarchy import HierarchicalRouter
+
+    print("\nHierarchical routing (clusters = building floors)")
+    for config in configs:
+        graph, labels = campus_graph(*config)
+        t0 = time.perf_counter()
+        router = HierarchicalRouter(graph, labels)
+        t_build = time.perf_counter() - t0
+        pairs = random_pairs(graph, n_pairs)
+        for start, end in pairs:
+            assert len(router.path(start, end)) == len(graph.bfs_path(start, end))
+        t_bfs = time.perf_counter()
+        for start, end in pairs:
+            graph.bfs_path(start, end)
+        t_bfs = (time.perf_counter() - t_bfs) / n_pairs
+        t_hier = time.perf_counter()
+        for start, end in pairs:
+            router.path(start, end)
+        t_hier = (time.perf_counter() - t_hier) / n_pairs
+        print(f"  {graph.num_vertices():>7} rooms {router.stats()['portals']:>5} portals  build {t_build:5.2f} s"
+              f"  bfs_path {t_bfs * 1000:7.2f} ms  overlay {t_hier * 1000:6.3f} ms  ({t_bfs / t_hier:5.1f}x)")
+
+
+def bench_ch(n_pairs: int = 200) -> None:
+    '''bfs_path vs bidirectional_bfs_path vs contraction hierarchy queries'''
+    from Map_CH import ContractionHierarchy
+
+    print("\nContraction hierarchy (unweighted, same hop counts as bfs_path)")
+    graphs = [("HM_Graph.csv", SchoolGraph("HM_Graph.csv")),
+              ("grid 3x30x30", grid_building(3, 30, 30)),
+              ("campus 8x4x15x15", campus_graph(8, 4, 15, 15)[0]),
+              ("campus 20x4x15x15", campus_graph(20, 4, 15, 15)[0])]
+    for label, graph in graphs:
+        t0 = time.perf_counter()
+        ch = ContractionHierarchy.build(graph, weighted=False)
+        t_build = time.perf_counter() - t0
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.ch")
+            ch.save(path)
+            size = os.path.getsize(path)
+            t0 = time.perf_counter()
+            ch = ContractionHierarchy.load(graph, path)
+            t_load = time.perf_counter() - t0
+
+        pairs = random_pairs(graph, n_pairs)
+        for start, end in pairs[:20]:
+            assert len(ch.path(start, end)) == len(graph.bfs_path(start, end))
+        t_bfs = time_queries(graph.bfs_path, pairs)
+        t_bi = time_queries(graph.bidirectional_bfs_path, pairs)
+        t_ch = time_queries(ch.path, pairs)
+        print(f"  {label:<17} {graph.num_vertices():>6} rooms  build {t_build:6.2f} s"
+              f"  load {t_load * 1000:5.1f} ms ({size // 1024} KiB, {ch.stats()['shortcuts']} shortcuts)")
+        print(f"  {'':<17} bfs_path {t_bfs * 1000:7.3f} ms  bidirectional {t_bi * 1000:7.3f} ms"
+              f"  CH {t_ch * 1000:6.3f} ms  ({t_bfs / t_ch:5.1f}x vs BFS)")
+
+
+def bench_mst(configs=((3, 60, 60), (5, 100, 100))) -> None:
+    '''Kruskal vs Prim, and the lazy name view vs copying the tree into a name dict'''
+    print("\nMinimum spanning trees")
+    for config in configs:
+        graph = grid_building(*config)
+        parent_k, t_kruskal, m_kruskal = peak_memory(graph.kruskal_mst)
+        parent_p, t_prim, m_prim = peak_memory(graph.prim_mst)
+        assert abs(graph.tree_weight(parent_k) - graph.tree_weight(parent_p)) < 1e-6
+
+        tree = graph.bfs_spanning_tree("Room 0")
+        _, t_dict, m_dict = peak_memory(
+            lambda: {graph.idx_to_name[v]: [graph.idx_to_name[n] for n in nb] for v, nb in tree.items()})
+        _, t_view, m_view = peak_memory(lambda: graph.spanning_tree_names(parent_k)["Room 0"])
+        print(f"  {graph.num_vertices():>7} rooms  kruskal {t_kruskal:5.2f} s {m_kruskal / 2**20:6.1f} MiB"
+              f"  prim {t_prim:5.2f} s {m_prim / 2**20:6.1f} MiB  (weight {graph.tree_weight(parent_k):.0f},"
+              f" parent array {len(parent_k) * parent_k.itemsize // 1024} KiB)")
+        print(f"  {'':>13}name dict copy {t_dict * 1000:6.1f} ms {m_dict / 2**20:6.1f} MiB"
+              f"  lazy view + one lookup {t_view * 1000:6.1f} ms {m_view / 2**20:6.2f} MiB")
+
+
+def bench_trace(n_pairs: int = 500) -> None:
+    '''bfs_path / dfs_path with tracing off vs on (TraceCounters sink)'''
+    from Map_Trace import TraceCounters
+
+    print("\nTraversal instrumentation overhead")
+    for label, graph in [("HM_Graph.csv", SchoolGraph("HM_Graph.csv")), ("grid 4x50x50", grid_building(4, 50, 50))]:
+        pairs = random_pairs(graph, n_pairs)
+        counters = TraceCounters()
+        for query in ("bfs_path", "dfs_path"):
+            off = min(time_queries(getattr(graph, query), pairs) for _ in range(3))
+            with graph.tracing(counters):
+                on = min(time_queries(getattr(graph, query), pairs) for _ in range(3))
+            print(f"  {label:<13} {query}  off {off * 1000:6.3f} ms  on {on * 1000:6.3f} ms")
+        print("   " + str(counters).replace("\n", "\n   "))
+
+
+def bench_backends(n_pairs: int = 100) -> None:
+    '''The same bfs_path / dijkstra_path queries on every adjacency backend'''
+    import Map_Backend, Map_Compressed, Map_Snapshot     # imported up front so tracemalloc skips them
+
+    print("\nAdjacency backends (Map_Backend)")
+    for label, graph in [("HM_Graph.csv", SchoolGraph("HM_Graph.csv")), ("grid 4x50x50", grid_building(4, 50, 50))]:
+        graph.has_weights = False
+        pairs = random_pairs(graph, n_pairs)
+        adj = graph.adj
+        for backend in ("dict", "list", "csr", "compressed"):
+            graph.adj = {v: list(row) for v, row in adj.items()}
+            graph.weights = {v: [1.0] * len(row) for v, row in adj.items()}
+            # bytes still held after the switch (the dict rows are counted by copying them)
+            tracemalloc.start()
+            kept = graph.use_backend(backend) if backend != "dict" else {v: list(row) for v, row in adj.items()}
+            memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del kept
+            t_bfs = min(time_queries(graph.bfs_path, pairs) for _ in range(3))
+            t_dij = time_queries(graph.dijkstra_path, pairs[:20])
+            print(f"  {label:<13} {backend:<10} adjacency {memory / 2**10:8.0f} KiB"
+                  f"  bfs_path {t_bfs * 1000:7.3f} ms  dijkstra_path {t_dij * 1000:7.3f} ms")
+
+
+def bench_routes(k: int = 5, n_pairs: int = 20) -> None:
+    '''k_shortest_paths (Yen) and alternative_route vs a single bfs_path, first call and memoized'''
+    print(f"\nAlternative routes (k = {k})")
+    for label, graph in [("HM_Graph.csv", SchoolGraph("HM_Graph.csv")), ("grid 2x30x30", grid_building(2, 30, 30))]:
+        graph.has_weights = False
+        pairs = random_pairs(graph, n_pairs)
+        t_bfs = time_queries(graph.bfs_path, pairs)
+        t_yen = time_queries(lambda a, b: graph.k_shortest_paths(a, b, k), pairs)
+        t_memo = time_queries(lambda a, b: graph.k_shortest_paths(a, b, k), pairs)
+        t_alt = time_queries(graph.alternative_route, pairs)
+        found = sum(graph.alternative_route(a, b) is not None for a, b in pairs)
+        print(f"  {label:<13} bfs_path {t_bfs * 1000:7.2f} ms  yen {t_yen * 1000:8.2f} ms"
+              f"  memoized {t_memo * 1000:6.3f} ms  alternative {t_alt * 1000:7.2f} ms"
+              f"  ({found}/{n_pairs} pairs have one)")
+
+
+def bench_facility(n_exits: int = 8) -> None:
+    '''Nearest exit for every room: one bfs_path per (room, exit) vs one multi-source search'''
+    print("\nNearest facility for every room")
+    for label, graph in [("HM_Graph.csv", SchoolGraph("HM_Graph.csv")), ("grid 4x50x50", grid_building(4, 50, 50))]:
+        graph.has_weights = False
+        exits = [name for name, _ in random_pairs(graph, n_exits, seed=1)]
+        rooms = list(graph.name_to_idx)
+        t0 = time.perf_counter()
+        graph.nearest_facility(exits)
+        t_multi = time.perf_counter() - t0
+        # the per-room loop is timed on a sample and scaled up
+        sample = rooms[:100]
+        t0 = time.perf_counter()
+        for room in sample:
+            min((len(p) for e in exits if (p := graph.bfs_path(room, e))), default=None)
+        t_loop = (time.perf_counter() - t0) * len(rooms) / len(sample)
+        print(f"  {label:<13} {len(rooms):>6} rooms, {n_exits} exits  bfs_path per pair ~{t_loop:7.2f} s"
+              f"  multi-source {t_multi * 1000:7.1f} ms")
+
+
+def bench_betweenness(samples: tuple[int, ...] = (50, 200)) -> None:
+    '''Exact Brandes (one process vs a pool) and sampled estimates with their Hoeffding bounds'''
+    workers = os.cpu_count() or 1
+    print(f"\nBetweenness centrality ({workers} CPUs)")
+    for label, graph in [("HM_Graph.csv", SchoolGraph("HM_Graph.csv")), ("grid 2x25x25", grid_building(2, 25, 25))]:
+        t0 = time.perf_counter()
+        exact = graph.betweenness()
+        t_exact = time.perf_counter() - t0
+        line = f"  {label:<13} {graph.num_vertices():>5} rooms  exact {t_exact:6.2f} s"
+        if workers > 1:
+            t0 = time.perf_counter()
+            graph.betweenness(workers=workers)
+            line += f"  pool of {workers} {time.perf_counter() - t0:6.2f} s"
+        print(line)
+        top = max(exact.rooms)
+        for k in samples:
+            t0 = time.perf_counter()
+            estimate = graph.betweenness(samples=k)
+            t_sample = time.perf_counter() - t0
+            error = max(abs(a - b) for a, b in zip(exact.rooms, estimate.rooms))
+            print(f"  {'':<13} {k:>4} sources {t_sample:6.2f} s  max error {error / top:6.1%} of the top room"
+                  f"  (bound {estimate.room_error / top:7.1%}, delta {estimate.delta})")
+
+
+def bench_compressed(n_pairs: int = 200) -> None:
+    '''Adjacency memory (dict of lists, CSR arrays, Huffman-coded rows) vs bfs_path time'''
+    print("\nCompressed adjacency: memory vs traversal speed")
+    graphs = [("HM_Graph.csv", SchoolGraph("HM_Graph.csv")), ("grid 4x50x50", grid_building(4, 50, 50)),
+              ("replicated_hm 50", replicated_hm(50)), ("geometric 20k", random_geometric(20_000))]
+    for label, graph in graphs:
+        graph.has_weights = False   # compressed rows keep edges only; the bench uses hop counts
+        pairs = random_pairs(graph, n_pairs)
+        n_edges = sum(len(row) for row in graph.adj.values())
+        _, _, m_dict = peak_memory(lambda: {v: list(row) for v, row in graph.adj.items()})
+        offsets, targets = graph.to_csr()
+        m_csr = len(offsets) * offsets.itemsize + len(targets) * targets.itemsize
+        t_dict = min(time_queries(graph.bfs_path, pairs) for _ in range(3))
+
+        t0 = time.perf_counter()
+        compressed = graph.compress_adjacency()
+        t_build = time.perf_counter() - t0
+        t_comp = min(time_queries(graph.bfs_path, pairs) for _ in range(3))
+        print(f"  {label:<17} {graph.num_vertices():>6} rooms  bytes/edge: dict {m_dict / n_edges:5.1f}"
+              f"  CSR {m_csr / n_edges:4.1f}  compressed {compressed.nbytes() / n_edges:4.2f}"
+              f"  (build {t_build:5.2f} s)")
+        print(f"  {'':<17} bfs_path  dict {t_dict * 1000:7.3f} ms  compressed {t_comp * 1000:7.3f} ms"
+              f"  ({t_comp / t_dict:4.1f}x slower)")
+
+
+# ---------------------------------------------------------------
+# Regression suite (JSON results, one file per commit)
+# ---------------------------------------------------------------
+GENERATORS = {
+    "grid": lambda n: grid_building(4, max(2, round(math.sqrt(n / 4))), max(2, round(math.sqrt(n / 4)))),
+    "geometric": lambda n: random_geometric(n),
+    "scale_free": lambda n: scale_free(n),
+    "replicated_hm": lambda n: replicated_hm(max(1, round(n / 464))),
+}
+
+
+def _measure(fn, rounds: int = 5, budget: float = 1.0) -> dict:
+    '''Best-of-rounds seconds and peak traced MiB of fn (stops early once budget seconds are spent)'''
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best, spent = math.inf, 0.0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best = min(best, elapsed)
+        spent += elapsed
+        if spent > budget:
+            break
+    return {"seconds": best, "peak_mib": peak / 2**20}
+
+
+def run_suite(sizes: tuple[int, ...] = (1000, 10000), generators: tuple[str, ...] = tuple(GENERATORS),
+              n_pairs: int = 50, eccentricity_limit: int = 3000) -> dict:
+    '''Time load, path queries, spanning trees and eccentricity on every generator x size'''
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    results = {"commit": commit, "python": platform.python_version(), "machine": platform.machine(),
+               "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "cases": []}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in generators:
+            for size in sizes:
+                graph = GENERATORS[name](size)
+                path = os.path.join(tmp, f"{name}{size}.csv")
+                write_csv(graph, path)
+                pairs = random_pairs(graph, n_pairs)
+                start = pairs[0][0]
+
+                def queries(query):
+                    return lambda: [query(s, t) for s, t in pairs]
+
+                case = {"graph": name, "rooms": graph.num_vertices(),
+                        "edges": sum(len(row) for row in graph.adj.values()) // 2,
+                        "load": _measure(lambda: SchoolGraph(path)),
+                        "bfs_path": _measure(queries(graph.bfs_path)),
+                        "dfs_path": _measure(queries(graph.dfs_path)),
+                        # drop the cached BFS tree first, or the timed run would be a cache hit
+                        "bfs_spanning_tree": _measure(lambda: (graph.invalidate_path_cache(),
+                                                               graph.bfs_spanning_tree(start))),
+                        "dfs_spanning_tree": _measure(lambda: graph.dfs_spanning_tree(start))}
+                for op in ("bfs_path", "dfs_path"):
+                    case[op]["seconds"] /= n_pairs      # per query
+                if graph.num_vertices() <= eccentricity_limit:
+                    case["graph_eccentricity"] = _measure(graph.graph_eccentricity)
+                results["cases"].append(case)
+                print(f"  {name:<14} {case['rooms']:>7} rooms  load {case['load']['seconds']:6.3f} s"
+                      f"  bfs_path {case['bfs_path']['seconds'] * 1000:7.3f} ms", file=sys.stderr)
+    return results
+
+
+def compare(old: dict, new: dict, threshold: float = 1.2) -> list[str]:
+    '''Lines describing every timing or memory that got worse by more than threshold'''
+    old_cases = {(c["graph"], c["rooms"]): c for c in old["cases"]}
+    worse = []
+    for case in new["cases"]:
+        before = old_cases.get((case["graph"], case["rooms"]))
+        if before is None:
+            continue
+        for op, stats in case.items():
+            if not isinstance(stats, dict) or op not in before:
+                continue
+            for key, value in stats.items():
+                was = before[op][key]
+                if was > 0 and value / was > threshold:
+                    worse.append(f"{case['graph']} {case['rooms']} {op} {key}: {was:.4g} -> {value:.4g}"
+                                 f" ({value / was:.2f}x)")
+    return worse
+
+
+def run_all() -> None:
+    bench_bfs_result()
+    bench_backends()
+    bench_routes()
+    bench_facility()
+    bench_betweenness()
+    bench_compressed()
+    bench_trace()
+    bench_mst()
+    bench_ch()
+    bench_hierarchy()
+    bench_names()
+    bench_levels()
+    bench_loader()
+    bench_startup()
+    bench_dfs()
+    bench_updates()
+    bench_cached("HM_Graph.csv", SchoolGraph("HM_Graph.csv"))
+    bench_weighted("HM_Graph.csv", SchoolGraph("HM_Graph.csv"))
+    bench_weighted("grid 3x30x30", grid_building(3, 30, 30))
+    bench_weighted("grid 5x60x60", grid_building(5, 60, 60), n_pairs=20)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command")
+    suite = sub.add_parser("suite", help="run the regression suite and write JSON")
+    suite.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    suite.add_argument("--graphs", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    suite.add_argument("--pairs", type=int, default=50)
+    suite.add_argument("--out", help="JSON file (default: stdout)")
+    diff = sub.add_parser("compare", help="list regressions between two suite results")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    diff.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    if args.command == "suite":
+        results = run_suite(tuple(args.sizes), tuple(args.graphs), args.pairs)
+        text = json.dumps(results, indent=2)
+        if args.out:
+            with open(args.out, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+    elif args.command == "compare":
+        with open(args.old) as f_old, open(args.new) as f_new:
+            worse = compare(json.load(f_old), json.load(f_new), args.threshold)
+        print("\n".join(worse) if worse else "no regressions")
+        sys.exit(1 if worse else 0)
+    else:
+        run_all()
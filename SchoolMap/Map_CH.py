@@ -0,0 +1,318 @@
+'''
+Contraction hierarchies for fast point-to-point queries.
+
+Preprocessing removes ("contracts") the rooms one at a time, least
+important first. When room v is removed, every pair of its neighbors u, w
+whose only shortest connection runs through v gets a shortcut u-w that
+remembers v as its middle room. A bounded local Dijkstra (the witness
+search) checks for another path first; if it gives up early we just add
+a shortcut that was not needed, which costs space but never correctness.
+
+Each room ends up with a rank (its contraction order) and an upward list:
+its edges, shortcuts included, to rooms of higher rank. A query runs
+Dijkstra upward from both ends; the two searches only meet near the top
+of the hierarchy and settle a few hundred rooms instead of the whole
+campus. The shortcuts on the answer are then expanded through their
+middle rooms.
+
+Edges are treated as two-way, like the rest of SchoolMap. Without
+weights every edge costs 1, so paths have the same hop count as
+SchoolGraph.bfs_path; with weights they have the cost of dijkstra_path.
+
+The index is saved as raw arrays next to the graph (see save / load).
+'''
+
+import hashlib
+import heapq
+import math
+import struct
+import sys
+from array import array
+
+MAGIC = b"SGCH\x00\x00\x00\x01"
+VERSION = 2
+# magic, version, weighted, n_slots, n_up_edges, rooms, graph edges, edge hash
+HEADER = struct.Struct("<8sIIQQQQ16s")
+
+
+def _graph_fingerprint(graph) -> tuple[int, int, bytes]:
+    '''rooms, directed edges and a hash of every (room, neighbor, weight) in sorted order'''
+    digest = hashlib.blake2b(digest_size=16)
+    edges = 0
+    for v in sorted(graph.adj.keys()):
+        row = graph.adj[v]
+        pairs = sorted(zip(row, graph.weights.get(v, [1.0] * len(row))))
+        digest.update(array("q", (v, len(pairs))).tobytes())
+        digest.update(array("i", (u for u, _ in pairs)).tobytes())
+        digest.update(array("d", (w for _, w in pairs)).tobytes())
+        edges += len(pairs)
+    return len(graph.adj), edges, digest.digest()
+
+
+class ContractionHierarchy:
+    def __init__(self, graph, rank: array, up_offsets: array, up_targets: array,
+                 up_weights: array, up_middle: array, weighted: bool) -> None:
+        self.graph = graph
+        self.rank = rank                # contraction order, -1 for unused indices
+        self.up_offsets = up_offsets    # upward edges of v: [up_offsets[v], up_offsets[v + 1])
+        self.up_targets = up_targets
+        self.up_weights = up_weights
+        self.up_middle = up_middle      # middle room of a shortcut, -1 for a real edge
+        self.weighted = weighted
+        self._version = graph._version
+
+    # ------------------------------------------------------------------
+    # Preprocessing
+    # ------------------------------------------------------------------
+    @classmethod
+    def build(cls, graph, weighted: bool | None = None, witness_limit: int = 64) -> "ContractionHierarchy":
+        '''Contract every room of graph; witness_limit caps the rooms each witness search settles'''
+        if weighted is None:
+            weighted = graph.has_weights
+        n = max(graph.adj.keys(), default=-1) + 1
+
+        # remaining (not yet contracted) graph, two-way, cheapest of any parallel edges
+        nbrs: list[dict[int, float]] = [{} for _ in range(n)]
+        for u, row in graph.adj.items():
+            row_w = graph.weights.get(u) if weighted else None
+            for i, v in enumerate(row):
+                if u == v:
+                    continue
+                w = row_w[i] if row_w is not None else 1.0
+                if w < nbrs[u].get(v, math.inf):
+                    nbrs[u][v] = w
+                    nbrs[v][u] = w
+        middle: dict[tuple[int, int], int] = {}
+
+        def witness(source: int, skip: int, bound: float) -> dict[int, float]:
+            # Dijkstra from source around skip, up to distance bound / witness_limit rooms
+            dist = {source: 0.0}
+            heap = [(0.0, source)]
+            settled = 0
+            while heap and settled < witness_limit:
+                d, x = heapq.heappop(heap)
+                if d > bound:
+                    break
+                if d > dist[x]:
+                    continue
+                settled += 1
+                for y, w in nbrs[x].items():
+                    nd = d + w
+                    if y != skip and nd < dist.get(y, math.inf):
+                        dist[y] = nd
+                        heapq.heappush(heap, (nd, y))
+            return dist
+
+        def shortcuts(v: int) -> list[tuple[int, int, float]]:
+            # shortcuts that contracting v would need right now
+            items = list(nbrs[v].items())
+            needed = []
+            for i, (u, wu) in enumerate(items[:-1]):
+                rest = items[i + 1:]
+                dist = witness(u, v, wu + max(w for _, w in rest))
+                for x, wx in rest:
+                    if dist.get(x, math.inf) > wu + wx:
+                        needed.append((u, x, wu + wx))
+            return needed
+
+        # priority = edge difference + contracted neighbors + level, which
+        # spreads the contraction evenly. Neighbors of a contracted room get
+        # a fresh priority; everyone else is re-checked lazily at the top.
+        deleted = [0] * n
+        level = [0] * n
+
+        def priority(v: int, needed: list) -> int:
+            return 2 * (len(needed) - len(nbrs[v])) + deleted[v] + level[v]
+
+        current = [0] * n
+        for v in graph.adj:
+            current[v] = priority(v, shortcuts(v))
+        heap = [(current[v], v) for v in graph.adj]
+        heapq.heapify(heap)
+
+        rank = array("i", [-1]) * n
+        up: list[list[tuple[int, float, int]]] = [[] for _ in range(n)]
+        order = 0
+        while heap:
+            p, v = heapq.heappop(heap)
+            if rank[v] >= 0 or p != current[v]:
+                continue    # contracted already, or an outdated entry
+            needed = shortcuts(v)
+            current[v] = priority(v, needed)
+            if heap and current[v] > heap[0][0]:
+                heapq.heappush(heap, (current[v], v))
+                continue
+
+            rank[v] = order
+            order += 1
+            for u, w in nbrs[v].items():
+                up[v].append((u, w, middle.get((min(u, v), max(u, v)), -1)))
+                del nbrs[u][v]
+                deleted[u] += 1
+                level[u] = max(level[u], level[v] + 1)
+            for a, b, w in needed:
+                if w < nbrs[a].get(b, math.inf):
+                    nbrs[a][b] = w
+                    nbrs[b][a] = w
+                    middle[(min(a, b), max(a, b))] = v
+            for u in nbrs[v]:
+                current[u] = priority(u, shortcuts(u))
+                heapq.heappush(heap, (current[u], u))
+            nbrs[v] = {}
+
+        up_offsets = array("q", [0])
+        up_targets, up_weights, up_middle = array("i"), array("d"), array("i")
+        for v in range(n):
+            for u, w, m in up[v]:
+                up_targets.append(u)
+                up_weights.append(w)
+                up_middle.append(m)
+            up_offsets.append(len(up_targets))
+        return cls(graph, rank, up_offsets, up_targets, up_weights, up_middle, weighted)
+
+    def stats(self) -> dict[str, int]:
+        shortcuts = sum(1 for m in self.up_middle if m >= 0)
+        return {"rooms": sum(1 for r in self.rank if r >= 0), "up_edges": len(self.up_targets),
+                "shortcuts": shortcuts}
+
+    # ------------------------------------------------------------------
+    # Save / load
+    # ------------------------------------------------------------------
+    def save(self, path: str) -> None:
+        if sys.byteorder != "little":
+            raise OSError("index files are little-endian only")
+        rooms, edges, edge_hash = _graph_fingerprint(self.graph)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, int(self.weighted), len(self.rank), len(self.up_targets),
+                                rooms, edges, edge_hash))
+            for section in (self.rank, self.up_offsets, self.up_targets, self.up_weights, self.up_middle):
+                f.write(bytes(section))
+
+    @classmethod
+    def load(cls, graph, path: str) -> "ContractionHierarchy":
+        '''Read an index written by save; graph must be the one it was built from'''
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:8] == MAGIC and struct.unpack_from("<I", data, 8)[0] == 1:
+            raise ValueError(f"{path} is an old index without an edge hash; rebuild it")
+        magic, version, weighted, n, m, rooms, edges, edge_hash = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a contraction hierarchy index")
+        if (rooms, edges, edge_hash) != _graph_fingerprint(graph):
+            raise ValueError(f"{path} was built for a different graph")
+
+        pos = HEADER.size
+        sections = []
+        for typecode, count in (("i", n), ("q", n + 1), ("i", m), ("d", m), ("i", m)):
+            section = array(typecode)
+            size = count * section.itemsize
+            section.frombytes(data[pos:pos + size])
+            sections.append(section)
+            pos += size
+        return cls(graph, *sections, bool(weighted))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _middle(self, a: int, b: int) -> int:
+        # the edge a-b is stored with its lower-ranked end
+        if self.rank[a] > self.rank[b]:
+            a, b = b, a
+        targets = self.up_targets
+        for e in range(self.up_offsets[a], self.up_offsets[a + 1]):
+            if targets[e] == b:
+                return self.up_middle[e]
+        raise KeyError((a, b))
+
+    def _unpack(self, a: int, b: int, out: list[int]) -> None:
+        '''Append the rooms after a on the real path a -> b'''
+        stack = [(a, b)]
+        while stack:
+            x, y = stack.pop()
+            m = self._middle(x, y)
+            if m < 0:
+                out.append(y)
+            else:
+                stack.append((m, y))
+                stack.append((x, m))
+
+    def _search(self, s: int, t: int) -> tuple[float, int | None, dict[int, int], dict[int, int]]:
+        '''Upward Dijkstra from both ends; (distance, meeting room, parents forward, parents backward)'''
+        offsets, targets, weights = self.up_offsets, self.up_targets, self.up_weights
+        dist = ({s: 0.0}, {t: 0.0})
+        parent: tuple[dict[int, int], dict[int, int]] = ({}, {})
+        heaps = ([(0.0, s)], [(0.0, t)])
+        best, meet = math.inf, None
+
+        while heaps[0] or heaps[1]:
+            if not heaps[1] or (heaps[0] and heaps[0][0][0] <= heaps[1][0][0]):
+                side = 0
+            else:
+                side = 1
+            d, v = heapq.heappop(heaps[side])
+            if d >= best:
+                # nothing left on this side can improve the answer
+                heaps[side].clear()
+                continue
+            mine, other = dist[side], dist[1 - side]
+            if d > mine[v]:
+                continue    # stale heap entry
+            if v in other and d + other[v] < best:
+                best, meet = d + other[v], v
+            # stall-on-demand: if a higher room already reaches v more cheaply,
+            # v is not on a shortest up-path and need not be expanded
+            stalled = False
+            for e in range(offsets[v], offsets[v + 1]):
+                du = mine.get(targets[e])
+                if du is not None and du + weights[e] < d:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+            for e in range(offsets[v], offsets[v + 1]):
+                u = targets[e]
+                nd = d + weights[e]
+                if nd < mine.get(u, math.inf):
+                    mine[u] = nd
+                    parent[side][u] = v
+                    heapq.heappush(heaps[side], (nd, u))
+        return best, meet, parent[0], parent[1]
+
+    def _check_version(self) -> None:
+        if self.graph._version != self._version:
+            raise RuntimeError("graph was edited after the hierarchy was built; rebuild it")
+
+    def distance(self, start_name: str, end_name: str) -> float:
+        '''Hops (or walking distance if weighted) from start to end, inf if unreachable'''
+        self._check_version()
+        s, t = self.graph.name_to_idx[start_name], self.graph.name_to_idx[end_name]
+        return 0.0 if s == t else self._search(s, t)[0]
+
+    def path_indices(self, s: int, t: int) -> list[int] | None:
+        self._check_version()
+        if s == t:
+            return [s]
+        _, meet, parent_s, parent_t = self._search(s, t)
+        if meet is None:
+            return None
+
+        # upward chains s -> meet and meet <- t, then expand every shortcut
+        up_s = [meet]
+        while up_s[-1] != s:
+            up_s.append(parent_s[up_s[-1]])
+        up_s.reverse()
+        up_t = [meet]
+        while up_t[-1] != t:
+            up_t.append(parent_t[up_t[-1]])
+        hops = up_s + up_t[1:]
+
+        path = [s]
+        for a, b in zip(hops, hops[1:]):
+            self._unpack(a, b, path)
+        return path
+
+    def path(self, start_name: str, end_name: str) -> list[str] | None:
+        '''Same shape as SchoolGraph.bfs_path: list of room names, or None'''
+        idx_to_name = self.graph.idx_to_name
+        path = self.path_indices(self.graph.name_to_idx[start_name], self.graph.name_to_idx[end_name])
+        return None if path is None else [idx_to_name[v] for v in path]
@@ -0,0 +1,170 @@
+'''
+Betweenness centrality (Brandes) for finding crowding hotspots.
+
+For every source room s, one BFS counts the shortest paths sigma[v] from s
+and a backward pass over the BFS order adds up the dependency
+
+    delta[v] = sum over next-level neighbors w of  sigma[v] / sigma[w] * (1 + delta[w])
+
+Summed over all sources, delta[v] is the number of shortest (start, end)
+paths through room v (fractional when there are ties), and each term of
+the sum is the share of paths through the corridor v -> w. Paths are hop
+counts, like bfs_path; start and end are ordered, so on an undirected map
+every pair is counted twice.
+
+Sources are independent, so they are split into chunks for a process
+pool. The CSR arrays go into shared memory once; workers attach to them
+instead of receiving a copy of the graph.
+
+Sampling: with samples=k, k sources are picked at random and the sums are
+scaled by n / k. Each source adds at most n - 2 to a room (n - 1 to a
+corridor), so by Hoeffding's inequality and a union bound over all rooms
+and corridors, every estimate is within
+
+    epsilon = sqrt(ln(2 * (n + m) / delta) / (2 * k))
+
+of exact, as a fraction of n * (n - 2) (rooms) or n * (n - 1) (corridors),
+with probability at least 1 - delta. samples_for(epsilon, delta, ...)
+goes the other way.
+'''
+
+import math
+import multiprocessing
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+
+class Betweenness(NamedTuple):
+    rooms: array           # idx -> shortest paths through the room
+    corridors: array       # CSR position (offsets[v] + i = adj[v][i]) -> paths using that corridor
+    sources: int           # sources searched (all rooms when exact)
+    room_error: float      # bound on |estimate - exact| per room (0.0 when exact)
+    corridor_error: float  # same for corridors
+    delta: float           # the bounds fail with probability at most delta
+
+
+def samples_for(epsilon: float, delta: float, n_rooms: int, n_corridors: int) -> int:
+    '''Sources needed so every normalized estimate is within epsilon with probability 1 - delta'''
+    return math.ceil(math.log(2 * (n_rooms + n_corridors) / delta) / (2 * epsilon ** 2))
+
+
+def accumulate(offsets, targets, sources, rooms: list[float], corridors: list[float]) -> None:
+    '''Add the Brandes dependencies of each source into rooms / corridors'''
+    n = len(offsets) - 1
+    for s in sources:
+        sigma = [0] * n
+        dist = [-1] * n
+        sigma[s] = 1
+        dist[s] = 0
+        order = [s]
+        i = 0
+        while i < len(order):
+            v = order[i]
+            i += 1
+            next_level = dist[v] + 1
+            paths = sigma[v]
+            for w in targets[offsets[v]:offsets[v + 1]]:
+                if dist[w] < 0:
+                    dist[w] = next_level
+                    order.append(w)
+                if dist[w] == next_level:
+                    sigma[w] += paths
+
+        # reverse BFS order: every next-level room is finished before the rooms above it
+        delta = [0.0] * n
+        for v in reversed(order):
+            next_level = dist[v] + 1
+            share = sigma[v]
+            total = 0.0
+            k = offsets[v]
+            for w in targets[offsets[v]:offsets[v + 1]]:
+                if dist[w] == next_level:
+                    c = share / sigma[w] * (1.0 + delta[w])
+                    corridors[k] += c
+                    total += c
+                k += 1
+            delta[v] = total
+            if v != s:
+                rooms[v] += total
+
+
+# ---------------------------------------------------------------
+# Process-pool side: workers attach to the shared CSR arrays once
+# ---------------------------------------------------------------
+_worker_csr = None
+
+
+def _init_worker(offsets_name: str, n_offsets: int, targets_name: str, n_targets: int) -> None:
+    global _worker_csr
+    offsets_shm = shared_memory.SharedMemory(offsets_name)
+    targets_shm = shared_memory.SharedMemory(targets_name)
+    # keep the SharedMemory objects alive as long as the views
+    _worker_csr = (offsets_shm, targets_shm,
+                   offsets_shm.buf[:8 * n_offsets].cast("q"), targets_shm.buf[:4 * n_targets].cast("i"))
+
+
+def _worker_accumulate(sources: list[int]) -> tuple[list[float], list[float]]:
+    _, _, offsets, targets = _worker_csr
+    rooms = [0.0] * (len(offsets) - 1)
+    corridors = [0.0] * len(targets)
+    accumulate(offsets, targets, sources, rooms, corridors)
+    return rooms, corridors
+
+
+def _shared(data: array) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(data) * data.itemsize))
+    shm.buf[:len(data) * data.itemsize] = data.tobytes()
+    return shm
+
+
+def _parallel(offsets: array, targets: array, sources: list[int], workers: int,
+              rooms: list[float], corridors: list[float]) -> None:
+    offsets_shm, targets_shm = _shared(offsets), _shared(targets)
+    try:
+        # a few chunks per worker so a slow chunk does not hold up the rest
+        n_chunks = min(len(sources), 4 * workers)
+        chunks = [sources[i::n_chunks] for i in range(n_chunks)]
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=(offsets_shm.name, len(offsets), targets_shm.name, len(targets))) as pool:
+            for part_rooms, part_corridors in pool.map(_worker_accumulate, chunks):
+                for v, x in enumerate(part_rooms):
+                    rooms[v] += x
+                for k, x in enumerate(part_corridors):
+                    corridors[k] += x
+    finally:
+        for shm in (offsets_shm, targets_shm):
+            shm.close()
+            shm.unlink()
+
+
+def betweenness(graph, samples: int | None = None, epsilon: float | None = None, delta: float = 0.05,
+                workers: int = 1, seed: int = 0) -> Betweenness:
+    '''Exact betweenness, or an estimate from `samples` random sources (or enough for `epsilon`)'''
+    offsets, targets = graph._csr_arrays()
+    rooms_present = sorted(graph.adj)
+    n, m = len(rooms_present), len(targets)
+    if epsilon is not None:
+        samples = samples_for(epsilon, delta, n, m)
+    if samples is None or samples >= n:
+        sources = rooms_present
+    else:
+        sources = sorted(random.Random(seed).sample(rooms_present, samples))
+
+    rooms = [0.0] * (len(offsets) - 1)
+    corridors = [0.0] * m
+    if workers > 1 and len(sources) > 1:
+        _parallel(offsets, targets, sources, workers, rooms, corridors)
+    else:
+        accumulate(offsets, targets, sources, rooms, corridors)
+
+    k = len(sources)
+    if k == n or k == 0:
+        return Betweenness(array("d", rooms), array("d", corridors), k, 0.0, 0.0, 0.0)
+    scale = n / k
+    eps = math.sqrt(math.log(2 * (n + m) / delta) / (2 * k))
+    return Betweenness(array("d", (x * scale for x in rooms)), array("d", (x * scale for x in corridors)),
+                       k, eps * n * (n - 2), eps * n * (n - 1), delta)
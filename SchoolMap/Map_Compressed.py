@@ -0,0 +1,192 @@
+'''
+Compressed adjacency for very large graphs: sorted rows, delta gaps, Huffman codes.
+
+Neighbor ids in HM_Graph.csv are mostly small and close to the room's own
+id. Each row is stored as a bit string of symbols:
+
+    degree, zigzag(first neighbor - v), gap, gap, ...
+
+where the gaps are the differences between consecutive sorted neighbors.
+The symbols are counted like HuffmanLab's countFrequencies counts
+characters, and coded with HuffmanLab's buildTree / createCodeMap. Values
+of ESCAPE or more are written as the escape code followed by a 5-bit bit
+count and the raw bits.
+
+CompressedAdjacency is a read-only Mapping like Map_Snapshot.CSRAdjacency:
+a row is decoded whenever a traversal asks for it. Rows come back sorted,
+so traversals may pick a different path of the same length than on the
+original adjacency order.
+'''
+
+import importlib.util
+import os
+from array import array
+from collections.abc import Iterator, Mapping
+
+ESCAPE = 64         # symbols 0..ESCAPE-1 are values; ESCAPE marks a raw value
+TABLE_BITS = 10     # decoder lookup table width
+
+
+def _huffman_lab():
+    # HuffmanLab is a sibling folder, not a package: load its main.py by path
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "HuffmanLab", "main.py")
+    spec = importlib.util.spec_from_file_location("huffman_lab_main", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _zigzag(d: int) -> int:
+    return 2 * d if d >= 0 else -2 * d - 1
+
+
+def _row_values(v: int, row) -> list[int]:
+    neighbors = sorted(row)
+    values = [len(neighbors)]
+    if neighbors:
+        values.append(_zigzag(neighbors[0] - v))
+        values += [b - a for a, b in zip(neighbors, neighbors[1:])]
+    return values
+
+
+class CompressedAdjacency(Mapping):
+    '''idx -> sorted neighbor list, decoded from a Huffman-coded bit string on access'''
+
+    def __init__(self, adj) -> None:
+        lab = _huffman_lab()
+        n = max(adj.keys(), default=-1) + 1
+
+        # countFrequencies, but over row symbols instead of characters
+        freqs: dict[int, int] = {}
+        for v, row in adj.items():
+            for value in _row_values(v, row):
+                symbol = value if value < ESCAPE else ESCAPE
+                freqs[symbol] = freqs.get(symbol, 0) + 1
+        code_map = lab.createCodeMap(lab.buildTree(freqs))
+
+        codes = [0] * (ESCAPE + 1)
+        lengths = [0] * (ESCAPE + 1)
+        for symbol, bits in code_map.items():
+            codes[symbol] = int(bits, 2)
+            lengths[symbol] = len(bits)
+
+        # encode every row into one bit string; bit_offsets[v] is where row v starts
+        self.present = array("B", bytes(n))
+        bit_offsets = [0] * (n + 1)
+        out = bytearray()
+        acc = 0
+        have = 0
+        total = 0
+        for v in range(n):
+            bit_offsets[v] = total
+            row = adj.get(v)
+            if row is None:
+                continue
+            self.present[v] = 1
+            for value in _row_values(v, row):
+                if value < ESCAPE:
+                    acc = (acc << lengths[value]) | codes[value]
+                    have += lengths[value]
+                    total += lengths[value]
+                else:
+                    width = value.bit_length()
+                    acc = (((acc << lengths[ESCAPE]) | codes[ESCAPE]) << 5 | (width - 1)) << width | value
+                    step = lengths[ESCAPE] + 5 + width
+                    have += step
+                    total += step
+                while have >= 8:
+                    have -= 8
+                    out.append((acc >> have) & 0xFF)
+                acc &= (1 << have) - 1
+        bit_offsets[n] = total
+        self.bit_offsets = array("I" if total < 1 << 32 else "Q", bit_offsets)
+        if have:
+            out.append((acc << (8 - have)) & 0xFF)
+        self.bits = bytes(out) + bytes(8)   # padding so a row read never runs off the end
+        self._count = bytes(self.present).count(1)
+
+        # decoder: TABLE_BITS-bit window -> (symbol, code length); longer codes in a dict
+        self.table: list[tuple[int, int] | None] = [None] * (1 << TABLE_BITS)
+        self.long_codes: dict[tuple[int, int], int] = {}
+        self.max_length = max(lengths)
+        for symbol, bits in code_map.items():
+            length = len(bits)
+            if length <= TABLE_BITS:
+                base = int(bits, 2) << (TABLE_BITS - length)
+                for k in range(1 << (TABLE_BITS - length)):
+                    self.table[base + k] = (symbol, length)
+            else:
+                self.long_codes[(int(bits, 2), length)] = symbol
+
+    def _decode(self, v: int) -> list[int]:
+        start = self.bit_offsets[v]
+        first_byte = start >> 3
+        # the whole row plus 4 bytes as one int; `left` = bits not yet consumed
+        chunk = self.bits[first_byte:((self.bit_offsets[v + 1] + 7) >> 3) + 4]
+        acc = int.from_bytes(chunk, "big")
+        left = 8 * len(chunk) - (start & 7)
+        table, mask = self.table, (1 << TABLE_BITS) - 1
+
+        # symbols: degree, zigzag(first - v), then gaps; the row ends after degree + 1 of them
+        row: list[int] = []
+        degree = -1
+        current = v
+        while degree != len(row):
+            entry = table[(acc >> (left - TABLE_BITS)) & mask]
+            if entry is None:
+                entry = self._long_symbol(acc, left, v)
+            value, length = entry
+            left -= length
+            if value == ESCAPE:
+                width = ((acc >> (left - 5)) & 31) + 1
+                left -= 5 + width
+                value = (acc >> left) & ((1 << width) - 1)
+            if degree < 0:
+                degree = value
+            elif row:
+                current += value
+                row.append(current)
+            else:
+                current += value >> 1 if value % 2 == 0 else -((value + 1) >> 1)
+                row.append(current)
+        return row
+
+    def _long_symbol(self, acc: int, left: int, v: int) -> tuple[int, int]:
+        for length in range(TABLE_BITS + 1, self.max_length + 1):
+            value = self.long_codes.get(((acc >> (left - length)) & ((1 << length) - 1), length))
+            if value is not None:
+                return value, length
+        raise ValueError(f"corrupt row {v}")
+
+    def __getitem__(self, v: int) -> list[int]:
+        if not (0 <= v < len(self.present) and self.present[v]):
+            raise KeyError(v)
+        return self._decode(v)
+
+    def get(self, v: int, default=None):
+        if 0 <= v < len(self.present) and self.present[v]:
+            return self._decode(v)
+        return default
+
+    def __iter__(self) -> Iterator[int]:
+        return (v for v, p in enumerate(self.present) if p)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def nbytes(self) -> int:
+        '''Bytes used by the coded rows, row offsets and presence flags'''
+        return len(self.bits) + len(self.bit_offsets) * self.bit_offsets.itemsize + len(self.present)
+
+
+def compress_graph(graph) -> CompressedAdjacency:
+    '''Replace graph.adj with a CompressedAdjacency (edges only, so unweighted graphs)'''
+    if graph.has_weights:
+        raise ValueError("compressed adjacency has no weights; use a snapshot for weighted graphs")
+    from Map_Snapshot import UnitWeights
+
+    adj = CompressedAdjacency(graph.adj)
+    graph.adj = adj
+    graph.weights = UnitWeights(adj)
+    graph._clear_bfs_cache()
+    return adj
@@ -0,0 +1,85 @@
+'''
+Nearest facility (exit, restroom, elevator, ...) for every room at once.
+
+Instead of one search per room, a single search starts from all the
+target rooms together (every target at distance 0). The first target to
+reach a room is its nearest one, and the room it was reached from is the
+next hop on the way there, so one pass gives the whole table. It is a
+BFS on hop counts, or Dijkstra on walking distances when the graph has
+weights. Doors are taken to be two-way, like add_edge makes them.
+'''
+
+import heapq
+import math
+from array import array
+from collections import deque
+
+
+class NearestFacility:
+    '''idx-indexed table of nearest target, distance and next hop (-1 / inf = no target reachable)'''
+
+    def __init__(self, graph, targets: list[int], nearest: array, distance: array, next_hop: array) -> None:
+        self.graph = graph
+        self.targets = targets
+        self.nearest = nearest
+        self.distance = distance
+        self.next_hop = next_hop
+
+    def __getitem__(self, name: str) -> tuple[str, float, str] | None:
+        '''(nearest target, distance, next room to walk to) for a room, None if no target is reachable'''
+        v = self.graph.name_to_idx[name]
+        if self.nearest[v] < 0:
+            return None
+        names = self.graph.idx_to_name
+        hop = self.next_hop[v]
+        return names[self.nearest[v]], self.distance[v], names[hop if hop >= 0 else v]
+
+    def route(self, name: str) -> list[str] | None:
+        '''Rooms from name to its nearest target, following next hops'''
+        v = self.graph.name_to_idx[name]
+        if self.nearest[v] < 0:
+            return None
+        path = [v]
+        while self.next_hop[v] >= 0:
+            v = self.next_hop[v]
+            path.append(v)
+        return [self.graph.idx_to_name[u] for u in path]
+
+
+def nearest_facilities(graph, targets: list[int]) -> NearestFacility:
+    n = graph.slot_count()
+    nearest = array("i", [-1]) * n
+    next_hop = array("i", [-1]) * n
+    distance = array("d", [math.inf]) * n
+    for t in targets:
+        nearest[t] = t
+        distance[t] = 0.0
+
+    adj = graph.adj
+    if not graph.has_weights:
+        queue = deque(targets)
+        while queue:
+            v = queue.popleft()
+            d = distance[v] + 1
+            for u in adj.get(v, []):
+                if nearest[u] < 0:
+                    nearest[u] = nearest[v]
+                    distance[u] = d
+                    next_hop[u] = v
+                    queue.append(u)
+    else:
+        weights = graph.weights
+        heap = [(0.0, t) for t in targets]
+        done = array("B", bytes(n))
+        while heap:
+            d, v = heapq.heappop(heap)
+            if done[v]:
+                continue
+            done[v] = 1
+            for u, w in zip(adj.get(v, []), weights.get(v, [])):
+                if d + w < distance[u]:
+                    distance[u] = d + w
+                    nearest[u] = nearest[v]
+                    next_hop[u] = v
+                    heapq.heappush(heap, (d + w, u))
+    return NearestFacility(graph, targets, nearest, distance, next_hop)
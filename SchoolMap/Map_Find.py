@@ -1,13 +1,266 @@
 import csv 
-from collections import deque
+import heapq
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from array import array
+from collections.abc import Iterator, Mapping
+
+try:
+    import numpy as np
+except ImportError:     # optional: bfs_levels falls back to pure Python
+    np = None
+
+# vertical distance charged per floor change by the A* heuristic
+FLOOR_HEIGHT = 4.0
+
+
+class TreeNames(Mapping):
+    '''room name -> names of its tree neighbors, converted only when looked up.
+
+    tree is a tree adjacency dict (bfs_spanning_tree / dfs_spanning_tree)
+    or a parent array (kruskal_mst / prim_mst: parent[root] == root,
+    -1 for indices outside the tree).'''
+
+    def __init__(self, graph: "SchoolGraph", tree) -> None:
+        self.graph = graph
+        self.tree = tree
+        self._children: tuple[array, array] | None = None    # CSR (offsets, children)
+
+    def _neighbors(self, v: int) -> list[int]:
+        if isinstance(self.tree, dict):
+            return self.tree[v]
+        parent = self.tree
+        if not (0 <= v < len(parent)) or parent[v] < 0:
+            raise KeyError(v)
+        if self._children is None:
+            # children of every room as CSR int arrays, built on the first lookup
+            n = len(parent)
+            offsets = array("q", [0]) * (n + 1)
+            for child, par in enumerate(parent):
+                if par >= 0 and par != child:
+                    offsets[par + 1] += 1
+            for i in range(n):
+                offsets[i + 1] += offsets[i]
+            children = array("i", [0]) * offsets[n]
+            fill = array("q", offsets[:n])
+            for child, par in enumerate(parent):
+                if par >= 0 and par != child:
+                    children[fill[par]] = child
+                    fill[par] += 1
+            self._children = (offsets, children)
+        offsets, children = self._children
+        found = list(children[offsets[v]:offsets[v + 1]])
+        return found if parent[v] == v else [parent[v]] + found
+
+    def __getitem__(self, name: str) -> list[str]:
+        idx_to_name = self.graph.idx_to_name
+        return [idx_to_name[n] for n in self._neighbors(self.graph.name_to_idx[name])]
+
+    def __iter__(self) -> Iterator[str]:
+        if isinstance(self.tree, dict):
+            rooms = iter(self.tree)
+        else:
+            rooms = (v for v, par in enumerate(self.tree) if par >= 0)
+        return (self.graph.idx_to_name[v] for v in rooms)
+
+    def __len__(self) -> int:
+        if isinstance(self.tree, dict):
+            return len(self.tree)
+        return sum(1 for par in self.tree if par >= 0)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class BFSResult:
+    '''One full BFS from source: parent and distance arrays indexed by room.
+
+    dist[v] == -1 and parent[v] == -1 for rooms not reached; parent[source]
+    == source, like the MST parent arrays (so TreeNames can wrap .parent).
+    While its source is cached, edits repair it in place. SchoolGraph
+    refills evicted results instead of allocating new arrays, but only ones
+    it never handed out: a result returned by bfs_tree_from / bfs_result
+    keeps its source for good (it just stops being repaired once evicted).'''
+
+    def __init__(self, source: int, n: int) -> None:
+        self.source = source
+        self.parent = array("i", [-1]) * n
+        self.dist = array("i", [-1]) * n
+        self._handed_out = False    # set once a caller may hold it; never recycled after that
+
+    def _reset(self, source: int, blank: array) -> None:
+        if len(self.dist) != len(blank):
+            self.parent = array("i", blank)
+            self.dist = array("i", blank)
+        else:
+            self.parent[:] = blank
+            self.dist[:] = blank
+        self.source = source
+        self.parent[source] = source
+        self.dist[source] = 0
+
+    def _grow(self, n: int) -> None:
+        # add_room made a new index; it is not reached until an edge says so
+        if n > len(self.dist):
+            self.parent.extend(array("i", [-1]) * (n - len(self.parent)))
+            self.dist.extend(array("i", [-1]) * (n - len(self.dist)))
+
+    def reached(self, v: int) -> bool:
+        return 0 <= v < len(self.dist) and self.dist[v] >= 0
+
+    def distance(self, v: int) -> int | None:
+        return self.dist[v] if self.reached(v) else None
+
+    def path(self, end: int) -> list[int] | None:
+        '''Room indices source -> end, O(path length)'''
+        if not self.reached(end):
+            return None
+        path = [end]
+        parent = self.parent
+        while path[-1] != self.source:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path
+
+    def distances(self) -> dict[int, int]:
+        '''idx -> hops for every reached room (index order)'''
+        return {v: d for v, d in enumerate(self.dist) if d >= 0}
+
+    def tree(self) -> dict[int, list[int]]:
+        '''BFS spanning tree as an adjacency dict, O(V)'''
+        tree_adj: dict[int, list[int]] = {v: [] for v, d in enumerate(self.dist) if d >= 0}
+        for child, par in enumerate(self.parent):
+            if par >= 0 and par != child:
+                tree_adj[par].append(child)
+                tree_adj[child].append(par)
+        return tree_adj
+
+    def eccentricity(self) -> int:
+        '''Hops to the farthest reached room'''
+        return max(self.dist)
+
 
 class SchoolGraph: 
-    def __init__(self, csv_path: str): 
+    def __init__(self, csv_path: str | None = None): 
         self.adj: dict[int, list[int]] = {}     
         self.idx_to_name: dict[int, str] = {}       
         self.name_to_idx: dict[str, int] = {}     
-
-        self._load_from_csv(csv_path)   
+        # optional walking distances, aligned with adj (weights[v][i] belongs to adj[v][i])
+        self.weights: dict[int, list[float]] = {}
+        # optional room positions: idx -> (x, y, floor)
+        self.coords: dict[int, tuple[float, float, float]] = {}
+        # optional room kind from the CSV "category" column ("exit", "restroom", ...)
+        self.categories: dict[int, str] = {}
+        self.has_weights = False
+        # Map_Loader.LoadReport of the streaming CSV load behind open(); None otherwise
+        self.load_report = None
+
+        # per-source BFS trees for repeated path queries (see cached_bfs_path)
+        self.path_cache_size = 64
+        self._bfs_cache: OrderedDict[int, BFSResult] = OrderedDict()
+        # evicted BFSResults and a queue array, refilled by the next BFS instead of reallocated
+        self._bfs_free: list[BFSResult] = []
+        self._bfs_queue = array("i")
+        self._bfs_blank = array("i")    # n times -1, copied over a result to reset it
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._version = 0   # bumped whenever the edges change
+        self._snapshot = None   # mmap behind a graph opened with load_snapshot
+        self._structure: tuple[int, dict] | None = None  # (version, components/bridges/cut rooms)
+        self._csr: tuple[int, array, array] | None = None   # (version, offsets, targets)
+        self._slots: tuple[int, int] = (-1, 0)     # (version, largest room or neighbor id + 1)
+        self._name_index = None     # RoomNameIndex, built on first fuzzy/prefix lookup
+        self._facilities: tuple[int, dict] = (0, {})    # (version, sorted targets -> NearestFacility)
+        # (version, LRU of (start, end, k or option) -> paths), at most route_cache_size entries
+        self.route_cache_size = 256
+        self._routes: tuple[int, OrderedDict] = (0, OrderedDict())
+        # opt-in traversal stats: called with a Map_Trace.TraversalStats per search
+        self.trace_sink = None
+
+        if csv_path is not None:
+            self._load_from_csv(csv_path)   
+
+    @classmethod
+    def from_adjacency(cls, adj: dict[int, list[int]], names: dict[int, str] | None = None,
+                       weights: dict[int, list[float]] | None = None,
+                       coords: dict[int, tuple[float, float, float]] | None = None,
+                       categories: dict[int, str] | None = None) -> "SchoolGraph":
+        '''Build a graph from in-memory adjacency lists (used for generated graphs)'''
+        graph = cls()
+        for idx, neighbors in adj.items():
+            name = names[idx] if names is not None else f"Room {idx}"
+            graph.adj[idx] = list(neighbors)
+            graph.idx_to_name[idx] = name
+            graph.name_to_idx[name] = idx
+            if weights is not None:
+                graph.weights[idx] = [float(w) for w in weights[idx]]
+            else:
+                graph.weights[idx] = [1.0] * len(graph.adj[idx])
+        graph.has_weights = weights is not None
+        if coords is not None:
+            graph.coords = dict(coords)
+        if categories is not None:
+            graph.categories = dict(categories)
+        return graph
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "SchoolGraph":
+        '''Open a binary snapshot written by save_snapshot (memory-mapped, read-only until edited)'''
+        import Map_Snapshot
+        graph = cls()
+        Map_Snapshot.load_snapshot(graph, path)
+        return graph
+
+    @classmethod
+    def load_csv_checked(cls, csv_path: str, symmetrize: bool = False):
+        '''Streaming, validating CSV load into typed arrays; returns (graph, report)'''
+        import Map_Loader
+        graph = cls()
+        report = Map_Loader.load_csv_streaming(graph, csv_path, symmetrize=symmetrize)
+        return graph, report
+
+    @classmethod
+    def open(cls, csv_path: str, backend: str = "auto") -> "SchoolGraph":
+        '''Load a CSV into the dict, list, csr or compressed backend ("auto" picks by room count).
+
+        Non-dict backends are filled by the lenient streaming loader; what it
+        skipped or repaired is kept in graph.load_report.'''
+        import Map_Backend
+        return Map_Backend.open_graph(cls, csv_path, backend)
+
+    @property
+    def backend(self) -> str:
+        '''Which adjacency backend self.adj is (see Map_Backend)'''
+        import Map_Backend
+        return Map_Backend.backend_name(self.adj)
+
+    def use_backend(self, backend: str) -> None:
+        '''Switch adj/weights to another backend; editing thaws any of them back to dicts'''
+        import Map_Backend
+        Map_Backend.convert(self, backend)
+
+    def save_snapshot(self, path: str) -> None:
+        '''Save the graph as a binary snapshot for fast startup'''
+        import Map_Snapshot
+        Map_Snapshot.save_snapshot(self, path)
+
+    def compress_adjacency(self):
+        '''Swap adj for Huffman-coded sorted rows (see Map_Compressed); read-only until edited'''
+        import Map_Compressed
+        return Map_Compressed.compress_graph(self)
+
+    def _make_mutable(self) -> None:
+        # snapshot-backed tables are read-only views; copy them into dicts before editing
+        if isinstance(self.adj, dict):
+            return
+        self.adj = {v: list(row) for v, row in self.adj.items()}
+        self.weights = {v: list(self.weights[v]) for v in self.adj}
+        self.idx_to_name = dict(self.idx_to_name)
+        self.name_to_idx = {name: v for v, name in self.idx_to_name.items()}
+        self.coords = dict(self.coords)
+        self._snapshot = None
 
     def _load_from_csv(self, csv_path: str) -> None:   
         '''Read the CSV file and build the adjacency list'''
@@ -19,7 +272,10 @@ class SchoolGraph:
             "adjacencies": "1,2,3,...",
             "Degree": "10",
             "Max Degree": "34"
-            }'''
+            }
+            optional columns: "weights" ("12.5,3,...", same order as
+            adjacencies), "x", "y", "floor" for the room position and
+            "category" ("exit", "restroom", ...)'''
 
             for row in reader:  
                 # 1. Parse the vertex index and name
@@ -44,6 +300,36 @@ class SchoolGraph:
                 #3. Store in adjacency list 
                 self.adj[idx] = neighbors  
 
+                #4. Optional walking distances (default: every edge costs 1)
+                weights_str = (row.get("weights") or "").strip()
+                if weights_str != "":
+                    weights = [float(w) for w in weights_str.split(",") if w.strip() != ""]
+                    if len(weights) != len(neighbors):
+                        raise ValueError(f"row {idx}: {len(weights)} weights for {len(neighbors)} adjacencies")
+                    self.has_weights = True
+                else:
+                    weights = [1.0] * len(neighbors)
+                self.weights[idx] = weights
+
+                #5. Optional coordinates
+                x_str = (row.get("x") or "").strip()
+                y_str = (row.get("y") or "").strip()
+                if x_str != "" and y_str != "":
+                    floor_str = (row.get("floor") or "").strip()
+                    floor = float(floor_str) if floor_str != "" else 0.0
+                    self.coords[idx] = (float(x_str), float(y_str), floor)
+
+                #6. Optional category
+                category = (row.get("category") or "").strip()
+                if category != "":
+                    self.categories[idx] = category
+
+        #7. Every neighbor id must be a room of the file (array-backed searches index by id)
+        for idx, neighbors in self.adj.items():
+            for n in neighbors:
+                if n < 0 or n not in self.adj:
+                    raise ValueError(f"row {idx}: neighbor {n} is not a room in {csv_path}")
+
     # other functions 
     def neighbors_by_index(self, idx: int) -> list[int]:       
         '''Return neighbor indices for a vertex index'''
@@ -56,7 +342,45 @@ class SchoolGraph:
     
     def num_vertices(self) -> int:      
         return len(self.adj)
+
+    @property
+    def name_index(self):
+        '''Prefix/fuzzy room-name index (see Map_Names), kept in sync with add_room/close_room'''
+        if self._name_index is None:
+            from Map_Names import RoomNameIndex
+            self._name_index = RoomNameIndex(self.idx_to_name)
+        return self._name_index
+
+    def resolve_room(self, query: str) -> str:
+        '''Exact room name for a partial or misspelled query (KeyError if nothing is close)'''
+        if query in self.name_to_idx:
+            return query
+        return self.idx_to_name[self.name_index.resolve(query)]
+
+    def suggest_rooms(self, query: str, limit: int = 10) -> list[str]:
+        '''Room names for a kiosk search box: prefix matches, then close spellings'''
+        found = self.name_index.prefix(query, limit)
+        if len(found) < limit:
+            found += [idx for idx, _ in self.name_index.fuzzy(query, limit=limit) if idx not in found]
+        return [self.idx_to_name[idx] for idx in found[:limit]]
     
+    def to_csr(self) -> tuple[array, array]:
+        '''Return (offsets, targets): neighbors of v are targets[offsets[v]:offsets[v + 1]]'''
+        offsets = array("q", [0])
+        targets = array("i")
+        for v in range(max(self.adj.keys(), default=-1) + 1):
+            targets.extend(self.adj.get(v, []))
+            offsets.append(len(targets))
+        return offsets, targets
+
+    def _csr_arrays(self) -> tuple[array, array]:
+        # snapshot/streamed graphs already are CSR; dict graphs are converted once per version
+        if hasattr(self.adj, "offsets"):
+            return self.adj.offsets, self.adj.values
+        if self._csr is None or self._csr[0] != self._version:
+            self._csr = (self._version, *self.to_csr())
+        return self._csr[1], self._csr[2]
+
     def as_list_of_lists(self) -> list[list[int]]:
         '''Return adjacency list as a 0-indexed list of lists.'''
         n = max(self.adj.keys()) + 1
@@ -72,13 +396,12 @@ class SchoolGraph:
     def bfs_path(self, start_name: str, end_name: str) -> list[str] | None:
         start = self.name_to_idx[start_name]
         end = self.name_to_idx[end_name]
-
+        t0 = time.perf_counter() if self.trace_sink is not None else 0.0
 
         queue = deque([start])          
         visited: set[int] = set() 
         parent: dict[int, int] = {} 
 
-        queue.append(start)
         visited.add(start)
 
         while queue:
@@ -93,6 +416,8 @@ class SchoolGraph:
                     parent[neighbor] = current
                     queue.append(neighbor)
         
+        if self.trace_sink is not None:
+            self._trace("bfs", "bfs_path", start, parent, end, t0)
 
         if end not in visited:
             return None
@@ -110,39 +435,379 @@ class SchoolGraph:
         path_indices.reverse()
 
         return [self.idx_to_name[i] for i in path_indices]
-    
+
+    def bidirectional_bfs_path(self, start_name: str, end_name: str) -> list[str] | None:
+        '''Same hop count as bfs_path, searching from both ends (edges are two-way)'''
+        start = self.name_to_idx[start_name]
+        end = self.name_to_idx[end_name]
+        if start == end:
+            return [self.idx_to_name[start]]
+
+        parent_s: dict[int, int] = {start: start}
+        parent_t: dict[int, int] = {end: end}
+        dist_s: dict[int, int] = {start: 0}
+        dist_t: dict[int, int] = {end: 0}
+        frontier_s, frontier_t = [start], [end]
+
+        while frontier_s and frontier_t:
+            # grow the smaller side by one whole level, then take the best meeting
+            forward = len(frontier_s) <= len(frontier_t)
+            frontier, parent, dist, other = ((frontier_s, parent_s, dist_s, dist_t) if forward
+                                             else (frontier_t, parent_t, dist_t, dist_s))
+            best, meet = math.inf, None
+            next_frontier: list[int] = []
+            for current in frontier:
+                d = dist[current] + 1
+                for neighbor in self.adj.get(current, []):
+                    if neighbor not in dist:
+                        dist[neighbor] = d
+                        parent[neighbor] = current
+                        next_frontier.append(neighbor)
+                        if neighbor in other and d + other[neighbor] < best:
+                            best, meet = d + other[neighbor], neighbor
+            if forward:
+                frontier_s = next_frontier
+            else:
+                frontier_t = next_frontier
+
+            if meet is not None:
+                path = [meet]
+                while path[-1] != start:
+                    path.append(parent_s[path[-1]])
+                path.reverse()
+                while path[-1] != end:
+                    path.append(parent_t[path[-1]])
+                return [self.idx_to_name[i] for i in path]
+
+        return None
+
 
 # ------------------------------------------------------------------
- # Depth-First Search (DFS)
+# Cached BFS path queries
 # ------------------------------------------------------------------
-    def dfs_path(self, start_name: str, end_name: str) -> list[str] | None:
+    def slot_count(self) -> int:
+        '''Length of an array indexed by room id: covers every room and every neighbor id'''
+        version, n = self._slots
+        if version != self._version:
+            n = max(self.adj.keys(), default=-1) + 1
+            for v, row in self.adj.items():
+                if len(row):
+                    low, high = min(row), max(row)
+                    if low < 0:
+                        raise ValueError(f"room {v} has negative neighbor id {low}")
+                    if high >= n:
+                        n = high + 1
+            self._slots = (self._version, n)
+        return n
+
+    def _bfs_tree(self, start: int, into: BFSResult | None = None) -> BFSResult:
+        '''Full BFS from start, written into `into` (or a recycled BFSResult)'''
+        t0 = time.perf_counter() if self.trace_sink is not None else 0.0
+        n = self.slot_count()
+        if len(self._bfs_blank) != n:
+            self._bfs_blank = array("i", [-1]) * n
+        if len(self._bfs_queue) < n:
+            self._bfs_queue = array("i", [0]) * n
+        if into is None:
+            into = self._bfs_free.pop() if self._bfs_free else BFSResult(start, 0)
+        into._reset(start, self._bfs_blank)
+        parent, dist, queue = into.parent, into.dist, self._bfs_queue
+
+        # the queue array doubles as the discovery order
+        queue[0] = start
+        head, tail = 0, 1
+        while head < tail:
+            current = queue[head]
+            head += 1
+            d = dist[current] + 1
+            for neighbor in self.adj.get(current, []):
+                if dist[neighbor] < 0:
+                    dist[neighbor] = d
+                    parent[neighbor] = current
+                    queue[tail] = neighbor
+                    tail += 1
+
+        if self.trace_sink is not None:
+            self._trace("bfs", "bfs_tree", start, {v: parent[v] for v in queue[1:tail]}, None, t0)
+        return into
+
+    def _recycle(self, result: BFSResult) -> None:
+        # a caller may still be reading a handed-out result; let it go to the GC instead
+        if not result._handed_out and len(self._bfs_free) < 4:
+            self._bfs_free.append(result)
+
+    def bfs_tree_from(self, start: int) -> BFSResult:
+        '''BFS result of start, served from the LRU cache when possible'''
+        result = self._cached_bfs(start)
+        result._handed_out = True
+        return result
+
+    def _cached_bfs(self, start: int) -> BFSResult:
+        # for callers that are done with the result before the next cache change
+        t0 = time.perf_counter() if self.trace_sink is not None else 0.0
+        cache = self._bfs_cache
+        tree = cache.get(start)
+        if tree is not None:
+            self.cache_hits += 1
+            cache.move_to_end(start)
+            if self.trace_sink is not None:
+                self._trace("hit", "bfs_tree", start, {}, None, t0)
+            return tree
+
+        self.cache_misses += 1
+        tree = self._bfs_tree(start)
+        cache[start] = tree
+        if len(cache) > self.path_cache_size:
+            _, evicted = cache.popitem(last=False)   # evict least recently used source
+            if evicted is not tree:     # path_cache_size 0: the new result still goes to the caller
+                self._recycle(evicted)
+        return tree
+
+    def bfs_result(self, start_name: str) -> BFSResult:
+        '''Cached BFS of a room: paths, distances, spanning tree and eccentricity all come from it'''
+        return self.bfs_tree_from(self.name_to_idx[start_name])
+
+    def cached_bfs_path(self, start_name: str, end_name: str) -> list[str] | None:
+        '''Same result as bfs_path, but one BFS answers every destination of start'''
         start = self.name_to_idx[start_name]
         end = self.name_to_idx[end_name]
 
-        visited: set[int] = set()
-        parent: dict[int, int] = {}
+        path = self._cached_bfs(start).path(end)
+        if path is None:
+            return None
+        return [self.idx_to_name[i] for i in path]
 
-        # recursive helper function: mark the current room visited
-        def dfs(current: int) -> bool:
-            visited.add(current)
-            if current == end:
-                return True 
-            
-            # try each neighbor. if not visited: mark as parent
+    def invalidate_path_cache(self) -> None:
+        '''Drop every cached tree; call after editing self.adj directly'''
+        self._clear_bfs_cache()
+        self._version += 1
+
+    def _clear_bfs_cache(self) -> None:
+        # same graph, new storage (see Map_Backend.convert): the version and every
+        # version-keyed table (CH, connectivity, facilities, ...) stay valid
+        for result in self._bfs_cache.values():
+            self._recycle(result)
+        self._bfs_cache.clear()
+
+    def cache_info(self) -> dict[str, int]:
+        return {"hits": self.cache_hits, "misses": self.cache_misses,
+                "size": len(self._bfs_cache), "max_size": self.path_cache_size}
+
+
+# ------------------------------------------------------------------
+# Instrumentation (see Map_Trace); only runs when trace_sink is set
+# ------------------------------------------------------------------
+    @contextmanager
+    def tracing(self, sink):
+        '''with graph.tracing(sink): ... reports every traversal inside the block to sink'''
+        previous = self.trace_sink
+        self.trace_sink = sink
+        try:
+            yield sink
+        finally:
+            self.trace_sink = previous
+
+    def _trace(self, kind: str, op: str, start: int, found_map: dict[int, int], end: int | None,
+               t0: float, found: bool = False) -> None:
+        seconds = time.perf_counter() - t0
+        import Map_Trace
+        if kind == "bfs":
+            stats = Map_Trace.bfs_stats(op, self.adj, start, found_map, end, seconds)
+        elif kind == "dfs":
+            stats = Map_Trace.dfs_stats(op, self.adj, start, found_map, end, found, seconds)
+        else:
+            stats = Map_Trace.cache_hit(op, start, seconds)
+        self.trace_sink(stats)
+
+
+# ------------------------------------------------------------------
+# Editing the graph (cached BFS trees are repaired, not rebuilt)
+# ------------------------------------------------------------------
+    def add_room(self, name: str, neighbor_names: list[str] | None = None,
+                 coords: tuple[float, float, float] | None = None, category: str | None = None) -> int:
+        '''Add a new room (optionally connected to existing rooms) and return its index'''
+        if name in self.name_to_idx:
+            raise ValueError(f"room {name!r} already exists")
+        self._make_mutable()
+
+        idx = max(self.idx_to_name, default=-1) + 1
+        self.adj[idx] = []
+        self.weights[idx] = []
+        self.idx_to_name[idx] = name
+        self.name_to_idx[name] = idx
+        if coords is not None:
+            self.coords[idx] = coords
+        if category is not None:
+            self.categories[idx] = category
+        if self._name_index is not None:
+            self._name_index.add(idx, name)
+        for result in self._bfs_cache.values():
+            result._grow(idx + 1)
+        self._version += 1
+
+        for neighbor in neighbor_names or []:
+            self.add_edge(name, neighbor)
+        return idx
+
+    def close_room(self, name: str) -> list[str]:
+        '''Remove a room and all its doors; returns the former neighbors so it can be reopened'''
+        self._make_mutable()
+        idx = self.name_to_idx[name]
+        former = list(dict.fromkeys(self.idx_to_name[n] for n in self.adj[idx] if n != idx))
+
+        for neighbor in former:
+            self.remove_edge(name, neighbor)
+
+        closed = self._bfs_cache.pop(idx, None)
+        if closed is not None:
+            self._recycle(closed)
+        del self.adj[idx]
+        del self.weights[idx]
+        del self.idx_to_name[idx]
+        del self.name_to_idx[name]
+        self.coords.pop(idx, None)
+        self.categories.pop(idx, None)
+        if self._name_index is not None:
+            self._name_index.remove(idx)
+        self._version += 1
+        return former
+
+    def add_edge(self, u_name: str, v_name: str, weight: float = 1.0) -> None:
+        '''Open a door/hallway between two rooms'''
+        self._make_mutable()
+        u = self.name_to_idx[u_name]
+        v = self.name_to_idx[v_name]
+
+        self.adj[u].append(v)
+        self.weights[u].append(weight)
+        if u != v:
+            self.adj[v].append(u)
+            self.weights[v].append(weight)
+        self._version += 1
+
+        for result in self._bfs_cache.values():
+            self._repair_after_insert(result, u, v)
+
+    def remove_edge(self, u_name: str, v_name: str) -> None:
+        '''Close every door between two rooms'''
+        self._make_mutable()
+        u = self.name_to_idx[u_name]
+        v = self.name_to_idx[v_name]
+        if v not in self.adj[u]:
+            raise KeyError(f"no edge {u_name!r}-{v_name!r}")
+
+        for a, b in ((u, v), (v, u)):
+            keep = [i for i, n in enumerate(self.adj[a]) if n != b]
+            self.adj[a] = [self.adj[a][i] for i in keep]
+            self.weights[a] = [self.weights[a][i] for i in keep]
+        self._version += 1
+
+        for result in self._bfs_cache.values():
+            parent = result.parent
+            if v != result.source and parent[v] == u:
+                self._repair_after_delete(result, v)
+            elif u != result.source and parent[u] == v:
+                self._repair_after_delete(result, u)
+            # otherwise u-v was not a tree edge and every distance still holds
+
+    def _repair_after_insert(self, result: BFSResult, u: int, v: int) -> None:
+        parent, dist = result.parent, result.dist
+        if dist[u] < 0 and dist[v] < 0:
+            return
+        if dist[u] < 0 or (dist[v] >= 0 and dist[u] > dist[v]):
+            u, v = v, u
+        if 0 <= dist[v] <= dist[u] + 1:
+            return
+
+        # v got closer: push the decrease outwards level by level
+        dist[v] = dist[u] + 1
+        parent[v] = u
+        queue = deque([v])
+        while queue:
+            current = queue.popleft()
+            d = dist[current] + 1
             for neighbor in self.adj.get(current, []):
-                if neighbor not in visited:
+                if dist[neighbor] < 0 or d < dist[neighbor]:
+                    dist[neighbor] = d
                     parent[neighbor] = current
-                    if dfs(neighbor):
-                        return True  
-
-            return False  
+                    queue.append(neighbor)
 
-        found = dfs(start)
+    def _repair_after_delete(self, result: BFSResult, child: int) -> None:
+        parent, dist = result.parent, result.dist
+        # 1. walk the lost subtree top-down; a room keeps its distance if some
+        #    unaffected neighbor one level closer can adopt it
+        affected: set[int] = set()
+        queue = deque([child])
+        while queue:
+            x = queue.popleft()
+            dx = dist[x]
+            for y in self.adj.get(x, []):
+                if dist[y] == dx - 1 and y not in affected:
+                    parent[x] = y
+                    break
+            else:
+                affected.add(x)
+                for y in self.adj.get(x, []):
+                    if parent[y] == x and y != x and y not in affected:
+                        queue.append(y)
+
+        if not affected:
+            return
+
+        # 2. rooms that lost their distance get the best offer from the
+        #    unaffected part of the tree, then settle Dijkstra-style
+        for x in affected:
+            dist[x] = -1
+            parent[x] = -1
+        heap: list[tuple[int, int, int]] = []
+        for x in affected:
+            for y in self.adj.get(x, []):
+                if dist[y] >= 0 and y not in affected:
+                    heapq.heappush(heap, (dist[y] + 1, x, y))
+
+        while heap:
+            d, x, p = heapq.heappop(heap)
+            if dist[x] >= 0:
+                continue
+            dist[x] = d
+            parent[x] = p
+            for y in self.adj.get(x, []):
+                if y in affected and dist[y] < 0:
+                    heapq.heappush(heap, (d + 1, y, x))
 
-        if not found:
-            return None
 
-        # construct path
+# ------------------------------------------------------------------
+# Weighted shortest paths (Dijkstra / A*)
+# ------------------------------------------------------------------
+    def edge_weight(self, u: int, v: int) -> float:
+        '''Return the walking distance of edge u-v (smallest one if listed twice)'''
+        best = math.inf
+        for neighbor, w in zip(self.adj.get(u, []), self.weights.get(u, [])):
+            if neighbor == v and w < best:
+                best = w
+        if best == math.inf:
+            raise KeyError(f"no edge {u}-{v}")
+        return best
+
+    def path_cost(self, path_names: list[str]) -> float:
+        '''Total walking distance of a path given as room names'''
+        path = [self.name_to_idx[name] for name in path_names]
+        return sum(self.edge_weight(u, v) for u, v in zip(path, path[1:]))
+
+    def _heuristic(self, v: int, target: int) -> float:
+        # straight-line distance, with floor changes counted as FLOOR_HEIGHT each.
+        # Only a lower bound when weights are real distances, so without
+        # weights (or coordinates) A* degrades to Dijkstra.
+        if not self.has_weights:
+            return 0.0
+        a = self.coords.get(v)
+        b = self.coords.get(target)
+        if a is None or b is None:
+            return 0.0
+        dz = (a[2] - b[2]) * FLOOR_HEIGHT
+        return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + dz * dz)
+
+    def _reconstruct_path(self, parent: dict[int, int], start: int, end: int) -> list[str]:
         path_indices: list[int] = []
         cur = end
         while True:
@@ -154,36 +819,139 @@ class SchoolGraph:
         path_indices.reverse()
         return [self.idx_to_name[i] for i in path_indices]
 
-    def num_vertices(self) -> int:
-        return len(self.adj)
+    def dijkstra_path(self, start_name: str, end_name: str) -> list[str] | None:
+        '''Shortest path by walking distance (binary heap Dijkstra)'''
+        return self.astar_path(start_name, end_name, use_heuristic=False)
+
+    def astar_path(self, start_name: str, end_name: str, use_heuristic: bool = True) -> list[str] | None:
+        '''Shortest path by walking distance, guided by the coordinates when available'''
+        start = self.name_to_idx[start_name]
+        end = self.name_to_idx[end_name]
 
+        dist: dict[int, float] = {start: 0.0}
+        parent: dict[int, int] = {}
+        h0 = self._heuristic(start, end) if use_heuristic else 0.0
+        heap: list[tuple[float, float, int]] = [(h0, 0.0, start)]
 
-# ---------------------------------------------------------------
-# # BFS SPANNING TREE 
-# ---------------------------------------------------------------
-    def bfs_spanning_tree(self, start_name: str) -> dict[int, list[int]]:
-        from collections import deque
+        while heap:
+            _, d, current = heapq.heappop(heap)
+            if d > dist[current]:
+                continue    # stale heap entry
+            if current == end:
+                return self._reconstruct_path(parent, start, end)
+
+            for neighbor, w in zip(self.adj.get(current, []), self.weights.get(current, [])):
+                nd = d + w
+                if nd < dist.get(neighbor, math.inf):
+                    dist[neighbor] = nd
+                    parent[neighbor] = current
+                    h = self._heuristic(neighbor, end) if use_heuristic else 0.0
+                    heapq.heappush(heap, (nd + h, nd, neighbor))
+
+        return None
+
+    # alternative routes (see Map_Routes) --------------------------
+    def _cached_route(self, key: tuple, compute):
+        # LRU like the BFS cache, emptied when the graph changes
+        version, memo = self._routes
+        if version != self._version:
+            memo = OrderedDict()
+            self._routes = (self._version, memo)
+        if key in memo:
+            memo.move_to_end(key)
+            return memo[key]
+        found = memo[key] = compute()
+        if len(memo) > self.route_cache_size:
+            memo.popitem(last=False)
+        return found
+
+    def k_shortest_paths(self, start_name: str, end_name: str, k: int = 3) -> list[list[str]]:
+        '''Up to k simple paths, shortest first (hops, or walking distance when weighted)'''
+        start = self.name_to_idx[start_name]
+        end = self.name_to_idx[end_name]
+        import Map_Routes
+        paths = self._cached_route((start, end, k), lambda: [path for _, path in
+                                                             Map_Routes.k_shortest(self, start, end, k)])
+        return [[self.idx_to_name[v] for v in path] for path in paths]
+
+    def alternative_route(self, start_name: str, end_name: str, avoid_rooms: bool = False) -> list[str] | None:
+        '''A route using none of the shortest path's corridors (nor its rooms, with avoid_rooms)'''
+        start = self.name_to_idx[start_name]
+        end = self.name_to_idx[end_name]
+        import Map_Routes
+
+        def compute():
+            found = Map_Routes.alternative(self, start, end, avoid_rooms)
+            return found[1] if found is not None else None
+
+        path = self._cached_route((start, end, "rooms" if avoid_rooms else "corridors"), compute)
+        return [self.idx_to_name[v] for v in path] if path is not None else None
 
+
+# ------------------------------------------------------------------
+ # Depth-First Search (DFS)
+# ------------------------------------------------------------------
+    def dfs_path(self, start_name: str, end_name: str) -> list[str] | None:
         start = self.name_to_idx[start_name]
-        queue = deque([start])
+        end = self.name_to_idx[end_name]
+        t0 = time.perf_counter() if self.trace_sink is not None else 0.0
+
+        parent, _, found = self._dfs(start, end)
+        if self.trace_sink is not None:
+            self._trace("dfs", "dfs_path", start, parent, end, t0, found)
+
+        if not found:
+            return None
+
+        return self._reconstruct_path(parent, start, end)
+
+    def _dfs(self, start: int, end: int | None = None) -> tuple[dict[int, int], set[int], bool]:
+        '''Depth-first search with an explicit stack instead of recursion.
+
+        Each stack entry is a room plus the iterator over its neighbors, so
+        rooms are visited in exactly the order the recursive version used
+        and the depth is only limited by memory. Stops early at end.'''
         visited: set[int] = {start}
         parent: dict[int, int] = {}
-
-        while queue:
-            current = queue.popleft()
-            for neighbor in self.adj.get(current, []):
+        if start == end:
+            return parent, visited, True
+
+        adj = self.adj
+        add = visited.add
+        current = start
+        neighbors = iter(adj.get(start, []))
+        stack: list[tuple[int, Iterator[int]]] = []     # rooms we will come back to
+        while True:
+            # try each neighbor. if not visited: mark as parent and go deeper
+            for neighbor in neighbors:
                 if neighbor not in visited:
-                    visited.add(neighbor)
+                    add(neighbor)
                     parent[neighbor] = current
-                    queue.append(neighbor)
+                    if neighbor == end:
+                        return parent, visited, True
+                    stack.append((current, neighbors))
+                    current = neighbor
+                    neighbors = iter(adj.get(neighbor, []))
+                    break
+            else:
+                # every neighbor done: backtrack
+                if not stack:
+                    break
+                current, neighbors = stack.pop()
+
+        return parent, visited, False
 
-        # Build tree adjacency list
-        tree_adj: dict[int, list[int]] = {v: [] for v in visited}
-        for child, par in parent.items():
-            tree_adj[par].append(child)
-            tree_adj[child].append(par)
+    def num_vertices(self) -> int:
+        return len(self.adj)
 
-        return tree_adj
+
+# ---------------------------------------------------------------
+# # BFS SPANNING TREE 
+# ---------------------------------------------------------------
+    def bfs_spanning_tree(self, start_name: str) -> dict[int, list[int]]:
+        start = self.name_to_idx[start_name]
+        # the cached tree is kept up to date by add_edge / remove_edge
+        return self._cached_bfs(start).tree()
 
 
 # ---------------------------------------------------------------
@@ -191,17 +959,10 @@ class SchoolGraph:
 # ---------------------------------------------------------------
     def dfs_spanning_tree(self, start_name: str) -> dict[int, list[int]]:
         start = self.name_to_idx[start_name]
-        visited: set[int] = set()
-        parent: dict[int, int] = {}
-
-        def dfs(current: int) -> None:
-            visited.add(current)
-            for neighbor in self.adj.get(current, []):
-                if neighbor not in visited:
-                    parent[neighbor] = current
-                    dfs(neighbor)
-
-        dfs(start)
+        t0 = time.perf_counter() if self.trace_sink is not None else 0.0
+        parent, visited, _ = self._dfs(start)
+        if self.trace_sink is not None:
+            self._trace("dfs", "dfs_spanning_tree", start, parent, None, t0)
 
         # Build tree adjacency list
         tree_adj: dict[int, list[int]] = {v: [] for v in visited}
@@ -211,48 +972,317 @@ class SchoolGraph:
 
         return tree_adj
 
-    def spanning_tree_names(self, tree_adj: dict[int, list[int]]) -> dict[str, list[str]]:  # convert spanning tree to names instead of indices
-        name_adj: dict[str, list[str]] = {}
-        for idx, neighbors in tree_adj.items():
-            room_name = self.idx_to_name[idx]
-            name_adj[room_name] = [self.idx_to_name[n] for n in neighbors]
-        return name_adj
+    def spanning_tree_names(self, tree) -> TreeNames:  # view a spanning tree by room names instead of indices
+        # lazy: names are looked up per access, nothing is copied up front
+        return TreeNames(self, tree)
+
+
+# ---------------------------------------------------------------
+# MINIMUM SPANNING TREES (parent arrays: parent[root] == root, -1 = not in tree)
+# ---------------------------------------------------------------
+    def _weighted_edges(self) -> list[tuple[float, int, int]]:
+        # every listed edge once per direction; union-find drops the repeats
+        edges = []
+        for u, row in self.adj.items():
+            for v, w in zip(row, self.weights.get(u, [])):
+                if u != v:
+                    edges.append((w, u, v))
+        return edges
+
+    def kruskal_mst(self) -> array:
+        '''Minimum spanning forest by edge weight (Kruskal, union-find with path compression)'''
+        n = max(self.adj.keys(), default=-1) + 1
+        root = list(range(n))
+        size = [1] * n
+
+        def find(x: int) -> int:
+            top = x
+            while root[top] != top:
+                top = root[top]
+            while root[x] != top:   # compress the path we just walked
+                root[x], x = top, root[x]
+            return top
+
+        tree_adj: dict[int, list[int]] = {v: [] for v in self.adj}
+        edges = self._weighted_edges()
+        edges.sort()
+        needed = len(tree_adj) - 1
+        for w, u, v in edges:
+            a, b = find(u), find(v)
+            if a == b:
+                continue
+            if size[a] < size[b]:
+                a, b = b, a
+            root[b] = a
+            size[a] += size[b]
+            tree_adj[u].append(v)
+            tree_adj[v].append(u)
+            needed -= 1
+            if needed == 0:
+                break
+
+        # hang each tree of the forest from its smallest room
+        parent = array("i", [-1]) * n
+        for start in tree_adj:
+            if parent[start] >= 0:
+                continue
+            parent[start] = start
+            stack = [start]
+            while stack:
+                current = stack.pop()
+                for neighbor in tree_adj[current]:
+                    if parent[neighbor] < 0:
+                        parent[neighbor] = current
+                        stack.append(neighbor)
+        return parent
+
+    def prim_mst(self, start_name: str | None = None) -> array:
+        '''Minimum spanning tree of start's component by Prim (binary heap); every component if no start'''
+        n = max(self.adj.keys(), default=-1) + 1
+        parent = array("i", [-1]) * n
+        starts = [self.name_to_idx[start_name]] if start_name is not None else list(self.adj)
+
+        for start in starts:
+            if parent[start] >= 0:
+                continue
+            heap: list[tuple[float, int, int]] = [(0.0, start, start)]
+            while heap:
+                _, v, par = heapq.heappop(heap)
+                if parent[v] >= 0:
+                    continue    # already joined by a cheaper edge
+                parent[v] = par
+                for neighbor, w in zip(self.adj.get(v, []), self.weights.get(v, [])):
+                    if parent[neighbor] < 0:
+                        heapq.heappush(heap, (w, neighbor, v))
+        return parent
+
+    def tree_weight(self, parent) -> float:
+        '''Total edge weight of a parent-array tree'''
+        return sum(self.edge_weight(v, par) for v, par in enumerate(parent) if par >= 0 and par != v)
 
 
 
 # ---------------------------------------------------------------
-# ECCENTRICITY
+# CONNECTIVITY: components, bridges, articulation points
 # ---------------------------------------------------------------
-    def bfs_distances_from(self, start_idx: int) -> dict[int, int]:
-        queue = deque([start_idx])
-        # distance to start is 0
-        distances: dict[int, int] = {start_idx: 0}
+    def _connectivity(self) -> dict:
+        '''Components, bridges and articulation points, computed once per graph version'''
+        if self._structure is not None and self._structure[0] == self._version:
+            return self._structure[1]
+
+        adj = self.adj
+        disc: dict[int, int] = {}       # DFS discovery time
+        low: dict[int, int] = {}        # earliest discovery time reachable through the subtree
+        component_of: dict[int, int] = {}
+        components: list[list[int]] = []
+        bridges: list[tuple[int, int]] = []
+        cut_rooms: set[int] = set()
+        timer = 0
+
+        for root in adj:
+            if root in disc:
+                continue
+            comp_id = len(components)
+            members = [root]
+            component_of[root] = comp_id
+            disc[root] = low[root] = timer
+            timer += 1
+            root_children = 0
+            # frame: [room, parent, neighbor iterator, parent edge already skipped]
+            stack = [[root, -1, iter(adj.get(root, [])), False]]
+
+            while stack:
+                frame = stack[-1]
+                v = frame[0]
+                for w in frame[2]:
+                    if w == v:
+                        continue    # self-loop
+                    if w == frame[1] and not frame[3]:
+                        frame[3] = True     # skip the tree edge once; a parallel copy counts as a back edge
+                        continue
+                    if w in disc:
+                        if disc[w] < low[v]:
+                            low[v] = disc[w]
+                    else:
+                        disc[w] = low[w] = timer
+                        timer += 1
+                        component_of[w] = comp_id
+                        members.append(w)
+                        stack.append([w, v, iter(adj.get(w, [])), False])
+                        break
+                else:
+                    stack.pop()
+                    if stack:
+                        u = stack[-1][0]
+                        if low[v] < low[u]:
+                            low[u] = low[v]
+                        if low[v] > disc[u]:
+                            bridges.append((u, v))
+                        if u == root:
+                            root_children += 1
+                        elif low[v] >= disc[u]:
+                            cut_rooms.add(u)
+
+            if root_children >= 2:
+                cut_rooms.add(root)
+            components.append(members)
+
+        result = {"component_of": component_of, "components": components,
+                  "bridges": bridges, "articulation_points": sorted(cut_rooms)}
+        self._structure = (self._version, result)
+        return result
+
+    def connected_components(self) -> list[list[int]]:
+        '''Rooms grouped by connected component, largest first'''
+        # copies: the cached lists are shared by every later call for this version
+        return sorted((list(c) for c in self._connectivity()["components"]), key=len, reverse=True)
+
+    def same_component(self, a_name: str, b_name: str) -> bool:
+        component_of = self._connectivity()["component_of"]
+        return component_of[self.name_to_idx[a_name]] == component_of[self.name_to_idx[b_name]]
+
+    def cut_off_rooms(self, start_name: str) -> list[str]:
+        '''Rooms that cannot be reached from start at all'''
+        component_of = self._connectivity()["component_of"]
+        home = component_of[self.name_to_idx[start_name]]
+        return [self.idx_to_name[v] for v, c in component_of.items() if c != home]
+
+    def bridges(self) -> list[tuple[int, int]]:
+        '''Doors/hallways whose closing splits a component'''
+        return list(self._connectivity()["bridges"])
+
+    def articulation_points(self) -> list[int]:
+        '''Rooms whose closing splits a component'''
+        return list(self._connectivity()["articulation_points"])
 
-        while queue:
-            current = queue.popleft()
-            current_dist = distances[current]
 
-            for neighbor in self.adj.get(current, []):
-                if neighbor not in distances:
-                    # first time we see this neighbor -> record its distance
-                    distances[neighbor] = current_dist + 1
-                    queue.append(neighbor)
+# ---------------------------------------------------------------
+# NEAREST FACILITY (one multi-source search, see Map_Facility)
+# ---------------------------------------------------------------
+    def nearest_facility(self, targets: list[str] | None = None, category: str | None = None):
+        '''Nearest of the target rooms (given by name, or every room of a category) for every room.
+
+        Returns a Map_Facility.NearestFacility: table[name] is (target, distance,
+        next hop). Cached until the graph changes.'''
+        if targets is not None:
+            found = sorted({self.name_to_idx[name] for name in targets})
+        elif category is not None:
+            found = sorted(v for v, kind in self.categories.items() if kind == category)
+            if not found:
+                raise KeyError(f"no rooms in category {category!r}")
+        else:
+            raise ValueError("give target room names or a category")
+
+        version, tables = self._facilities
+        if version != self._version:
+            tables = {}
+            self._facilities = (self._version, tables)
+        key = tuple(found)
+        table = tables.get(key)
+        if table is None:
+            import Map_Facility
+            table = tables[key] = Map_Facility.nearest_facilities(self, found)
+        return table
+
+
+# ---------------------------------------------------------------
+# BETWEENNESS CENTRALITY (crowding hotspots, see Map_Centrality)
+# ---------------------------------------------------------------
+    def betweenness(self, samples: int | None = None, epsilon: float | None = None, delta: float = 0.05,
+                    workers: int = 1, seed: int = 0):
+        '''Brandes betweenness of every room and corridor (sampled sources when samples/epsilon is set)'''
+        import Map_Centrality
+        return Map_Centrality.betweenness(self, samples, epsilon, delta, workers, seed)
+
+    def hotspots(self, k: int = 10, **options) -> tuple[list[tuple[str, float]], list[tuple[str, str, float]]]:
+        '''The k rooms and k corridors on the most shortest paths (options go to betweenness)'''
+        result = self.betweenness(**options)
+        offsets, targets = self._csr_arrays()
+        rooms = sorted(self.adj, key=lambda v: -result.rooms[v])[:k]
+
+        # both directions of a corridor count toward the same corridor
+        corridors: dict[tuple[int, int], float] = {}
+        for v in self.adj:
+            for pos in range(offsets[v], offsets[v + 1]):
+                key = (min(v, targets[pos]), max(v, targets[pos]))
+                corridors[key] = corridors.get(key, 0.0) + result.corridors[pos]
+        busiest = sorted(corridors.items(), key=lambda item: -item[1])[:k]
+
+        names = self.idx_to_name
+        return ([(names[v], result.rooms[v]) for v in rooms],
+                [(names[a], names[b], score) for (a, b), score in busiest])
+
 
-        return distances
+# ---------------------------------------------------------------
+# ECCENTRICITY
+# ---------------------------------------------------------------
+    def bfs_distances_from(self, start_idx: int) -> dict[int, int]:
+        '''idx -> hops from start_idx, read off the cached BFS result'''
+        return self._cached_bfs(start_idx).distances()
+
+    def bfs_levels(self, start_idx: int, vectorized: bool = True):
+        '''Level-synchronous BFS: distance of every index from start_idx (-1 = unreachable).
+
+        With NumPy the whole frontier is expanded at once by fancy indexing
+        into the CSR arrays; otherwise (or with vectorized=False) the same
+        levels are computed in pure Python. Returns an ndarray or array('i').'''
+        offsets, targets = self._csr_arrays()
+        n = len(offsets) - 1
+
+        if vectorized and np is not None:
+            offs = np.frombuffer(offsets, dtype=np.int64)
+            tgts = np.frombuffer(targets, dtype=np.int32)
+            dist = np.full(n, -1, dtype=np.int32)
+            dist[start_idx] = 0
+            frontier = np.array([start_idx], dtype=np.int64)
+            level = 0
+            while frontier.size:
+                level += 1
+                starts = offs[frontier]
+                counts = offs[frontier + 1] - starts
+                total = int(counts.sum())
+                if total == 0:
+                    break
+                # positions of every neighbor of every frontier room in targets
+                row_base = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+                neighbors = tgts[np.arange(total) + row_base]
+                neighbors = np.unique(neighbors[dist[neighbors] < 0])
+                dist[neighbors] = level
+                frontier = neighbors.astype(np.int64)
+            return dist
+
+        dist = array("i", [-1]) * n
+        dist[start_idx] = 0
+        frontier = [start_idx]
+        level = 0
+        while frontier:
+            level += 1
+            next_frontier = []
+            for v in frontier:
+                for w in targets[offsets[v]:offsets[v + 1]]:
+                    if dist[w] < 0:
+                        dist[w] = level
+                        next_frontier.append(w)
+            frontier = next_frontier
+        return dist
 
     def graph_eccentricity(self) -> int:
         max_distance_overall = 0
 
-        # loop every vertex as a starting point
+        # loop every vertex as a starting point; one result's arrays are refilled
+        # each time instead of caching a tree per room
+        scratch = None
         for v in self.adj.keys():
-            distances = self.bfs_distances_from(v)
+            scratch = self._bfs_tree(v, scratch)
 
             # farthest vertex 
-            local_max = max(distances.values())
+            local_max = scratch.eccentricity()
 
             if local_max > max_distance_overall:
                 max_distance_overall = local_max
 
+        if scratch is not None:
+            self._recycle(scratch)
         return max_distance_overall
     
 if __name__ == "__main__":
@@ -279,6 +1309,10 @@ if __name__ == "__main__":
     print(f"\nDFS path from {start} to {end} :")
     print(dfs_result)
 
+    dijkstra_result = graph.dijkstra_path(start, end)
+    print(f"\nDijkstra path from {start} to {end} (cost {graph.path_cost(dijkstra_result)}):")
+    print(dijkstra_result)
+
 
     # # Spanning trees
     # bfs_tree = graph.bfs_spanning_tree(start)
@@ -290,6 +1324,9 @@ if __name__ == "__main__":
     # print("\nDFS Spanning Tree (by room names):")
     # print(graph.spanning_tree_names(dfs_tree))
 
+    cut_rooms = [graph.idx_to_name[v] for v in graph.articulation_points()]
+    print(f"\n{len(graph.connected_components())} component(s); {len(cut_rooms)} rooms would split the building if closed")
+
     ecc = graph.graph_eccentricity()
     print("\nEccentricity of the Horace Mapp graph (in edges):", ecc)
 
@@ -0,0 +1,226 @@
+'''
+Hierarchical (multi-level) routing for campus-sized graphs.
+
+The rooms are split into clusters: floors or buildings, taken from a CSV
+column, or grown automatically. A portal is a room with a door into
+another cluster (stairs, elevators, exits such as "Elevator MD").
+
+Preprocessing runs one BFS per portal, restricted to its own cluster.
+That gives, for every room, the distance to each portal of its cluster,
+plus the portal-to-portal distances inside the cluster. The overlay graph
+has only portals as nodes. Its edges are those intra-cluster distances
+and the real doors between clusters.
+
+A query never searches the whole campus. It reads the start's and end's
+distances to their own portals, runs Dijkstra over the small overlay,
+and unpacks the answer through the stored BFS trees. Hop counts match
+SchoolGraph.bfs_path.
+
+The tables are built for one version of the graph. After an edit the next
+query rebuilds them (regrowing automatic clusters); rooms added to a
+graph with given clusters need a label, so that case raises instead.
+'''
+
+import csv
+import heapq
+import math
+from collections import deque
+
+from Map_Find import SchoolGraph
+
+
+def read_cluster_column(csv_path: str, column: str) -> dict[int, str]:
+    '''idx -> value of `column` (e.g. "floor" or "building") for every row of a graph CSV'''
+    with open(csv_path, newline="") as f:
+        return {int(row["idx"]): (row.get(column) or "").strip() for row in csv.DictReader(f)}
+
+
+def grow_clusters(graph: SchoolGraph, size: int = 256) -> dict[int, int]:
+    '''Split the rooms into connected clusters of about `size` rooms by BFS region growing'''
+    cluster_of: dict[int, int] = {}
+    label = 0
+    for seed in graph.adj:
+        if seed in cluster_of:
+            continue
+        cluster_of[seed] = label
+        queue = deque([seed])
+        count = 1
+        while queue and count < size:
+            current = queue.popleft()
+            for neighbor in graph.adj.get(current, []):
+                if neighbor not in cluster_of and count < size:
+                    cluster_of[neighbor] = label
+                    queue.append(neighbor)
+                    count += 1
+        label += 1
+    return cluster_of
+
+
+class HierarchicalRouter:
+    def __init__(self, graph: SchoolGraph, clusters: dict[int, object] | None = None,
+                 cluster_size: int = 256) -> None:
+        self.graph = graph
+        self.cluster_size = cluster_size
+        self.grown = clusters is None
+        self.cluster_of = dict(clusters) if clusters is not None else grow_clusters(graph, cluster_size)
+        self._build()
+
+    def _check_version(self) -> None:
+        if self.graph._version == self._version:
+            return
+        if self.grown:
+            self.cluster_of = grow_clusters(self.graph, self.cluster_size)
+        else:
+            missing = [v for v in self.graph.adj if v not in self.cluster_of]
+            if missing:
+                raise RuntimeError(f"rooms {missing[:5]} were added after the router was built "
+                                   "and have no cluster; build a new router with their labels")
+        self._build()
+
+    def _build(self) -> None:
+        self._version = self.graph._version
+        adj = self.graph.adj
+        cluster_of = self.cluster_of
+
+        # portals: rooms with a door into another cluster
+        self.portals_of: dict[object, list[int]] = {}
+        self.exits: dict[int, list[int]] = {}
+        for v in adj:
+            outside = [w for w in adj.get(v, []) if cluster_of[w] != cluster_of[v]]
+            if outside:
+                self.exits[v] = outside
+                self.portals_of.setdefault(cluster_of[v], []).append(v)
+
+        # one BFS per portal inside its cluster: parent + distance for every room there
+        self.trees: dict[int, tuple[dict[int, int], dict[int, int]]] = {}
+        for portal in self.exits:
+            home = cluster_of[portal]
+            parent: dict[int, int] = {}
+            dist: dict[int, int] = {portal: 0}
+            queue = deque([portal])
+            while queue:
+                current = queue.popleft()
+                d = dist[current] + 1
+                for neighbor in adj.get(current, []):
+                    if neighbor not in dist and cluster_of[neighbor] == home:
+                        dist[neighbor] = d
+                        parent[neighbor] = current
+                        queue.append(neighbor)
+            self.trees[portal] = (parent, dist)
+
+        # overlay: portal -> [(portal, hops)]
+        self.overlay: dict[int, list[tuple[int, int]]] = {p: [] for p in self.exits}
+        for portals in self.portals_of.values():
+            for p in portals:
+                dist = self.trees[p][1]
+                for q in portals:
+                    if q != p and q in dist:
+                        self.overlay[p].append((q, dist[q]))
+        for p, outside in self.exits.items():
+            for q in outside:
+                self.overlay[p].append((q, 1))
+
+    def stats(self) -> dict[str, int]:
+        return {"rooms": len(self.cluster_of), "clusters": len(set(self.cluster_of.values())),
+                "portals": len(self.exits),
+                "overlay_edges": sum(len(edges) for edges in self.overlay.values()),
+                "stored_tree_entries": sum(len(dist) for _, dist in self.trees.values())}
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _portal_distances(self, v: int) -> dict[int, int]:
+        '''Distance from v to every portal of its cluster that it can reach inside the cluster'''
+        found = {}
+        for portal in self.portals_of.get(self.cluster_of[v], []):
+            d = self.trees[portal][1].get(v)
+            if d is not None:
+                found[portal] = d
+        return found
+
+    def _local_path(self, s: int, t: int) -> list[int] | None:
+        '''BFS that stays inside s's cluster'''
+        home = self.cluster_of[s]
+        parent: dict[int, int] = {s: s}
+        queue = deque([s])
+        while queue:
+            current = queue.popleft()
+            if current == t:
+                path = [t]
+                while path[-1] != s:
+                    path.append(parent[path[-1]])
+                path.reverse()
+                return path
+            for neighbor in self.graph.adj.get(current, []):
+                if neighbor not in parent and self.cluster_of[neighbor] == home:
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+        return None
+
+    def _tree_path(self, portal: int, v: int) -> list[int]:
+        '''Path v -> ... -> portal inside the portal's cluster'''
+        parent = self.trees[portal][0]
+        path = [v]
+        while path[-1] != portal:
+            path.append(parent[path[-1]])
+        return path
+
+    def path_indices(self, s: int, t: int) -> list[int] | None:
+        self._check_version()
+        best = math.inf
+        best_path: list[int] | None = None
+        if self.cluster_of[s] == self.cluster_of[t]:
+            local = self._local_path(s, t)
+            if local is not None:
+                best, best_path = len(local) - 1, local
+
+        from_start = self._portal_distances(s)
+        to_end = self._portal_distances(t)
+        if not from_start or not to_end:
+            return best_path
+
+        # Dijkstra over the portal overlay, seeded with the start's portal distances
+        dist: dict[int, int] = dict(from_start)
+        parent: dict[int, int] = {}
+        heap = [(d, p) for p, d in from_start.items()]
+        heapq.heapify(heap)
+        exit_portal = None
+        while heap:
+            d, p = heapq.heappop(heap)
+            if d >= best:
+                break
+            if d > dist[p]:
+                continue
+            if p in to_end and d + to_end[p] < best:
+                best = d + to_end[p]
+                exit_portal = p
+            for q, w in self.overlay[p]:
+                nd = d + w
+                if nd < dist.get(q, math.inf):
+                    dist[q] = nd
+                    parent[q] = p
+                    heapq.heappush(heap, (nd, q))
+
+        if exit_portal is None:
+            return best_path
+
+        # unpack: start -> first portal, overlay hops, last portal -> end
+        hops = [exit_portal]
+        while hops[-1] in parent:
+            hops.append(parent[hops[-1]])
+        hops.reverse()
+
+        path = self._tree_path(hops[0], s)
+        for p, q in zip(hops, hops[1:]):
+            if self.cluster_of[p] == self.cluster_of[q]:
+                path += self._tree_path(p, q)[-2::-1]
+            else:
+                path.append(q)
+        path += self._tree_path(hops[-1], t)[-2::-1]
+        return path
+
+    def path(self, start_name: str, end_name: str) -> list[str] | None:
+        '''Same shape as SchoolGraph.bfs_path: list of room names, or None'''
+        idx_to_name = self.graph.idx_to_name
+        path = self.path_indices(self.graph.name_to_idx[start_name], self.graph.name_to_idx[end_name])
+        return None if path is None else [idx_to_name[v] for v in path]
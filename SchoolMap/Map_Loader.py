@@ -0,0 +1,283 @@
+'''
+Streaming, validating loader for HM_Graph.csv-style files.
+
+SchoolGraph._load_from_csv keeps a dict per row and trusts the file. This
+loader reads the rows in chunks with csv.reader, appends everything to
+growable typed arrays (array.array), and checks the file while it goes:
+
+    - the Degree column matches the number of neighbors
+    - every neighbor id has its own row (dangling ids)
+    - every edge u -> v has a matching v -> u (asymmetric edges)
+    - no index or room name is used twice
+    - weights and coordinates are numbers (a bad weight counts as 1.0,
+      a room with bad coordinates gets none)
+
+The result is a SchoolGraph backed by the same read-only CSR views as a
+snapshot (see Map_Snapshot), so it can be saved straight to a snapshot.
+With symmetrize=True the missing reverse edges are added instead of
+only being reported.
+'''
+
+import csv
+import math
+from array import array
+from itertools import islice
+
+from Map_Snapshot import CoordTable, CSRAdjacency, NameIndex, NameTable, UnitWeights
+
+
+class LoadReport:
+    '''Problems found while loading; counts are exact, examples are capped'''
+
+    def __init__(self, max_examples: int = 20) -> None:
+        self.max_examples = max_examples
+        self.rows = 0
+        self.edges = 0
+        self.counts: dict[str, int] = {}
+        self.examples: dict[str, list] = {}
+        self.added_reverse_edges = 0
+
+    def add(self, kind: str, example) -> None:
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        examples = self.examples.setdefault(kind, [])
+        if len(examples) < self.max_examples:
+            examples.append(example)
+
+    def ok(self) -> bool:
+        return not self.counts
+
+    def __str__(self) -> str:
+        lines = [f"{self.rows} rows, {self.edges} directed edges"]
+        for kind, count in sorted(self.counts.items()):
+            lines.append(f"  {kind}: {count}  e.g. {self.examples[kind][:5]}")
+        if self.added_reverse_edges:
+            lines.append(f"  added {self.added_reverse_edges} reverse edges")
+        return "\n".join(lines)
+
+
+MAX_ID = 2**31 - 1     # ids are stored as int32
+
+
+def _grow(arr: array, size: int, fill) -> None:
+    if len(arr) < size:
+        arr.extend(array(arr.typecode, [fill]) * (size - len(arr)))
+
+
+def _row_contains(targets: array, offsets: array, v: int, u: int) -> bool:
+    return u in targets[offsets[v]:offsets[v + 1]]
+
+
+def load_csv_streaming(graph, csv_path: str, symmetrize: bool = False,
+                       chunk_rows: int = 4096, max_examples: int = 20) -> LoadReport:
+    '''Fill graph from csv_path and return a LoadReport of everything suspicious'''
+    report = LoadReport(max_examples)
+
+    present = array("B")
+    name_start = array("q")     # where room idx's name starts in blob (file order)
+    name_len = array("q")
+    blob = bytearray()
+    src = array("i")
+    dst = array("i")
+    weights = array("d")
+    coords = array("d")
+    has_weights = False
+    has_coords = False
+    categories: dict[int, str] = {}
+
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        col = {name.strip(): i for i, name in enumerate(header)}
+        i_idx, i_name, i_adj = col["idx"], col["vertex_name"], col["adjacencies"]
+        i_deg = col.get("Degree")
+        i_w, i_x, i_y, i_floor = col.get("weights"), col.get("x"), col.get("y"), col.get("floor")
+        i_cat = col.get("category")
+
+        width = len(header)
+        n = 0   # highest idx seen + 1; the idx-indexed arrays grow geometrically past it
+
+        while True:
+            chunk = list(islice(reader, chunk_rows))
+            if not chunk:
+                break
+
+            for row in chunk:
+                report.rows += 1
+                if len(row) < width:
+                    row += [""] * (width - len(row))
+                try:
+                    idx = int(row[i_idx])
+                except ValueError:
+                    idx = -1
+                if not 0 <= idx <= MAX_ID:
+                    report.add("bad_idx", report.rows)
+                    continue
+
+                if idx >= len(present):
+                    size = max(idx + 1, 2 * len(present))
+                    _grow(present, size, 0)
+                    _grow(name_start, size, 0)
+                    _grow(name_len, size, 0)
+                if present[idx]:
+                    report.add("duplicate_idx", idx)
+                    continue
+                present[idx] = 1
+                if idx >= n:
+                    n = idx + 1
+                name = row[i_name].strip().encode("utf-8")
+                name_start[idx] = len(blob)
+                name_len[idx] = len(name)
+                blob += name
+
+                parts = [part for part in row[i_adj].split(",") if part.strip() != ""]
+                try:
+                    dst.extend(map(int, parts))
+                except (ValueError, OverflowError):
+                    # slow path: keep the good ids, report the rest (text, or too big for int32)
+                    good = []
+                    for part in parts:
+                        try:
+                            u = int(part)
+                        except ValueError:
+                            u = None
+                        if u is None or not -MAX_ID - 1 <= u <= MAX_ID:
+                            report.add("bad_neighbor", (idx, part.strip()))
+                        else:
+                            good.append(u)
+                    del dst[len(src):]
+                    dst.extend(good)
+                count = len(dst) - len(src)
+                src.extend(array("i", [idx]) * count)
+
+                if i_w is not None:
+                    w_str = row[i_w].strip()
+                    if w_str != "":
+                        row_w = []
+                        for w in w_str.split(","):
+                            if w.strip() == "":
+                                continue
+                            try:
+                                row_w.append(float(w))
+                            except ValueError:
+                                report.add("bad_weight", (idx, w.strip()))
+                                row_w.append(1.0)
+                        if len(row_w) != count:
+                            report.add("weight_count_mismatch", idx)
+                            row_w = (row_w + [1.0] * count)[:count]
+                        has_weights = True
+                    else:
+                        row_w = [1.0] * count
+                    weights.extend(row_w)
+
+                if i_deg is not None:
+                    deg_str = row[i_deg].strip()
+                    if deg_str.isdigit() and int(deg_str) != count:
+                        report.add("degree_mismatch", (idx, int(deg_str), count))
+
+                if i_x is not None and i_y is not None:
+                    x_str, y_str = row[i_x].strip(), row[i_y].strip()
+                    if x_str != "" and y_str != "":
+                        floor_str = row[i_floor].strip() if i_floor is not None else ""
+                        try:
+                            xyz = array("d", (float(x_str), float(y_str),
+                                              float(floor_str) if floor_str != "" else 0.0))
+                        except ValueError:
+                            report.add("bad_coords", (idx, x_str, y_str, floor_str))
+                        else:
+                            if 3 * idx >= len(coords):
+                                _grow(coords, 3 * max(idx + 1, len(present)), math.nan)
+                            coords[3 * idx:3 * idx + 3] = xyz
+                            has_coords = True
+
+                if i_cat is not None and row[i_cat].strip() != "":
+                    categories[idx] = row[i_cat].strip()
+
+    del present[n:]
+    report.edges = len(src)
+
+    # dangling neighbor ids: drop those edges
+    keep = array("B", [1]) * len(src)
+    if len(dst) and not (min(dst) >= 0 and max(dst) < n and present.count(0) == 0):
+        for e in range(len(src)):
+            v = dst[e]
+            if not (0 <= v < n and present[v]):
+                report.add("dangling_id", (src[e], v))
+                keep[e] = 0
+
+    if not has_weights:
+        weights = array("d", [1.0]) * len(src)
+    offsets, targets, edge_w = _build_csr(n, src, dst, weights, keep)
+
+    # asymmetric edges: u -> v without v -> u
+    extra_src, extra_dst, extra_w = array("i"), array("i"), array("d")
+    for u in range(n):
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            if not _row_contains(targets, offsets, v, u):
+                report.add("asymmetric_edge", (u, v))
+                if symmetrize:
+                    extra_src.append(v)
+                    extra_dst.append(u)
+                    extra_w.append(edge_w[e])
+
+    if symmetrize and len(extra_src):
+        report.added_reverse_edges = len(extra_src)
+        # rebuild with the reverse edges appended to each row
+        src = array("i", (u for u in range(n) for _ in range(offsets[u + 1] - offsets[u])))
+        src.extend(extra_src)
+        all_dst = array("i", targets)
+        all_dst.extend(extra_dst)
+        all_w = array("d", edge_w)
+        all_w.extend(extra_w)
+        offsets, targets, edge_w = _build_csr(n, src, all_dst, all_w, array("B", [1]) * len(src))
+
+    # names: repack in idx order, then sort once to catch duplicates
+    by_idx = array("q", [0]) * (n + 1)
+    packed = bytearray()
+    for v in range(n):
+        if present[v]:
+            packed += blob[name_start[v]:name_start[v] + name_len[v]]
+        by_idx[v + 1] = len(packed)
+    del blob, name_start, name_len
+
+    order = array("i", sorted((v for v in range(n) if present[v]),
+                              key=lambda v: packed[by_idx[v]:by_idx[v + 1]]))
+    for a, b in zip(order, order[1:]):
+        if packed[by_idx[a]:by_idx[a + 1]] == packed[by_idx[b]:by_idx[b + 1]]:
+            report.add("duplicate_name", (packed[by_idx[b]:by_idx[b + 1]].decode("utf-8"), a, b))
+
+    adj = CSRAdjacency(offsets, targets, present)
+    graph.adj = adj
+    graph.idx_to_name = NameTable(by_idx, packed, present, len(adj))
+    graph.name_to_idx = NameIndex(graph.idx_to_name, order)
+    graph.has_weights = has_weights
+    graph.weights = CSRAdjacency(offsets, edge_w, present) if has_weights else UnitWeights(adj)
+    if has_coords:
+        _grow(coords, 3 * n, math.nan)
+        del coords[3 * n:]
+        graph.coords = CoordTable(coords, present)
+    graph.categories = categories
+    return report
+
+
+def _build_csr(n: int, src: array, dst: array, weights: array, keep: array) -> tuple[array, array, array]:
+    '''Counting sort of the edge list by source, keeping each row in file order'''
+    offsets = array("q", [0]) * (n + 1)
+    for e in range(len(src)):
+        if keep[e]:
+            offsets[src[e] + 1] += 1
+    for v in range(n):
+        offsets[v + 1] += offsets[v]
+
+    m = offsets[n]
+    targets = array("i", [0]) * m
+    edge_w = array("d", [0.0]) * m
+    fill = array("q", offsets[:n])
+    for e in range(len(src)):
+        if keep[e]:
+            u = src[e]
+            pos = fill[u]
+            targets[pos] = dst[e]
+            edge_w[pos] = weights[e]
+            fill[u] = pos + 1
+    return offsets, targets, edge_w
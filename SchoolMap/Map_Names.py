@@ -0,0 +1,239 @@
+'''
+Prefix and fuzzy lookup of room names.
+
+Kiosk users type things like "olsh", "lobby" or "Olshan Lobyy". The
+index turns such queries into vertex indices without scanning every name:
+
+    - prefix: every word start of every name ("olshan lobby", "lobby") is
+      kept in one sorted list, so a prefix is a bisect plus a short scan.
+      This is the flattened form of a word-start trie, at a fraction of
+      the memory of dict-of-dict nodes for 10^5 names.
+    - fuzzy: a trigram index. An edit destroys at most 3 trigrams, so a
+      name within k edits shares all but 3k of the query's trigrams; only
+      the rarest few posting lists have to be scanned to find candidates,
+      which are then checked with a bounded edit distance. The posting
+      lists are split by name length: a whole name within k edits is
+      within k characters of the query's length, so a whole-name lookup
+      only counts those few lengths (campus names share most of their
+      trigrams, so even the rarest lists are long otherwise).
+
+Memory: for 10^5 campus-style names the index takes about 68 MiB,
+roughly 31 MiB of word-start keys, 24 MiB of normalized names and exact
+entries, and 13 MiB of trigram postings. Each name has about 20
+trigrams, so postings are sorted array("i") (4 bytes each) instead of
+sets, which cost about 112 MiB here; a candidate is bisected into a
+long posting instead of intersected with it.
+'''
+
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+
+
+def normalize(name: str) -> str:
+    return " ".join(name.casefold().split())
+
+
+def _trigrams(text: str, tail: bool = True) -> set[str]:
+    # one leading space marks every word start; queries skip the tail so
+    # that a typed prefix is not penalized for stopping mid-name
+    padded = f" {text} " if tail else f" {text}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _contains(posting: array, idx: int) -> bool:
+    pos = bisect_left(posting, idx)
+    return pos < len(posting) and posting[pos] == idx
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    '''Levenshtein distance capped at limit + 1 (Myers' bit-parallel algorithm)'''
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    m = len(a)
+    if m == 0:
+        return min(len(b), limit + 1)
+
+    # bit i of peq[c] is set when a[i] == c; one column of the DP table fits in an int
+    peq: dict[str, int] = {}
+    for i, c in enumerate(a):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for c in b:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return min(score, limit + 1)
+
+
+class RoomNameIndex:
+    def __init__(self, names: dict[int, str] | None = None) -> None:
+        self._norm: dict[int, str] = {}             # idx -> normalized name
+        self._exact: dict[str, list[int]] = {}      # normalized name -> idx (usually one)
+        self._keys: list[tuple[str, int]] = []      # sorted (word-start suffix, idx)
+        self._grams: dict[tuple[str, int], array] = {}  # (trigram, name length) -> sorted idx that contain it
+        self._lengths: Counter[int] = Counter()     # name length -> rooms, i.e. which buckets exist
+        if names is not None:
+            for idx, name in names.items():
+                self._index(idx, name, sort=False)
+            self._keys.sort()
+
+    def __len__(self) -> int:
+        return len(self._norm)
+
+    # building ---------------------------------------------------------
+    @staticmethod
+    def _word_starts(norm: str) -> list[str]:
+        return [norm[i:] for i in range(len(norm)) if i == 0 or norm[i - 1] == " "]
+
+    def _index(self, idx: int, name: str, sort: bool) -> None:
+        norm = normalize(name)
+        self._norm[idx] = norm
+        self._exact.setdefault(norm, []).append(idx)
+        for key in self._word_starts(norm):
+            if sort:
+                insort(self._keys, (key, idx))
+            else:
+                self._keys.append((key, idx))
+        self._lengths[len(norm)] += 1
+        for gram in _trigrams(norm):
+            posting = self._grams.setdefault((gram, len(norm)), array("i"))
+            if posting and posting[-1] > idx:
+                posting.insert(bisect_left(posting, idx), idx)
+            else:
+                posting.append(idx)
+
+    def add(self, idx: int, name: str) -> None:
+        self._index(idx, name, sort=True)
+
+    def remove(self, idx: int) -> None:
+        norm = self._norm.pop(idx)
+        self._exact[norm].remove(idx)
+        if not self._exact[norm]:
+            del self._exact[norm]
+        for key in self._word_starts(norm):
+            pos = bisect_left(self._keys, (key, idx))
+            del self._keys[pos]
+        self._lengths[len(norm)] -= 1
+        for gram in _trigrams(norm):
+            posting = self._grams[gram, len(norm)]
+            del posting[bisect_left(posting, idx)]
+
+    # queries ----------------------------------------------------------
+    def exact(self, query: str) -> list[int]:
+        '''Case- and spacing-insensitive exact match'''
+        return list(self._exact.get(normalize(query), []))
+
+    def prefix(self, query: str, limit: int = 10) -> list[int]:
+        '''Rooms with a word starting with query, whole-name matches first'''
+        q = normalize(query)
+        if q == "":
+            return []
+        keys = self._keys
+        found: dict[int, bool] = {}
+        pos = bisect_left(keys, (q, -1))
+        while pos < len(keys) and keys[pos][0].startswith(q) and len(found) < 4 * limit:
+            idx = keys[pos][1]
+            found[idx] = found.get(idx, False) or self._norm[idx].startswith(q)
+            pos += 1
+        ranked = sorted(found, key=lambda idx: (not found[idx], len(self._norm[idx]), self._norm[idx]))
+        return ranked[:limit]
+
+    def fuzzy(self, query: str, max_edits: int = 2, limit: int = 10,
+              whole: bool = False) -> list[tuple[int, int]]:
+        '''(idx, edits) for names whose whole text or some word-start prefix is within max_edits of query.
+
+        whole=True only looks for whole names, which lets the length filter
+        skip every name more than max_edits characters longer or shorter.'''
+        q = normalize(query)
+        # a whole name also ends where the query does, so its last gram counts too
+        grams = _trigrams(q, tail=whole)
+        need = len(grams) - 3 * max_edits
+        if need <= 0:
+            # too short for the trigram filter to prune anything; prefix is the useful answer
+            return [(idx, 0) for idx in self.prefix(q, limit)]
+
+        # a word-start prefix can only match names at least len(q) - max_edits long
+        shortest = len(q) - max_edits
+        if whole:
+            lengths = [n for n in range(shortest, len(q) + max_edits + 1) if self._lengths.get(n)]
+        else:
+            lengths = [n for n, count in self._lengths.items() if count and n >= shortest]
+
+        # each room sits in one length bucket, so a gram's buckets count like one list
+        postings = []
+        for g in grams:
+            buckets = [posting for n in lengths if (posting := self._grams.get((g, n)))]
+            postings.append((sum(len(posting) for posting in buckets), buckets))
+        postings.sort(key=lambda entry: entry[0])
+
+        # pigeonhole: a match contains at least `need` of the query grams, so it
+        # must appear in one of the len(grams) - need + 1 rarest posting lists
+        scan = len(grams) - need + 1
+        hits: Counter[int] = Counter()
+        for _, buckets in postings[:scan]:
+            for posting in buckets:
+                hits.update(posting)
+        # only candidates matter from here on: bisect each one into the posting
+        # when there are few, otherwise let intersection walk the posting in C
+        candidates = set(hits)
+        for i, (_, buckets) in enumerate(postings[scan:], scan):
+            # drop candidates that stay short of `need` even if they are in every list
+            # left (every candidate already has 1, so there is nothing to drop before 2)
+            short = need - (len(postings) - i)
+            if short > 1:
+                candidates = {idx for idx in candidates if hits[idx] >= short}
+            for posting in buckets:
+                if 8 * len(candidates) < len(posting):
+                    hits.update(idx for idx in candidates if _contains(posting, idx))
+                else:
+                    hits.update(candidates.intersection(posting))
+
+        ranked = [(-hits[idx], idx) for idx in candidates if hits[idx] >= need]
+        ranked.sort()
+
+        # most shared trigrams first; each missing trigram means at least a
+        # third of an edit, so stop once that bound cannot beat what we have
+        scored: list[tuple[int, int, int]] = []
+        for neg_hits, idx in ranked:
+            lower_bound = -(-(len(grams) + neg_hits) // 3)
+            if len(scored) >= limit and lower_bound >= scored[limit - 1][0]:
+                break
+            norm = self._norm[idx]
+            best = edit_distance(q, norm, max_edits)
+            if not whole:
+                for start in self._word_starts(norm):
+                    if best == 0:
+                        break
+                    best = min(best, edit_distance(q, start[:len(q)], max_edits))
+            if best <= max_edits:
+                scored.append((best, len(norm), idx))
+                scored.sort()
+        scored.sort()
+        return [(idx, edits) for edits, _, idx in scored[:limit]]
+
+    def resolve(self, query: str, max_edits: int = 2) -> int:
+        '''Best single room for query: exact, then unique/best prefix, then closest fuzzy match'''
+        for matches in (self.exact(query), self.prefix(query, limit=1)):
+            if matches:
+                return matches[0]
+        # one edit first: its trigram filter is much tighter; a whole name
+        # (length-filtered, so cheap) before any word-start prefix
+        for edits in range(1, max_edits + 1):
+            for whole in (True, False):
+                fuzzy = self.fuzzy(query, max_edits=edits, limit=1, whole=whole)
+                if fuzzy:
+                    return fuzzy[0][0]
+        raise KeyError(query)
@@ -0,0 +1,111 @@
+'''
+Ranked alternative routes: k shortest simple paths (Yen) and a disjoint detour.
+
+Yen's algorithm keeps the k best paths found so far. For each room of the
+last accepted path (the spur room) it searches again from the spur room
+with the rooms before it banned, and with the next corridor of every
+accepted path sharing the same beginning banned too, so each search finds
+a new simple path. The best candidate becomes the next path.
+
+The searches are BFS (hop counts, like bfs_path) or Dijkstra (walking
+distance, like dijkstra_path) when the graph has weights.
+
+alternative_route is the quick version: take the shortest path, close its
+corridors (or its inner rooms too) and search once more. That is one extra
+search; it can miss a disjoint route that only exists if the first path
+had gone another way.
+'''
+
+import heapq
+import math
+from collections import deque
+
+
+def shortest(graph, start: int, end: int, banned_rooms: set[int] = frozenset(),
+             banned_edges: set[tuple[int, int]] = frozenset()) -> tuple[float, list[int]] | None:
+    '''(cost, room indices) of a shortest start -> end path avoiding the banned rooms and corridors'''
+    if start in banned_rooms:
+        return None
+    parent: dict[int, int] = {}
+    if not graph.has_weights:
+        dist = {start: 0}
+        queue = deque([start])
+        while queue and end not in dist:
+            v = queue.popleft()
+            for u in graph.adj.get(v, []):
+                if u not in dist and u not in banned_rooms and (v, u) not in banned_edges:
+                    dist[u] = dist[v] + 1
+                    parent[u] = v
+                    queue.append(u)
+    else:
+        dist = {start: 0.0}
+        heap = [(0.0, start)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            if v == end:
+                break
+            for u, w in zip(graph.adj.get(v, []), graph.weights.get(v, [])):
+                if u in banned_rooms or (v, u) in banned_edges:
+                    continue
+                if d + w < dist.get(u, math.inf):
+                    dist[u] = d + w
+                    parent[u] = v
+                    heapq.heappush(heap, (d + w, u))
+
+    if end not in dist:
+        return None
+    path = [end]
+    while path[-1] != start:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return float(dist[end]), path
+
+
+def _cost(graph, path: list[int]) -> float:
+    if not graph.has_weights:
+        return float(len(path) - 1)
+    return sum(graph.edge_weight(u, v) for u, v in zip(path, path[1:]))
+
+
+def k_shortest(graph, start: int, end: int, k: int) -> list[tuple[float, list[int]]]:
+    '''Up to k simple paths in order of cost (Yen)'''
+    first = shortest(graph, start, end)
+    if first is None or k <= 0:
+        return []
+    accepted = [first]
+    candidates: list[tuple[float, list[int]]] = []
+    seen = {tuple(first[1])}
+
+    while len(accepted) < k:
+        last = accepted[-1][1]
+        for i in range(len(last) - 1):
+            root = last[:i + 1]
+            banned_edges = {(path[i], path[i + 1]) for _, path in accepted
+                            if len(path) > i + 1 and path[:i + 1] == root}
+            spur = shortest(graph, last[i], end, set(root[:-1]), banned_edges)
+            if spur is None:
+                continue
+            path = root[:-1] + spur[1]
+            if tuple(path) not in seen:
+                seen.add(tuple(path))
+                heapq.heappush(candidates, (_cost(graph, root) + spur[0], path))
+        if not candidates:
+            break
+        accepted.append(heapq.heappop(candidates))
+    return accepted
+
+
+def alternative(graph, start: int, end: int, avoid_rooms: bool = False) -> tuple[float, list[int]] | None:
+    '''A route sharing no corridor (and with avoid_rooms, no inner room) with the shortest path'''
+    first = shortest(graph, start, end)
+    if first is None:
+        return None
+    path = first[1]
+    banned_edges = set()
+    for u, v in zip(path, path[1:]):
+        banned_edges.add((u, v))
+        banned_edges.add((v, u))
+    banned_rooms = set(path[1:-1]) if avoid_rooms else frozenset()
+    return shortest(graph, start, end, banned_rooms, banned_edges)
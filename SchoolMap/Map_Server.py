@@ -0,0 +1,324 @@
+'''
+Asyncio routing service for SchoolGraph queries.
+
+One process loads one shared SchoolGraph and answers newline-delimited
+JSON requests over TCP or a Unix socket:
+
+    {"id": 1, "op": "bfs_path", "start": "Olshan Lobby", "end": "Cafeteria"}
+    {"id": 2, "op": "neighbors_by_name", "name": "Rose Atrium"}
+    {"id": 3, "op": "eccentricity"}
+    {"id": 4, "op": "suggest", "query": "olsh"}
+    {"id": 5, "op": "stats"}
+
+Room names may be partial or misspelled; they are resolved with
+SchoolGraph.resolve_room before routing.
+
+Each reply is one JSON line: {"id": ..., "result": ...} or {"id": ..., "error": ...}.
+
+bfs_path requests that arrive in the same event-loop turn with the same
+start room are answered from a single BFS tree. Heavy whole-graph work
+(eccentricity) runs in a process pool so the loop keeps serving paths.
+Workers read the graph from a snapshot of the server's current version
+(written to a temporary folder once per version), so edits made in the
+server are seen by the pool too.
+
+Run from the SchoolMap folder:
+    python Map_Server.py serve --port 8765
+    python Map_Server.py bench --clients 50 --requests 200
+'''
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Map_Find import SchoolGraph
+
+
+def open_graph(path: str) -> SchoolGraph:
+    '''CSV files are parsed; anything else is treated as a binary snapshot'''
+    if path.endswith(".csv"):
+        return SchoolGraph.open(path)
+    return SchoolGraph.load_snapshot(path)
+
+
+# ---------------------------------------------------------------
+# Process-pool side (each worker maps the snapshot it was given)
+# ---------------------------------------------------------------
+_worker_graph: tuple[str, SchoolGraph] | None = None
+
+
+def _worker_open(snapshot_path: str) -> SchoolGraph:
+    global _worker_graph
+    if _worker_graph is None or _worker_graph[0] != snapshot_path:
+        _worker_graph = (snapshot_path, SchoolGraph.load_snapshot(snapshot_path))
+    return _worker_graph[1]
+
+
+def _worker_eccentricity(snapshot_path: str) -> int:
+    return _worker_open(snapshot_path).graph_eccentricity()
+
+
+# ---------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------
+class RoutingServer:
+    def __init__(self, graph_path: str, workers: int = 2) -> None:
+        self.graph_path = graph_path
+        self.graph = open_graph(graph_path)
+        # spawn, not fork: a forked worker would inherit (and hold open) the client sockets
+        self.pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        self._snapshot_dir = tempfile.mkdtemp(prefix="schoolmap-")
+        self._snapshot: tuple[int, str] | None = None     # (graph version, snapshot the workers read)
+        # start idx -> [(end idx, future), ...] waiting for this loop turn's BFS
+        self._pending: dict[int, list[tuple[int, asyncio.Future]]] = {}
+        self._eccentricity: tuple[int, asyncio.Future, str] | None = None    # (version, job, snapshot)
+        self._handlers: set[asyncio.Task] = set()
+        self.queries = 0
+        self.bfs_batches = 0
+
+    # path queries -------------------------------------------------
+    async def bfs_path(self, start_name: str, end_name: str) -> list[str] | None:
+        graph = self.graph
+        start = graph.name_to_idx[graph.resolve_room(start_name)]
+        end = graph.name_to_idx[graph.resolve_room(end_name)]
+        self.queries += 1
+
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.get(start)
+        if batch is None:
+            batch = self._pending[start] = []
+            asyncio.get_running_loop().call_soon(self._run_batch, start)
+        batch.append((end, future))
+        return await future
+
+    def _run_batch(self, start: int) -> None:
+        batch = self._pending.pop(start)
+        self.bfs_batches += 1
+        try:
+            result = self.graph._cached_bfs(start)
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        names = self.graph.idx_to_name
+        for end, future in batch:
+            path = result.path(end)
+            future.set_result([names[v] for v in path] if path is not None else None)
+
+    # heavy queries ------------------------------------------------
+    def worker_snapshot(self) -> str:
+        '''Path of a snapshot of the graph as it is now, for the pool workers'''
+        version = self.graph._version
+        if self._snapshot is None or self._snapshot[0] != version:
+            if version == 0 and not self.graph_path.endswith(".csv"):
+                path = self.graph_path  # opened from a snapshot and not edited since
+            else:
+                path = os.path.join(self._snapshot_dir, f"graph-v{version}.snap")
+                self.graph.save_snapshot(path)
+            self._snapshot = (version, path)
+        return self._snapshot[1]
+
+    def _drop_snapshot(self, path: str) -> None:
+        # called once the last job reading path is done
+        if path.startswith(self._snapshot_dir) and (self._snapshot is None or path != self._snapshot[1]):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    async def eccentricity(self) -> int:
+        # one computation per graph version, shared by everyone asking meanwhile
+        version = self.graph._version
+        if self._eccentricity is None or self._eccentricity[0] != version:
+            loop = asyncio.get_running_loop()
+            snapshot = self.worker_snapshot()
+            future = asyncio.ensure_future(loop.run_in_executor(self.pool, _worker_eccentricity, snapshot))
+            previous = self._eccentricity
+            if previous is not None:
+                previous[1].add_done_callback(lambda _, path=previous[2]: self._drop_snapshot(path))
+            self._eccentricity = (version, future, snapshot)
+        return await asyncio.shield(self._eccentricity[1])
+
+    def stats(self) -> dict:
+        return {"queries": self.queries, "bfs_batches": self.bfs_batches,
+                "rooms": self.graph.num_vertices(), **self.graph.cache_info()}
+
+    # protocol -----------------------------------------------------
+    async def handle_request(self, request: dict):
+        op = request.get("op")
+        if op == "bfs_path":
+            return await self.bfs_path(request["start"], request["end"])
+        if op == "neighbors_by_name":
+            return self.graph.neighbors_by_name(self.graph.resolve_room(request["name"]))
+        if op == "suggest":
+            return self.graph.suggest_rooms(request["query"], request.get("limit", 10))
+        if op == "eccentricity":
+            return await self.eccentricity()
+        if op == "stats":
+            return self.stats()
+        raise ValueError(f"unknown op {op!r}")
+
+    async def _answer(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            reply = {"id": request_id, "result": await self.handle_request(request)}
+        except KeyError as exc:
+            reply = {"id": request_id, "error": f"unknown room or field {exc}"}
+        except Exception as exc:
+            reply = {"id": request_id, "error": str(exc)}
+        if not writer.is_closing():
+            writer.write(json.dumps(reply).encode() + b"\n")
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # requests on one connection may be pipelined; replies carry the request id
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        tasks: set[asyncio.Task] = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self._answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            self._handlers.discard(handler)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix_path: str | None = None):
+        if unix_path is not None:
+            return await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def wait_clients(self, timeout: float = 5.0) -> None:
+        '''Let open connections finish before the loop shuts down'''
+        if self._handlers:
+            await asyncio.wait(self._handlers, timeout=timeout)
+
+    def close(self) -> None:
+        self.pool.shutdown(cancel_futures=True)
+        shutil.rmtree(self._snapshot_dir, ignore_errors=True)
+
+
+# ---------------------------------------------------------------
+# Load generator
+# ---------------------------------------------------------------
+async def _client(connect, requests: list[dict], latencies: list[float]) -> None:
+    reader, writer = await connect()
+    for request in requests:
+        t0 = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        latencies.append(time.perf_counter() - t0)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(connect, names: list[str], clients: int, requests: int,
+                   n_sources: int = 5, seed: int = 0) -> dict:
+    '''clients kiosks each send requests bfs_path queries from a few popular rooms'''
+    rng = random.Random(seed)
+    sources = rng.sample(names, min(n_sources, len(names)))
+    latencies: list[float] = []
+    jobs = []
+    for c in range(clients):
+        batch = [{"id": i, "op": "bfs_path", "start": rng.choice(sources), "end": rng.choice(names)}
+                 for i in range(requests)]
+        jobs.append(_client(connect, batch, latencies))
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*jobs)
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    return {"queries": len(latencies), "seconds": elapsed,
+            "queries_per_s": len(latencies) / elapsed,
+            "p50_ms": latencies[len(latencies) // 2] * 1000,
+            "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000}
+
+
+async def _bench(graph_path: str, clients: int, requests: int) -> None:
+    server = RoutingServer(graph_path)
+    tcp = await server.start(port=0)
+    port = tcp.sockets[0].getsockname()[1]
+    names = list(server.graph.name_to_idx)
+
+    def connect():
+        return asyncio.open_connection("127.0.0.1", port)
+
+    try:
+        for label, cache_size in [("batching only", 0), ("batching + LRU cache", 64)]:
+            server.graph.path_cache_size = cache_size
+            server.graph.invalidate_path_cache()
+            server.queries = server.bfs_batches = 0
+            result = await run_load(connect, names, clients, requests)
+            print(f"{label}: {result['queries']} queries in {result['seconds']:.2f} s "
+                  f"({result['queries_per_s']:.0f}/s, p50 {result['p50_ms']:.2f} ms, "
+                  f"p99 {result['p99_ms']:.2f} ms), {server.bfs_batches} BFS batches")
+
+        reader, writer = await connect()
+        t0 = time.perf_counter()
+        writer.write(b'{"id": 0, "op": "eccentricity"}\n')
+        path_result = await run_load(connect, names, clients, 20, seed=1)
+        reply = json.loads(await reader.readline())
+        print(f"eccentricity {reply['result']} in {time.perf_counter() - t0:.2f} s; "
+              f"paths meanwhile p99 {path_result['p99_ms']:.2f} ms")
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        tcp.close()
+        await server.wait_clients()
+        server.close()
+
+
+async def _serve(args) -> None:
+    server = RoutingServer(args.graph, workers=args.workers)
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"serving {server.graph.num_vertices()} rooms on {where}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve")
+    serve.add_argument("--graph", default="HM_Graph.csv", help="CSV or snapshot file")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    serve.add_argument("--workers", type=int, default=2)
+    bench = sub.add_parser("bench")
+    bench.add_argument("--graph", default="HM_Graph.csv")
+    bench.add_argument("--clients", type=int, default=50)
+    bench.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(_serve(args))
+    else:
+        asyncio.run(_bench(args.graph, args.clients, args.requests))
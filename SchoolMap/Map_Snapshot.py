@@ -0,0 +1,286 @@
+'''
+Binary snapshot of a SchoolGraph for fast startup.
+
+The CSV stays the import format. Once loaded, a graph can be saved as a
+snapshot: CSR arrays (offsets + neighbor ids) plus a name table, all
+stored as raw machine arrays. Loading a snapshot memory-maps the file and
+wraps the arrays in read-only mappings, so nothing is parsed up front and
+worker processes that open the same file share its pages.
+
+Layout (little-endian, every section starts on an 8-byte boundary):
+    header      magic, format version, flags, n_slots, n_edges, name bytes
+    present     uint8[n_slots]        1 if the index is a room
+    offsets     int64[n_slots + 1]    neighbors of v are targets[offsets[v]:offsets[v+1]]
+    targets     int32[n_edges]
+    weights     float64[n_edges]      only if FLAG_WEIGHTS
+    coords      float64[3 * n_slots]  x, y, floor (NaN = unknown), only if FLAG_COORDS
+    name_offs   int64[n_slots + 1]    utf-8 name of v is names[name_offs[v]:name_offs[v+1]]
+    name_order  int32[n_rooms]        room indices sorted by name bytes (for lookups)
+    names       bytes
+    categories  only if FLAG_CATEGORIES:
+      cat_sizes   int64[2]          number of categories, category name bytes
+      cat_ids     int32[n_slots]    category of v (-1 = none)
+      cat_offs    int64[n_cats + 1] utf-8 name of category c is cat_names[cat_offs[c]:cat_offs[c+1]]
+      cat_names   bytes
+
+Version 1 files (no categories section) still load.
+'''
+
+import math
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Iterator, Mapping
+
+MAGIC = b"SGRAPH\x00\x01"
+HEADER = struct.Struct("<8sIIQQQ")
+FLAG_WEIGHTS = 1
+FLAG_COORDS = 2
+FLAG_CATEGORIES = 4
+VERSION = 2
+
+
+def _pad(n: int) -> int:
+    return (n + 7) & ~7
+
+
+# ---------------------------------------------------------------
+# Read-only views over the mapped arrays
+# ---------------------------------------------------------------
+class CSRAdjacency(Mapping):
+    '''idx -> neighbor row, backed by CSR arrays (array or memoryview)'''
+
+    def __init__(self, offsets, values, present) -> None:
+        self.offsets = offsets
+        self.values = values
+        self.present = present
+        self._count = bytes(present).count(1)
+
+    def __getitem__(self, v: int):
+        if not (0 <= v < len(self.present) and self.present[v]):
+            raise KeyError(v)
+        return self.values[self.offsets[v]:self.offsets[v + 1]]
+
+    def get(self, v: int, default=None):
+        # hot path for the traversals: skip the KeyError round trip
+        if 0 <= v < len(self.present) and self.present[v]:
+            return self.values[self.offsets[v]:self.offsets[v + 1]]
+        return default
+
+    def __iter__(self) -> Iterator[int]:
+        return (v for v, p in enumerate(self.present) if p)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class UnitWeights(Mapping):
+    '''idx -> [1.0, ...] for graphs saved without walking distances'''
+
+    def __init__(self, adj: CSRAdjacency) -> None:
+        self.adj = adj
+
+    def __getitem__(self, v: int) -> list[float]:
+        return [1.0] * len(self.adj[v])
+
+    def get(self, v: int, default=None):
+        row = self.adj.get(v)
+        return default if row is None else [1.0] * len(row)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.adj)
+
+    def __len__(self) -> int:
+        return len(self.adj)
+
+
+class NameTable(Mapping):
+    '''idx -> room name, decoded from the name blob on access'''
+
+    def __init__(self, name_offs, blob, present, count: int) -> None:
+        self.name_offs = name_offs
+        self.blob = blob
+        self.present = present
+        self._count = count
+
+    def __getitem__(self, v: int) -> str:
+        if not (0 <= v < len(self.present) and self.present[v]):
+            raise KeyError(v)
+        return str(self.blob[self.name_offs[v]:self.name_offs[v + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[int]:
+        return (v for v, p in enumerate(self.present) if p)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class NameIndex(Mapping):
+    '''room name -> idx, by binary search over the sorted name order'''
+
+    def __init__(self, names: NameTable, order) -> None:
+        self.names = names
+        self.order = order
+
+    def _key(self, i: int) -> bytes:
+        v = self.order[i]
+        offs = self.names.name_offs
+        return bytes(self.names.blob[offs[v]:offs[v + 1]])
+
+    def __getitem__(self, name: str) -> int:
+        target = name.encode("utf-8")
+        lo, hi = 0, len(self.order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.order) and self._key(lo) == target:
+            return self.order[lo]
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.names[v] for v in self.order)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+
+class CoordTable(Mapping):
+    '''idx -> (x, y, floor) for rooms with a known position'''
+
+    def __init__(self, coords, present) -> None:
+        self.coords = coords
+        self.present = present
+
+    def __getitem__(self, v: int) -> tuple[float, float, float]:
+        if not (0 <= v < len(self.present) and self.present[v]) or math.isnan(self.coords[3 * v]):
+            raise KeyError(v)
+        return (self.coords[3 * v], self.coords[3 * v + 1], self.coords[3 * v + 2])
+
+    def get(self, v: int, default=None):
+        try:
+            return self[v]
+        except KeyError:
+            return default
+
+    def __iter__(self) -> Iterator[int]:
+        return (v for v, p in enumerate(self.present) if p and not math.isnan(self.coords[3 * v]))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+# ---------------------------------------------------------------
+# Save / load
+# ---------------------------------------------------------------
+def save_snapshot(graph, path: str) -> None:
+    '''Write graph (any SchoolGraph) as a binary snapshot'''
+    if sys.byteorder != "little":
+        raise OSError("snapshots are little-endian only")
+
+    n = max(graph.adj.keys(), default=-1) + 1
+    present = array("B", bytes(n))
+    offsets = array("q", [0])
+    targets = array("i")
+    weights = array("d")
+    for v in range(n):
+        row = graph.adj.get(v)
+        if row is not None:
+            present[v] = 1
+            targets.extend(row)
+            weights.extend(graph.weights.get(v, [1.0] * len(row)))
+        offsets.append(len(targets))
+
+    flags = FLAG_WEIGHTS if graph.has_weights else 0
+    coords = array("d")
+    if len(graph.coords) > 0:
+        flags |= FLAG_COORDS
+        coords = array("d", [math.nan]) * (3 * n)
+        for v, (x, y, floor) in graph.coords.items():
+            coords[3 * v:3 * v + 3] = array("d", (x, y, floor))
+
+    name_offs = array("q", [0])
+    blob = bytearray()
+    for v in range(n):
+        if present[v]:
+            blob += graph.idx_to_name[v].encode("utf-8")
+        name_offs.append(len(blob))
+    order = array("i", sorted((v for v in range(n) if present[v]),
+                              key=lambda v: blob[name_offs[v]:name_offs[v + 1]]))
+
+    sections = [present, offsets, targets]
+    if flags & FLAG_WEIGHTS:
+        sections.append(weights)
+    if flags & FLAG_COORDS:
+        sections.append(coords)
+    sections += [name_offs, order, blob]
+    if graph.categories:
+        flags |= FLAG_CATEGORIES
+        kinds = sorted(set(graph.categories.values()))
+        kind_id = {kind: c for c, kind in enumerate(kinds)}
+        cat_ids = array("i", [-1]) * n
+        for v, kind in graph.categories.items():
+            cat_ids[v] = kind_id[kind]
+        cat_offs = array("q", [0])
+        cat_blob = bytearray()
+        for kind in kinds:
+            cat_blob += kind.encode("utf-8")
+            cat_offs.append(len(cat_blob))
+        sections += [array("q", [len(kinds), len(cat_blob)]), cat_ids, cat_offs, cat_blob]
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, n, len(targets), len(blob)))
+        for section in sections:
+            data = bytes(section)
+            f.write(data)
+            f.write(bytes(_pad(len(data)) - len(data)))
+
+
+def load_snapshot(graph, path: str) -> None:
+    '''Point graph's tables at a memory-mapped snapshot (read-only until edited)'''
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, flags, n, m, n_blob = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"{path} is not a SchoolGraph snapshot")
+
+    buf = memoryview(mm)
+    pos = HEADER.size
+
+    def take(fmt: str, count: int):
+        nonlocal pos
+        size = count * struct.calcsize(fmt)
+        view = buf[pos:pos + size].cast(fmt) if fmt != "B" else buf[pos:pos + size]
+        pos += _pad(size)
+        return view
+
+    present = take("B", n)
+    offsets = take("q", n + 1)
+    targets = take("i", m)
+    weights = take("d", m) if flags & FLAG_WEIGHTS else None
+    coords = take("d", 3 * n) if flags & FLAG_COORDS else None
+    name_offs = take("q", n + 1)
+    adj = CSRAdjacency(offsets, targets, present)
+    order = take("i", len(adj))
+    blob = take("B", n_blob)
+    categories: dict[int, str] = {}
+    if flags & FLAG_CATEGORIES:
+        n_cats, n_cat_blob = take("q", 2)
+        cat_ids = take("i", n)
+        cat_offs = take("q", n_cats + 1)
+        cat_blob = take("B", n_cat_blob)
+        kinds = [bytes(cat_blob[cat_offs[c]:cat_offs[c + 1]]).decode("utf-8") for c in range(n_cats)]
+        categories = {v: kinds[c] for v, c in enumerate(cat_ids) if c >= 0}
+
+    graph.adj = adj
+    graph.idx_to_name = NameTable(name_offs, blob, present, len(adj))
+    graph.name_to_idx = NameIndex(graph.idx_to_name, order)
+    graph.has_weights = weights is not None
+    graph.weights = CSRAdjacency(offsets, weights, present) if weights is not None else UnitWeights(adj)
+    graph.coords = CoordTable(coords, present) if coords is not None else {}
+    graph.categories = categories
+    graph._snapshot = mm    # keep the mapping alive as long as the graph
@@ -0,0 +1,122 @@
+'''
+Opt-in instrumentation for SchoolGraph traversals.
+
+Set graph.trace_sink to any callable (or use `with graph.tracing(sink):`)
+and every search that runs reports one TraversalStats: bfs_path, dfs_path,
+dfs_spanning_tree and each full BFS build ("bfs_tree", which also serves
+cached_bfs_path, bfs_spanning_tree and bfs_distances_from):
+
+    op              which traversal
+    start           start room index
+    visited         rooms reached
+    edges_scanned   adjacency entries looked at
+    max_frontier    widest BFS level, or deepest DFS stack
+    seconds         wall time of the search itself
+    cached          True when the BFS tree came from the cache: nothing was
+                    searched, so the counts are 0
+
+
+The traversal loops are not touched. Everything except the time is
+rebuilt afterwards from what the search leaves behind (the parent dict
+keeps discovery order), so with no sink the only cost is one attribute
+check per call.
+'''
+
+from collections import Counter
+from typing import NamedTuple
+
+
+class TraversalStats(NamedTuple):
+    op: str
+    start: int
+    visited: int
+    edges_scanned: int
+    max_frontier: int
+    seconds: float
+    cached: bool = False
+
+
+def _degree(adj, v: int) -> int:
+    return len(adj.get(v, []))
+
+
+def _depths(start: int, parent: dict[int, int]) -> dict[int, int]:
+    # parents are always discovered before their children
+    depth = {start: 0}
+    for child, par in parent.items():
+        depth[child] = depth[par] + 1
+    return depth
+
+
+def bfs_stats(op: str, adj, start: int, parent: dict[int, int], end: int | None,
+              seconds: float) -> TraversalStats:
+    '''Stats of a BFS that built parent (discovery order) and stopped on popping end, if given'''
+    order = [start, *parent]
+    if end is not None and (end == start or end in parent):
+        # FIFO: exactly the rooms discovered up to end were popped; end itself is not expanded
+        popped = order[:order.index(end)]
+    else:
+        popped = order
+    widest = max(Counter(_depths(start, parent).values()).values())
+    return TraversalStats(op, start, len(order), sum(_degree(adj, v) for v in popped), widest, seconds)
+
+
+def cache_hit(op: str, start: int, seconds: float) -> TraversalStats:
+    return TraversalStats(op, start, 0, 0, 0, seconds, cached=True)
+
+
+def dfs_stats(op: str, adj, start: int, parent: dict[int, int], end: int | None, found: bool,
+              seconds: float) -> TraversalStats:
+    '''Stats of SchoolGraph._dfs: every room is scanned fully except the ones on the path to end'''
+    depth = _depths(start, parent)
+    scanned = sum(_degree(adj, v) for v in depth)
+    if found and end == start:
+        scanned = 0
+    elif found:
+        # rooms on the path stopped scanning right after the child they went into
+        scanned -= _degree(adj, end)
+        child = end
+        while child != start:
+            par = parent[child]
+            row = list(adj.get(par, []))
+            scanned -= len(row) - (row.index(child) + 1)
+            child = par
+    return TraversalStats(op, start, len(depth), scanned, max(depth.values()) + 1, seconds)
+
+
+class TraceCounters:
+    '''A sink that adds up the stats per op'''
+
+    def __init__(self) -> None:
+        self.totals: dict[str, dict[str, float]] = {}
+
+    def __call__(self, stats: TraversalStats) -> None:
+        total = self.totals.get(stats.op)
+        if total is None:
+            total = self.totals[stats.op] = {"calls": 0, "cache_hits": 0, "visited": 0, "edges_scanned": 0,
+                                             "max_frontier": 0, "seconds": 0.0}
+        if stats.cached:
+            total["cache_hits"] += 1
+            return
+        total["calls"] += 1
+        total["visited"] += stats.visited
+        total["edges_scanned"] += stats.edges_scanned
+        total["max_frontier"] = max(total["max_frontier"], stats.max_frontier)
+        total["seconds"] += stats.seconds
+
+    def reset(self) -> None:
+        self.totals.clear()
+
+    def __str__(self) -> str:
+        lines = []
+        for op, total in sorted(self.totals.items()):
+            calls = total["calls"]
+            hits = f", {total['cache_hits']} cache hits" if total["cache_hits"] else ""
+            if calls == 0:
+                lines.append(f"{op}: 0 calls{hits}")
+                continue
+            lines.append(f"{op}: {calls} calls{hits}, {total['visited'] / calls:.0f} rooms and "
+                         f"{total['edges_scanned'] / calls:.0f} edges per call, "
+                         f"max frontier {total['max_frontier']}, {total['seconds'] * 1000 / calls:.3f} ms per call")
+        return "\n".join(lines)
+
@@ -0,0 +1,460 @@
+import random
+import sys
+from collections import deque
+
+import pytest
+
+from Map_Find import SchoolGraph
+
+
+def write_csv(tmp_path, rows):
+    path = tmp_path / "graph.csv"
+    path.write_text("idx,vertex_name,adjacencies,Degree,Max Degree\n" + "".join(rows))
+    return str(path)
+
+
+def fresh_distances(graph, source):
+    dist = {source: 0}
+    queue = deque([source])
+    while queue:
+        v = queue.popleft()
+        for u in graph.adj.get(v, []):
+            if u not in dist:
+                dist[u] = dist[v] + 1
+                queue.append(u)
+    return dist
+
+
+def random_graph(rng, n, extra):
+    # a random tree plus `extra` random doors, two-way like add_edge
+    adj = {v: [] for v in range(n)}
+    for v in range(1, n):
+        u = rng.randrange(v)
+        adj[u].append(v)
+        adj[v].append(u)
+    for _ in range(extra):
+        u, v = rng.sample(range(n), 2)
+        if v not in adj[u]:
+            adj[u].append(v)
+            adj[v].append(u)
+    return SchoolGraph.from_adjacency(adj, names={v: f"R{v}" for v in adj})
+
+
+def test_csv_with_dangling_neighbor_id_is_rejected(tmp_path):
+    path = write_csv(tmp_path, ['0,A,"1,5",2,2\n', "1,B,0,1,\n"])
+    with pytest.raises(ValueError, match="neighbor 5"):
+        SchoolGraph(path)
+
+
+def test_csv_with_negative_neighbor_id_is_rejected(tmp_path):
+    path = write_csv(tmp_path, ['0,A,"1,-1",2,2\n', "1,B,0,1,\n"])
+    with pytest.raises(ValueError, match="neighbor -1"):
+        SchoolGraph(path)
+
+
+def test_bfs_arrays_cover_neighbor_ids_past_the_last_room():
+    # built in memory, so nothing checked the ids: room 5 only exists as a neighbor
+    graph = SchoolGraph.from_adjacency({0: [1, 5], 1: [0]}, names={0: "A", 1: "B"})
+    assert graph.bfs_spanning_tree("A") == {0: [1, 5], 1: [0], 5: [0]}
+    assert graph.bfs_distances_from(1) == {0: 1, 1: 0, 5: 2}
+    assert graph.graph_eccentricity() == 2
+    assert graph.cached_bfs_path("B", "A") == ["B", "A"]
+
+
+def test_trace_counts_one_search_per_cache_miss_and_hits_as_hits():
+    graph = SchoolGraph.from_adjacency({0: [1], 1: [0, 2], 2: [1]}, names={0: "A", 1: "B", 2: "C"})
+    seen = []
+    with graph.tracing(seen.append):
+        graph.bfs_distances_from(0)
+        graph.bfs_distances_from(0)
+    assert [(s.op, s.cached) for s in seen] == [("bfs_tree", False), ("bfs_tree", True)]
+    assert seen[0].visited == 3
+    assert (seen[1].visited, seen[1].edges_scanned) == (0, 0)
+
+
+def test_snapshot_keeps_categories(tmp_path):
+    graph = SchoolGraph.from_adjacency({0: [1], 1: [0, 2], 2: [1]}, names={0: "A", 1: "B", 2: "Exit"},
+                                       categories={2: "exit", 0: "restroom"})
+    path = str(tmp_path / "graph.snap")
+    graph.save_snapshot(path)
+    loaded = SchoolGraph.load_snapshot(path)
+    assert loaded.categories == {0: "restroom", 2: "exit"}
+    assert loaded.nearest_facility(category="exit")["A"] == ("Exit", 2.0, "B")
+
+
+def test_spanning_tree_names_prints_like_a_dict():
+    graph = SchoolGraph.from_adjacency({0: [1], 1: [0]}, names={0: "A", 1: "B"})
+    assert repr(graph.spanning_tree_names(graph.bfs_spanning_tree("A"))) == "{'A': ['B'], 'B': ['A']}"
+
+
+def test_open_keeps_the_load_report(tmp_path, capsys):
+    path = write_csv(tmp_path, ['0,A,"1,5",2,2\n', "1,B,0,1,\n"])
+    graph = SchoolGraph.open(path, backend="csr")
+    assert graph.load_report.counts == {"dangling_id": 1}
+    assert "dangling_id" in capsys.readouterr().err
+
+
+def test_contraction_hierarchy_refuses_an_index_for_other_weights(tmp_path):
+    from Map_CH import ContractionHierarchy
+
+    def square(weight):
+        adj = {0: [1, 3], 1: [0, 2], 2: [1, 3], 3: [2, 0]}
+        weights = {0: [1.0, weight], 1: [1.0, 1.0], 2: [1.0, 1.0], 3: [1.0, weight]}
+        return SchoolGraph.from_adjacency(adj, weights=weights)
+
+    path = str(tmp_path / "graph.ch")
+    ContractionHierarchy.build(square(1.0)).save(path)
+    ContractionHierarchy.load(square(1.0), path)
+    # same rooms and edge count, different walking distance
+    with pytest.raises(ValueError, match="different graph"):
+        ContractionHierarchy.load(square(5.0), path)
+
+
+def test_streaming_load_reports_malformed_numbers(tmp_path):
+    path = tmp_path / "graph.csv"
+    path.write_text("idx,vertex_name,adjacencies,Degree,Max Degree,weights,x,y,floor\n"
+                    '0,A,1,1,1,2.5x,0,0,1\n'
+                    '1,B,0,1,,2.5,1,oops,1\n')
+    graph, report = SchoolGraph.load_csv_checked(str(path))
+    assert report.counts == {"bad_weight": 1, "bad_coords": 1}
+    assert report.examples["bad_weight"] == [(0, "2.5x")]
+    assert graph.edge_weight(0, 1) == 1.0 and graph.edge_weight(1, 0) == 2.5
+    assert tuple(graph.coords[0]) == (0.0, 0.0, 1.0) and 1 not in graph.coords
+
+
+def test_hierarchical_router_follows_graph_edits():
+    from Map_Hierarchy import HierarchicalRouter
+
+    names = {0: "A", 1: "B", 2: "C", 3: "D"}
+    graph = SchoolGraph.from_adjacency({0: [1], 1: [0, 2], 2: [1, 3], 3: [2]}, names=names)
+    router = HierarchicalRouter(graph, {0: "west", 1: "west", 2: "east", 3: "east"})
+    assert router.path("A", "D") == ["A", "B", "C", "D"]
+    graph.add_edge("A", "D")
+    assert router.path("A", "D") == ["A", "D"]
+    graph.add_room("E", ["D"])
+    with pytest.raises(RuntimeError, match="no cluster"):
+        router.path("A", "D")
+
+    grown = HierarchicalRouter(graph, cluster_size=2)
+    graph.remove_edge("A", "D")
+    assert grown.path("A", "E") == graph.bfs_path("A", "E")
+
+
+def test_resolve_room_fixes_a_typo_in_the_room_number():
+    names = {0: "Rose Lobby 151", 1: "Rose Lobby 152", 2: "Rose Lobby 1515", 3: "Fisher Lobby 151"}
+    graph = SchoolGraph.from_adjacency({v: [] for v in names}, names=names)
+    assert graph.resolve_room("rose lobby 15u") in ("Rose Lobby 151", "Rose Lobby 152")
+    assert graph.resolve_room("Fisher Lobyy 151") == "Fisher Lobby 151"
+
+
+def test_uncached_bfs_result_is_not_reused_by_the_next_search():
+    graph = SchoolGraph.from_adjacency({0: [1], 1: [0, 2], 2: [1]})
+    graph.path_cache_size = 0
+    first = graph.bfs_tree_from(0)
+    second = graph.bfs_tree_from(2)
+    assert (first.source, first.distance(2)) == (0, 2)
+    assert (second.source, second.distance(0)) == (2, 2)
+    # results used only internally are still recycled
+    graph._cached_bfs(1)
+    graph._cached_bfs(0)
+    assert first.source == 0
+
+
+def test_streaming_load_reports_ids_too_big_for_int32(tmp_path):
+    path = write_csv(tmp_path, ['0,A,"1,99999999999",2,2\n', "1,B,0,1,\n", "99999999999,C,0,1,\n"])
+    graph, report = SchoolGraph.load_csv_checked(path)
+    assert report.examples["bad_neighbor"] == [(0, "99999999999")]
+    assert report.counts["bad_idx"] == 1
+    assert graph.bfs_path("A", "B") == ["A", "B"]
+    assert SchoolGraph.open(path, backend="csr").load_report.counts == report.counts
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_cached_bfs_trees_are_repaired_like_a_fresh_bfs(seed):
+    rng = random.Random(seed)
+    graph = random_graph(rng, 60, 30)
+    graph.path_cache_size = 8
+    names = list(graph.name_to_idx)
+    for step in range(150):
+        live = list(graph.name_to_idx)
+        for name in rng.sample(live, 2):
+            graph.cached_bfs_path(name, live[0])
+        a, b = rng.sample(live, 2)
+        roll = rng.random()
+        if roll < 0.4:
+            graph.add_edge(a, b)
+        elif roll < 0.8:
+            neighbors = graph.neighbors_by_name(a)
+            if neighbors:
+                graph.remove_edge(a, rng.choice(neighbors))
+        elif roll < 0.9:
+            names.append(f"New {step}")
+            graph.add_room(names[-1], [a, b])
+        else:
+            graph.close_room(a)
+
+        for source, result in graph._bfs_cache.items():
+            want = fresh_distances(graph, source)
+            assert result.distances() == want, (step, source)
+            for v in want:
+                if v != source:
+                    parent = result.parent[v]
+                    assert v in graph.adj[parent] and want[parent] == want[v] - 1, (step, source, v)
+
+
+def components_without(graph, skip_room=None, skip_edge=()):
+    seen, count = set(), 0
+    for root in graph.adj:
+        if root in seen or root == skip_room:
+            continue
+        count += 1
+        seen.add(root)
+        queue = deque([root])
+        while queue:
+            v = queue.popleft()
+            for u in graph.adj[v]:
+                if u not in seen and u != skip_room and {v, u} != set(skip_edge):
+                    seen.add(u)
+                    queue.append(u)
+    return count
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_components_bridges_and_articulation_points_match_brute_force(seed):
+    rng = random.Random(seed)
+    graph = random_graph(rng, 40, 8)
+    graph.close_room("R0")      # usually splits the tree into several components
+    base = components_without(graph)
+
+    components = graph.connected_components()
+    assert len(components) == base
+    assert sorted(v for c in components for v in c) == sorted(graph.adj)
+    assert [len(c) for c in components] == sorted((len(c) for c in components), reverse=True)
+
+    want_bridges = {frozenset((v, u)) for v in graph.adj for u in graph.adj[v]
+                    if components_without(graph, skip_edge=(v, u)) > base}
+    assert {frozenset(e) for e in graph.bridges()} == want_bridges
+    want_cut = {v for v in graph.adj if components_without(graph, skip_room=v) > base - (not graph.adj[v])}
+    assert set(graph.articulation_points()) == want_cut
+
+
+def test_connectivity_answers_are_copies():
+    graph = SchoolGraph.from_adjacency({0: [1], 1: [0, 2], 2: [1]})
+    graph.bridges().clear()
+    graph.articulation_points().clear()
+    graph.connected_components()[0].clear()
+    assert len(graph.bridges()) == 2
+    assert graph.articulation_points() == [1]
+    assert graph.connected_components() == [[0, 1, 2]]
+
+
+def test_switching_backend_keeps_the_graph_version_and_answers():
+    from Map_Backend import AdjacencyBackend
+    from Map_CH import ContractionHierarchy
+
+    graph = random_graph(random.Random(1), 50, 20)
+    hierarchy = ContractionHierarchy.build(graph)
+    bridges = graph.bridges()
+    version = graph._version
+    for backend in ("list", "csr", "compressed", "dict"):
+        graph.use_backend(backend)
+        assert graph.backend == backend
+        assert isinstance(graph.adj, AdjacencyBackend) and isinstance(graph.weights, AdjacencyBackend)
+        assert graph._version == version
+        assert hierarchy.distance("R3", "R40") == len(graph.bfs_path("R3", "R40")) - 1
+        assert graph.bridges() == bridges
+
+
+def test_route_memo_is_bounded():
+    graph = random_graph(random.Random(2), 30, 15)
+    graph.route_cache_size = 4
+    for end in range(1, 20):
+        graph.k_shortest_paths("R0", f"R{end}", k=2)
+    assert len(graph._routes[1]) == 4
+    first = graph.k_shortest_paths("R0", "R1", k=2)
+    assert first[0] == graph.bfs_path("R0", "R1") or len(first[0]) == len(graph.bfs_path("R0", "R1"))
+    graph.alternative_route("R0", "R5")
+    assert list(graph._routes[1])[-1] == (0, 5, "corridors")
+
+
+def reference_costs(adj, weights, source):
+    # plain O(n^2) Dijkstra: small and obviously right
+    cost = {v: float("inf") for v in adj}
+    cost[source] = 0.0
+    todo = set(adj)
+    while todo:
+        v = min(todo, key=cost.get)
+        todo.remove(v)
+        for u, w in zip(adj[v], weights[v]):
+            cost[u] = min(cost[u], cost[v] + w)
+    return cost
+
+
+def test_dijkstra_and_astar_match_bfs_on_unit_weights():
+    graph = random_graph(random.Random(3), 80, 40)
+    for a, b in [("R0", "R79"), ("R5", "R42"), ("R17", "R17")]:
+        hops = len(graph.bfs_path(a, b))
+        for path in (graph.dijkstra_path(a, b), graph.astar_path(a, b)):
+            assert len(path) == hops and path[0] == a and path[-1] == b
+            assert all(graph.name_to_idx[y] in graph.adj[graph.name_to_idx[x]] for x, y in zip(path, path[1:]))
+
+
+def test_dijkstra_and_astar_find_the_shortest_walk():
+    rng = random.Random(4)
+    tree = random_graph(rng, 60, 60)
+    coords = {v: (rng.uniform(0, 100), rng.uniform(0, 100), float(rng.randint(0, 2))) for v in tree.adj}
+
+    def straight(u, v):
+        (x1, y1, f1), (x2, y2, f2) = coords[u], coords[v]
+        return ((x1 - x2) ** 2 + (y1 - y2) ** 2 + (4.0 * (f1 - f2)) ** 2) ** 0.5
+
+    # corridors are never shorter than the straight line, so A*'s heuristic is a lower bound
+    adj = {v: list(row) for v, row in tree.adj.items()}
+    weights = {v: [straight(v, u) * (1 + (min(u, v) % 3) / 4) for u in row] for v, row in adj.items()}
+    graph = SchoolGraph.from_adjacency(adj, names={v: f"R{v}" for v in adj}, weights=weights, coords=coords)
+    want = reference_costs(adj, weights, 0)
+    for end in range(1, 60, 7):
+        for path in (graph.dijkstra_path("R0", f"R{end}"), graph.astar_path("R0", f"R{end}")):
+            assert graph.path_cost(path) == pytest.approx(want[end])
+
+
+def test_path_cache_hits_evicts_least_recent_and_invalidates():
+    graph = random_graph(random.Random(5), 30, 10)
+    graph.path_cache_size = 2
+    for start in ("R1", "R2", "R1", "R3"):
+        assert len(graph.cached_bfs_path(start, "R0")) == len(graph.bfs_path(start, "R0"))
+    assert graph.cache_info() == {"hits": 1, "misses": 3, "size": 2, "max_size": 2}
+    assert list(graph._bfs_cache) == [1, 3]     # R2 was the least recently used
+
+    graph.invalidate_path_cache()
+    assert graph.cache_info()["size"] == 0
+    graph.cached_bfs_path("R1", "R0")
+    assert graph.cache_info()["misses"] == 4
+
+
+def test_dfs_handles_a_chain_deeper_than_the_recursion_limit():
+    n = 3 * sys.getrecursionlimit()
+    adj = {v: [u for u in (v - 1, v + 1) if 0 <= u < n] for v in range(n)}
+    graph = SchoolGraph.from_adjacency(adj)
+    path = graph.dfs_path("Room 0", f"Room {n - 1}")
+    assert path == [f"Room {v}" for v in range(n)]
+    tree = graph.dfs_spanning_tree(f"Room {n // 2}")
+    assert len(tree) == n and sum(map(len, tree.values())) == 2 * (n - 1)
+
+
+def test_dfs_visits_rooms_in_the_recursive_order():
+    graph = random_graph(random.Random(6), 50, 40)
+
+    def recursive(v, parent, seen):
+        for u in graph.adj[v]:
+            if u not in seen:
+                seen.add(u)
+                parent[u] = v
+                recursive(u, parent, seen)
+        return parent
+
+    for start in (0, 17, 49):
+        want = recursive(start, {}, {start})
+        parent, visited, found = graph._dfs(start)
+        assert parent == want and list(parent) == list(want)
+        assert visited == set(graph.adj) and not found
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_bfs_levels_match_the_bfs_tree(vectorized):
+    graph = random_graph(random.Random(7), 70, 30)
+    graph.close_room("R3")      # leaves unreachable rooms and an unused index
+    for start in (0, 10, 69):
+        levels = graph.bfs_levels(start, vectorized=vectorized)
+        result = graph.bfs_tree_from(start)
+        assert len(levels) == graph.slot_count()
+        assert [int(d) for d in levels] == [result.distance(v) if result.reached(v) else -1
+                                            for v in range(len(levels))]
+
+
+@pytest.mark.parametrize("to", ["csr", "dict"])
+def test_compressed_rows_round_trip(to):
+    graph = random_graph(random.Random(7), 300, 200)
+    original = {v: sorted(row) for v, row in graph.adj.items()}
+    distances = graph.bfs_distances_from(0)
+    graph.use_backend("compressed")
+    assert len(graph.adj) == len(original)
+    assert {v: list(graph.adj[v]) for v in graph.adj} == original
+    assert graph.bfs_distances_from(0) == distances == fresh_distances(graph, 0)
+    graph.use_backend(to)
+    assert {v: sorted(graph.adj[v]) for v in graph.adj} == original
+
+    graph.add_edge("R0", "R299")
+    assert isinstance(graph.adj, dict) and 299 in graph.adj[0]
+
+
+def test_weighted_graph_cannot_be_compressed():
+    graph = SchoolGraph.from_adjacency({0: [1], 1: [0]}, names={0: "A", 1: "B"}, weights={0: [2.0], 1: [2.0]})
+    with pytest.raises(ValueError, match="weights"):
+        graph.compress_adjacency()
+
+
+def path_counts(graph, source):
+    # hop distance and number of shortest paths from source
+    dist, sigma = {source: 0}, {source: 1}
+    queue = deque([source])
+    while queue:
+        v = queue.popleft()
+        for u in graph.adj[v]:
+            if u not in dist:
+                dist[u], sigma[u] = dist[v] + 1, 0
+                queue.append(u)
+            if dist[u] == dist[v] + 1:
+                sigma[u] += sigma[v]
+    return dist, sigma
+
+
+def test_betweenness_matches_brute_force_serial_and_pooled():
+    graph = random_graph(random.Random(11), 40, 30)
+    counts = {s: path_counts(graph, s) for s in graph.adj}
+    offsets, _ = graph._csr_arrays()
+    rooms = {v: 0.0 for v in graph.adj}
+    corridors = [0.0] * offsets[-1]
+    for s, (dist_s, sigma_s) in counts.items():
+        for t, (dist_t, sigma_t) in counts.items():
+            if t == s or s not in dist_t:
+                continue
+            total = sigma_s[t]
+            for v in graph.adj:
+                if v not in (s, t) and dist_s.get(v, -1) + dist_t.get(v, -1) == dist_s[t]:
+                    rooms[v] += sigma_s[v] * sigma_t[v] / total
+            for v in dist_s:
+                for i, w in enumerate(graph.adj[v]):
+                    if dist_s[v] + 1 + dist_t.get(w, -2) == dist_s[t]:
+                        corridors[offsets[v] + i] += sigma_s[v] * sigma_t[w] / total
+
+    serial = graph.betweenness()
+    pooled = graph.betweenness(workers=2)
+    for result in (serial, pooled):
+        assert result.sources == 40 and result.room_error == 0.0
+        assert list(result.rooms) == pytest.approx([rooms[v] for v in range(40)])
+        assert list(result.corridors) == pytest.approx(corridors)
+
+    sampled = graph.betweenness(samples=10, seed=3)
+    assert list(graph.betweenness(samples=10, seed=3, workers=2).rooms) == pytest.approx(list(sampled.rooms))
+
+
+def test_fuzzy_names_match_brute_force_after_adds_and_removes():
+    from Map_Bench import campus_names
+    from Map_Names import RoomNameIndex, edit_distance, normalize
+
+    names = campus_names(400, seed=5)
+    index = RoomNameIndex({idx: names[idx] for idx in range(0, 400, 2)})
+    for idx in range(399, 0, -2):        # out of index order, so postings need inserting
+        index.add(idx, names[idx])
+    for idx in range(0, 400, 3):
+        index.remove(idx)
+        del names[idx]
+
+    rng = random.Random(2)
+    for idx in rng.sample(sorted(names), 30):
+        q = normalize(names[idx])
+        i = rng.randrange(len(q))
+        q = q[:i] + "x" + q[i + 1:]
+        expected = {v for v, name in names.items() if edit_distance(q, normalize(name), 2) <= 2}
+        assert {v for v, _ in index.fuzzy(q, whole=True, limit=len(names))} == expected
@@ -0,0 +1,86 @@
+# benchmarks for test.py: subset generators (slow: the last one starts a process pool) and the word finder
+from test import (brute_force_words, build_trie, count_sum_in_range, count_sum_parallel, load_words, subsets,
+                  subsets_bitmask, subsets_gray, synthetic_words, trie_words)
+
+
+def bench_subsets():
+    # recursive power set vs the lazy generators: time and peak memory
+    import os
+    import time
+    import tracemalloc
+
+    def measure(fn):
+        # peak memory from a traced run, time from an untraced one
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        t0 = time.perf_counter()
+        fn()
+        return time.perf_counter() - t0, peak / 2**20
+
+    def consume(gen):
+        # look at every subset without keeping any
+        return sum(len(s) for s in gen)
+
+    print("\nsubsets of n items: seconds (peak MiB)")
+    for n in (12, 16, 18, 20, 22):
+        items = [i for i in range(n)]
+        row = f"  n={n:>2}"
+        if n <= 18:
+            t, m = measure(lambda: subsets(items))
+            row += f"  recursive {t:6.2f} s ({m:7.1f})"
+        else:
+            row += f"  recursive {'-':>6}   ({'-':>7})"
+        t, m = measure(lambda: consume(subsets_bitmask(items)))
+        row += f"  bitmask {t:6.2f} s ({m:5.2f})"
+        t, m = measure(lambda: consume(subsets_gray(items)))
+        row += f"  gray {t:6.2f} s ({m:5.2f})"
+        print(row)
+
+    items = [i for i in range(1, 25)]
+    target = sum(items) // 2
+    t0 = time.perf_counter()
+    serial = count_sum_in_range(items, target, 0, 1 << len(items))
+    t_serial = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    parallel = count_sum_parallel(items, target)
+    t_parallel = time.perf_counter() - t0
+    assert serial == parallel
+    print(f"  subsets of 1..24 summing to {target}: {serial}  one process {t_serial:.2f} s,"
+          f" pool of {os.cpu_count()} {t_parallel:.2f} s")
+
+
+def bench_words(path="/usr/share/dict/words", alphabet="ABCDEFGH", lengths=range(5, 11),
+                brute_force_limit=8 ** 7):
+    import os
+    import time
+    if os.path.exists(path):
+        words, source = load_words(path), path
+    else:
+        words, source = synthetic_words(), "synthetic word list"
+    t0 = time.perf_counter()
+    trie = build_trie(words)
+    print(f"\nwords from {alphabet} ({len(words)} words, {source}; trie built in {time.perf_counter() - t0:.2f} s)")
+
+    rate = None     # brute-force candidates per second, for estimating the big lengths
+    for length in lengths:
+        t0 = time.perf_counter()
+        found = trie_words(trie, alphabet, length)
+        t_trie = time.perf_counter() - t0
+        candidates = len(alphabet) ** length
+        if candidates <= brute_force_limit:
+            t0 = time.perf_counter()
+            assert brute_force_words(words, alphabet, length) == found
+            t_brute = time.perf_counter() - t0
+            rate = candidates / t_brute
+            brute = f"{t_brute:8.3f} s"
+        else:
+            brute = f"~{candidates / rate:7.0f} s (est.)" if rate else "skipped"
+        print(f"  length {length:>2}: {len(found):>5} words  trie {t_trie * 1000:7.2f} ms"
+              f"  brute force {brute} over {candidates:,} strings")
+
+
+if __name__ == "__main__":
+    bench_subsets()
+    bench_words()
@@ -9,9 +9,89 @@ def subsets(list, start=0):
     return [[list[start]] + element for element in n_subset] + n_subset
 
 
-output = subsets(list)
-print("Recursion:", output)
-print(len(output))
+# bit listing (see class notes): subset number i holds items[j] when bit j of i is 1.
+# generators, so only one subset is alive at a time instead of all 2^n
+def subset_from_mask(items, mask):
+    chosen = []
+    j = 0
+    while mask:
+        if mask & 1:
+            chosen.append(items[j])
+        mask >>= 1
+        j += 1
+    return chosen
+
+
+def _half_tables(items):
+    # every subset of the low half and of the high half (2 * 2^(n/2) small lists),
+    # so subset `mask` is one list concatenation instead of a loop over n bits
+    half = len(items) // 2
+    low = [subset_from_mask(items[:half], m) for m in range(1 << half)]
+    high = [subset_from_mask(items[half:], m) for m in range(1 << (len(items) - half))]
+    return half, low, high
+
+
+def subsets_bitmask(items, start=0, stop=None):
+    # counting order: subsets start, start+1, ..., stop-1
+    if stop is None:
+        stop = 1 << len(items)
+    half, low, high = _half_tables(items)
+    low_bits = (1 << half) - 1
+    for mask in range(start, stop):
+        yield low[mask & low_bits] + high[mask >> half]
+
+
+def subsets_gray(items, start=0, stop=None):
+    # Gray code order: the i-th subset is mask i ^ (i >> 1), so each subset
+    # differs from the previous one by exactly one item
+    if stop is None:
+        stop = 1 << len(items)
+    half, low, high = _half_tables(items)
+    low_bits = (1 << half) - 1
+    for i in range(start, stop):
+        mask = i ^ (i >> 1)
+        yield low[mask & low_bits] + high[mask >> half]
+
+
+def subset_chunks(n, chunks):
+    # split 0 .. 2^n into (start, stop) ranges, one per worker
+    total = 1 << n
+    size = -(-total // chunks)
+    return [(lo, min(lo + size, total)) for lo in range(0, total, size)]
+
+
+def count_sum_in_range(items, target, start, stop):
+    # process-pool job: subsets in [start, stop) of the Gray order adding up to target.
+    # keeps a running total, so each step is O(1) instead of summing the subset
+    mask = start ^ (start >> 1)
+    total = sum(items[j] for j in range(len(items)) if mask >> j & 1)
+    count = 1 if start < stop and total == target else 0
+    for i in range(start + 1, stop):
+        j = (i & -i).bit_length() - 1
+        bit = 1 << j
+        total += -items[j] if mask & bit else items[j]
+        mask ^= bit
+        if total == target:
+            count += 1
+    return count
+
+
+def count_sum_parallel(items, target, workers=None, chunks=None):
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    ranges = subset_chunks(len(items), chunks or 4 * workers)
+    with ProcessPoolExecutor(workers) as pool:
+        jobs = [pool.submit(count_sum_in_range, items, target, lo, hi) for lo, hi in ranges]
+        return sum(job.result() for job in jobs)
+
+
+if __name__ == "__main__":
+    output = subsets(list)
+    print("Recursion:", output)
+    print(len(output))
+    print("Bit listing:", [s for s in subsets_bitmask(list)])
+    print("Gray code:", [s for s in subsets_gray(list)])
 
 # task: using only letters from A-H, make 5 letter words that exist 
 alphabet = ["A", "B", "C", "D", "E", "F", "G", "H"]
@@ -39,6 +119,70 @@ Class Notes
 '''
 
 
+# word finder: instead of generating all 8^5 letter strings and checking each one,
+# walk a trie of real words and only follow allowed letters. a branch dies as soon
+# as no word continues with the letters we have.
+def load_words(path="/usr/share/dict/words"):
+    words = set()
+    with open(path) as f:
+        for line in f:
+            word = line.strip().upper()
+            if word.isalpha():
+                words.add(word)
+    return words
 
 
-    
+def build_trie(words):
+    # node = {letter: child, "$": word ending here, "#": bit L set if a word of length L is below}
+    root = {"#": 0}
+    for word in words:
+        bit = 1 << len(word)
+        node = root
+        node["#"] |= bit
+        for ch in word:
+            child = node.get(ch)
+            if child is None:
+                child = node[ch] = {"#": 0}
+            child["#"] |= bit
+            node = child
+        node["$"] = word
+    return root
+
+
+def trie_words(trie, alphabet, length):
+    # every word of this length that uses only letters from alphabet (letters may repeat)
+    letters = [ch.upper() for ch in alphabet]
+    want = 1 << length
+    found = []
+    stack = [(trie, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if depth == length:
+            if "$" in node:
+                found.append(node["$"])
+            continue
+        for ch in letters:
+            child = node.get(ch)
+            if child is not None and child["#"] & want:
+                stack.append((child, depth + 1))
+    return sorted(found)
+
+
+def brute_force_words(words, alphabet, length):
+    # the original plan: generate every string, keep the real words
+    from itertools import product
+    letters = [ch.upper() for ch in alphabet]
+    return sorted(w for w in ("".join(p) for p in product(letters, repeat=length)) if w in words)
+
+
+def synthetic_words(count=200_000, seed=0):
+    # stand-in dictionary for machines without a word list: English letter frequencies
+    import random
+    rng = random.Random(seed)
+    letters = "ETAOINSHRDLCUMWFGYPBVKJXQZ"
+    freq = [12.7, 9.1, 8.2, 7.5, 7.0, 6.7, 6.3, 6.1, 6.0, 4.3, 4.0, 2.8, 2.8,
+            2.4, 2.4, 2.2, 2.0, 2.0, 1.9, 1.5, 1.0, 0.8, 0.2, 0.2, 0.1, 0.1]
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choices(letters, freq, k=rng.randint(3, 12))))
+    return words
@@ -0,0 +1,40 @@
+from itertools import combinations
+
+import pytest
+
+from test import count_sum_in_range, count_sum_parallel, subset_chunks, subsets, subsets_bitmask, subsets_gray
+
+
+def brute_force(items):
+    return sorted(sorted(c) for r in range(len(items) + 1) for c in combinations(items, r))
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 9])
+def test_generators_give_every_subset_once(n):
+    items = list(range(1, n + 1))
+    want = brute_force(items)
+    assert sorted(sorted(s) for s in subsets(items)) == want
+    assert sorted(sorted(s) for s in subsets_bitmask(items)) == want
+    assert sorted(sorted(s) for s in subsets_gray(items)) == want
+
+
+def test_gray_order_changes_one_item_per_step():
+    order = [set(s) for s in subsets_gray(list("abcdefg"))]
+    assert all(len(a ^ b) == 1 for a, b in zip(order, order[1:]))
+
+
+def test_chunks_cover_the_range_in_order():
+    items = list(range(10))
+    chunks = subset_chunks(len(items), 7)
+    assert chunks[0][0] == 0 and chunks[-1][1] == 1 << len(items)
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+    joined = [s for lo, hi in chunks for s in subsets_gray(items, lo, hi)]
+    assert joined == list(subsets_gray(items))
+
+
+def test_sum_counts_match_brute_force():
+    items = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5]
+    for target in (0, 10, 22, sum(items)):
+        want = sum(1 for s in subsets(items) if sum(s) == target)
+        assert sum(count_sum_in_range(items, target, lo, hi) for lo, hi in subset_chunks(len(items), 5)) == want
+        assert count_sum_parallel(items, target, workers=2) == want
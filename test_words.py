@@ -0,0 +1,20 @@
+from test import brute_force_words, build_trie, synthetic_words, trie_words
+
+
+def test_trie_finds_the_same_words_as_brute_force():
+    words = synthetic_words(20_000, seed=1) | {"BAD", "CAFE", "FACED", "DECADE", "BEEF", "ACE"}
+    trie = build_trie(words)
+    for alphabet in ("ABCDEFGH", "abcde", "EAST"):
+        for length in range(1, 7):
+            found = trie_words(trie, alphabet, length)
+            assert found == brute_force_words(words, alphabet, length)
+    assert "DECADE" in trie_words(trie, "ABCDEF", 6)
+
+
+def test_empty_dictionary_and_letters():
+    trie = build_trie(set())
+    assert trie_words(trie, "ABC", 3) == []
+    trie = build_trie({"AB", "BA"})
+    assert trie_words(trie, "", 2) == []
+    assert trie_words(trie, "AB", 2) == ["AB", "BA"]
+    assert trie_words(trie, "C", 2) == []